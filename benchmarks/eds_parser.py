@@ -0,0 +1,86 @@
+"""Compare import_eds() and import_eds_fast() with the previous import.
+
+The previous configparser based import is taken from the frozen copy in
+test/eds_reference.py.  All three read test/sample.eds and a synthetic file
+of 5000 objects, half of them records with 8 parameters.  The best of
+several runs is reported.
+
+Run with the package installed, e.g. ``pip install -e .``::
+
+    python benchmarks/eds_parser.py
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import canopen
+from canopen.objectdictionary import ODRecord, ODVariable, datatypes, eds
+
+
+SAMPLE_EDS = os.path.join(os.path.dirname(__file__), "..", "test", "sample.eds")
+
+# The reference implementation lives with the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test import eds_reference  # noqa: E402
+
+
+def create_od(objects: int) -> canopen.ObjectDictionary:
+    od = canopen.ObjectDictionary()
+    for i in range(objects):
+        index = 0x2000 + i
+        if i % 2:
+            record = ODRecord(f"Record {i}", index)
+            count = ODVariable("Highest sub-index supported", index, 0)
+            count.data_type = datatypes.UNSIGNED8
+            count.access_type = "ro"
+            count.default = 8
+            record.add_member(count)
+            for subindex in range(1, 9):
+                var = ODVariable(f"Parameter {subindex}", index, subindex)
+                var.data_type = datatypes.UNSIGNED32
+                var.access_type = "rw"
+                var.default = subindex
+                var.min = 0
+                var.max = 1000
+                record.add_member(var)
+            od.add_object(record)
+        else:
+            var = ODVariable(f"Variable {i}", index)
+            var.data_type = datatypes.INTEGER16
+            var.access_type = "ro"
+            var.default = -1
+            var.pdo_mappable = True
+            od.add_object(var)
+    return od
+
+
+def best_of(runs: int, func) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # Unsupported data types in the sample file are not of interest here
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = os.path.join(tmp, "synthetic.eds")
+        canopen.export_od(create_od(5000), synthetic)
+        for path, runs in (SAMPLE_EDS, 50), (synthetic, 5):
+            print(f"{os.path.basename(path)} ({os.path.getsize(path) // 1024} KiB):")
+            baseline = best_of(runs, lambda: eds_reference.import_eds(path, 2))
+            print(f"  previous import_eds: {baseline * 1e3:.2f} ms")
+            for func in eds.import_eds, eds.import_eds_fast:
+                duration = best_of(runs, lambda: func(path, 2))
+                print(f"  {func.__name__}: {duration * 1e3:.2f} ms, "
+                      f"{baseline / duration:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure reads and writes of a local node's data store.
+
+Compares :class:`canopen.node.store.DataStore` with the plain ``dict`` of
+``dict`` used before, which encoded the value from the object dictionary on
+every read of an object that was not written.  Also reports the memory taken
+by 100 stores for the same object dictionary with nothing written.
+
+Run with the package installed, e.g. ``pip install -e .``::
+
+    python benchmarks/local_data_store.py
+"""
+
+import gc
+import logging
+import os
+import timeit
+import tracemalloc
+
+import canopen
+from canopen.node.store import DataStore
+
+
+EDS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "test", "sample.eds")
+ROUNDS = 100000
+
+
+def baseline_read(store: dict, obj, index: int, subindex: int) -> bytes:
+    """The read path of LocalNode before the data store."""
+    try:
+        return store[index][subindex]
+    except KeyError:
+        if obj.value is not None:
+            return obj.encode_raw(obj.value)
+        return obj.encode_raw(obj.default)
+
+
+def baseline_write(store: dict, index: int, subindex: int, data: bytes) -> None:
+    store.setdefault(index, {})
+    store[index][subindex] = bytes(data)
+
+
+def data_store_read(store: DataStore, obj, index: int, subindex: int) -> bytes:
+    """The read path of LocalNode with the data store."""
+    data = store.get(index, subindex)
+    if data is None:
+        data = store.initial(obj)
+    return data
+
+
+def best_of(stmt) -> float:
+    """Return the best time per call in microseconds."""
+    return min(timeit.repeat(stmt, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+
+
+def allocated(create) -> float:
+    """Return the MiB allocated by create()."""
+    gc.collect()
+    tracemalloc.start()
+    result = create()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / 2**20
+
+
+def main():
+    logging.disable(logging.WARNING)
+    od = canopen.import_od(EDS_PATH, 2)
+    obj = od[0x1400][1]
+    data = obj.encode_raw(0x202)
+    baseline: dict = {}
+    store = DataStore(od)
+
+    print("read of unwritten object:")
+    print(f"  baseline:   {best_of(lambda: baseline_read(baseline, obj, 0x1400, 1)):.3f} us")
+    print(f"  data store: {best_of(lambda: data_store_read(store, obj, 0x1400, 1)):.3f} us")
+    print("write:")
+    print(f"  baseline:   {best_of(lambda: baseline_write(baseline, 0x1400, 1, data)):.3f} us")
+    print(f"  data store: {best_of(lambda: store.set(0x1400, 1, data)):.3f} us")
+    print("read of written object:")
+    print(f"  baseline:   {best_of(lambda: baseline_read(baseline, obj, 0x1400, 1)):.3f} us")
+    print(f"  data store: {best_of(lambda: data_store_read(store, obj, 0x1400, 1)):.3f} us")
+    print("100 stores with nothing written:")
+    print(f"  baseline:   {allocated(lambda: [{} for _ in range(100)]):.4f} MiB")
+    print(f"  data store: {allocated(lambda: [DataStore(od) for _ in range(100)]):.4f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure the memory used by object dictionary variables.
+
+Reports the memory per 10k variables for a parsed EDS file and for bare
+ODVariable objects.  For comparison, the bare objects are also created with
+an instance ``__dict__`` and empty dicts of their own, like variables were
+stored before they used slots.
+
+Run with the package installed, e.g. ``pip install -e .``::
+
+    python benchmarks/od_memory.py
+"""
+
+import gc
+import logging
+import os
+import tempfile
+import tracemalloc
+
+import canopen
+from canopen.objectdictionary import ODRecord, ODVariable, datatypes, eds
+
+
+VARIABLES = 10000
+
+
+class DictVariable:
+    """Variable with the attributes of ODVariable in an instance __dict__."""
+
+    def __init__(self, name: str, index: int, subindex: int = 0):
+        self.parent = None
+        self.index = index
+        self.subindex = subindex
+        self.name = name
+        self.unit = ""
+        self.factor = 1
+        self.min = None
+        self.max = None
+        self.default = None
+        self.relative = False
+        self.value = None
+        self.data_type = None
+        self.access_type = "rw"
+        self.is_domain = False
+        self.description = ""
+        self.value_descriptions = {}
+        self.bit_definitions = {}
+        self.storage_location = None
+        self.pdo_mappable = False
+
+
+def measure(create) -> tuple[int, float]:
+    """Return the number of variables created and the MiB allocated."""
+    gc.collect()
+    tracemalloc.start()
+    result = create()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result) if isinstance(result, list) else len(result.variables())
+    return count, allocated / 2**20
+
+
+def create_variables(cls) -> list:
+    variables = []
+    for i in range(VARIABLES):
+        var = cls("Parameter", 0x2000 + i // 10, i % 10)
+        var.data_type = datatypes.UNSIGNED32
+        var.access_type = "rw"
+        var.unit = "mm"
+        var.default = 5
+        variables.append(var)
+    return variables
+
+
+def create_od() -> canopen.ObjectDictionary:
+    od = canopen.ObjectDictionary()
+    for i in range(VARIABLES // 10):
+        index = 0x2000 + i
+        record = ODRecord(f"Record {i}", index)
+        count = ODVariable("Highest sub-index supported", index, 0)
+        count.data_type = datatypes.UNSIGNED8
+        count.access_type = "ro"
+        count.default = 9
+        record.add_member(count)
+        for subindex in range(1, 10):
+            var = ODVariable(f"Parameter {subindex}", index, subindex)
+            var.data_type = datatypes.UNSIGNED32
+            var.access_type = "rw"
+            var.unit = "mm"
+            var.default = subindex
+            var.pdo_mappable = True
+            record.add_member(var)
+        od.add_object(record)
+    return od
+
+
+def main():
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.eds")
+        canopen.export_od(create_od(), path)
+        for name, create in [
+            ("parsed EDS file", lambda: eds.import_eds_fast(path, 2)),
+            ("bare ODVariable", lambda: create_variables(ODVariable)),
+            ("bare variable with __dict__", lambda: create_variables(DictVariable)),
+        ]:
+            count, allocated = measure(create)
+            print(f"{name}: {allocated / count * 10000:.2f} MiB per 10k variables")
+
+
+if __name__ == "__main__":
+    main()
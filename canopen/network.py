@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import threading
-from collections.abc import Iterator, MutableMapping
+from collections.abc import Iterable, Iterator, MutableMapping
 from typing import Callable, Final, Optional, Union
 
 import can
@@ -12,6 +12,9 @@ from canopen.nmt import NmtMaster
 from canopen.node import LocalNode, RemoteNode
 from canopen.objectdictionary import ObjectDictionary
 from canopen.objectdictionary.eds import import_from_node
+from canopen.pdo import PdoMap, PdoWaiter
+from canopen.sdo.bulk import BulkItem, BulkResult, BulkTransfer
+from canopen.sdo.scheduler import SdoScheduler
 from canopen.sync import SyncProducer
 from canopen.timestamp import TimeProducer
 
@@ -44,6 +47,9 @@ class Network(MutableMapping):
         self.nodes: dict[int, Union[RemoteNode, LocalNode]] = {}
         self.subscribers: dict[int, list[Callback]] = {}
         self.send_lock = threading.Lock()
+        #: A :class:`~canopen.sdo.scheduler.SdoScheduler` limiting the SDO
+        #: traffic of all remote nodes, or ``None``
+        self.sdo_scheduler: Optional[SdoScheduler] = None
         self.sync = SyncProducer(self)
         self.time = TimeProducer(self)
         self.nmt = NmtMaster(0)
@@ -214,6 +220,37 @@ class Network(MutableMapping):
             self.bus.send(msg)
         self.check()
 
+    def send_messages(self, can_id: int, frames: Iterable[bytes]) -> None:
+        """Send several raw CAN messages with the same CAN-ID in a row.
+
+        The messages are prepared first and sent while holding the lock only
+        once, so they follow each other as closely as possible.  Without a
+        python-can bus, :meth:`send_message` is called for each one instead,
+        for custom backends which only provide that.  A subclass which
+        overrides :meth:`send_message` while still using a python-can bus
+        should override this method as well.
+
+        :param can_id:
+            CAN-ID of the messages
+        :param frames:
+            Data of each message
+
+        :raises can.CanError:
+            When a message fails to be transmitted
+        """
+        if not isinstance(self.bus, can.BusABC):
+            for data in frames:
+                self.send_message(can_id, data)
+            return
+        msgs = [can.Message(is_extended_id=can_id > 0x7FF,
+                            arbitration_id=can_id,
+                            data=data)
+                for data in frames]
+        with self.send_lock:
+            for msg in msgs:
+                self.bus.send(msg)
+        self.check()
+
     def send_periodic(
         self, can_id: int, data: bytes, period: float, remote: bool = False
     ) -> PeriodicMessageTask:
@@ -252,6 +289,94 @@ class Network(MutableMapping):
                 callback(can_id, data, timestamp)
         self.scanner.on_message_received(can_id)
 
+    def wait_for_any_pdo(
+        self, maps: Iterable[PdoMap], timeout: float = 10
+    ) -> dict[PdoMap, float]:
+        """Wait for the next reception of any of the given PDO maps.
+
+        :param maps: The PDO maps to wait for.
+        :param timeout: Max time to wait in seconds.
+        :return:
+            Timestamps of the received maps, usually only one.  Empty on timeout.
+        """
+        with PdoWaiter(maps) as waiter:
+            waiter.wait(1, timeout)
+        return waiter.received
+
+    def wait_for_all_pdos(
+        self, maps: Iterable[PdoMap], timeout: float = 10
+    ) -> dict[PdoMap, float]:
+        """Wait for the next reception of each of the given PDO maps.
+
+        :param maps: The PDO maps to wait for.
+        :param timeout: Max time to wait in seconds for the whole set.
+        :return:
+            Timestamps of the received maps.  Incomplete on timeout.
+        """
+        with PdoWaiter(maps) as waiter:
+            waiter.wait(None, timeout)
+        return waiter.received
+
+    def synchronous_tpdos(self) -> list[PdoMap]:
+        """List the TPDOs expected to be transmitted after each SYNC.
+
+        These are the enabled TPDOs of all remote nodes with transmission
+        type 1.  Types 2 - 240 are left out, as they are only sent after every
+        2nd to 240th SYNC, counted by each node on its own.
+        """
+        return [
+            pdo_map
+            for node in self.nodes.values() if isinstance(node, RemoteNode)
+            for pdo_map in node.tpdo.map.values()
+            if pdo_map.enabled and pdo_map.cob_id and pdo_map.trans_type == 1
+        ]
+
+    def wait_for_sync_pdos(self, timeout: float = 10) -> dict[PdoMap, float]:
+        """Wait for all synchronous TPDOs following the next SYNC message.
+
+        See :meth:`synchronous_tpdos` for which maps are considered.
+
+        :param timeout: Max time to wait in seconds, including the SYNC.
+        :return:
+            Timestamps of the received maps.  Incomplete on timeout.
+        """
+        with PdoWaiter(self.synchronous_tpdos(), armed=False) as waiter:
+            self.subscribe(self.sync.cob_id, waiter.on_sync)
+            try:
+                waiter.wait(None, timeout)
+            finally:
+                self.unsubscribe(self.sync.cob_id, waiter.on_sync)
+        return waiter.received
+
+    def sdo_bulk(self, items: Iterable[tuple]) -> list[BulkResult]:
+        """Perform SDO transfers on many nodes concurrently.
+
+        Every item is a tuple ``(node, index, subindex)`` for an upload or
+        ``(node, index, subindex, data)`` for a download, where ``node`` is a
+        node ID or a node object, and ``index`` and ``subindex`` may also be
+        given by name.  The items of one node are transferred in order on its
+        default SDO channel, while all nodes proceed in parallel.
+
+        Errors do not interrupt the other transfers, but are returned in place
+        of the item's result.
+
+        :param items: The transfers to perform.
+        :return:
+            Per item the uploaded bytes, ``None`` for a successful download,
+            or the exception raised by the transfer.
+        """
+        bulk_items = []
+        for node, index, subindex, *data in items:
+            if isinstance(node, int):
+                node = self[node]
+            if isinstance(index, str) or isinstance(subindex, str):
+                var = node.object_dictionary.get_variable(index, subindex)
+                if var is None:
+                    raise KeyError(f"{index!r}, {subindex!r} not found in Object Dictionary")
+                index, subindex = var.index, var.subindex
+            bulk_items.append(BulkItem(node.sdo, index, subindex, *data))
+        return BulkTransfer(bulk_items).run()
+
     def check(self) -> None:
         """Check that no fatal error has occurred in the receiving thread.
 
@@ -120,6 +120,9 @@ class NmtMaster(NmtBase):
         self._callbacks: list[Callable[[int], None]] = []
 
     def on_heartbeat(self, can_id, data, timestamp):
+        if not data:
+            logger.debug("Ignoring empty heartbeat message on can-id %d", can_id)
+            return
         new_state, = struct.unpack_from("B", data)
         # Mask out toggle bit
         new_state &= 0x7F
@@ -2,6 +2,7 @@ from typing import TextIO, Union
 
 import canopen.network
 from canopen.objectdictionary import ObjectDictionary, import_od
+from canopen.objectdictionary.template import ObjectDictionaryTemplate
 
 
 class BaseNode:
@@ -10,18 +11,22 @@ class BaseNode:
     :param node_id:
         Node ID (set to 0 if specified by object dictionary)
     :param object_dictionary:
-        Object dictionary as either a path to a file, an ``ObjectDictionary``
-        or a file like object.
+        Object dictionary as either a path to a file, an ``ObjectDictionary``,
+        an ``ObjectDictionaryTemplate`` or a file like object.
     """
 
     def __init__(
         self,
         node_id: int,
-        object_dictionary: Union[ObjectDictionary, str, TextIO],
+        object_dictionary: Union[ObjectDictionary, ObjectDictionaryTemplate, str, TextIO],
     ):
         self.network: canopen.network.Network = canopen.network._UNINITIALIZED_NETWORK
 
-        if not isinstance(object_dictionary, ObjectDictionary):
+        if isinstance(object_dictionary, ObjectDictionaryTemplate):
+            if not node_id:
+                raise ValueError("A node ID is required to use a template")
+            object_dictionary = object_dictionary.for_node(node_id)
+        elif not isinstance(object_dictionary, ObjectDictionary):
             object_dictionary = import_od(object_dictionary, node_id)
         self.object_dictionary = object_dictionary
 
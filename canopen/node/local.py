@@ -1,22 +1,99 @@
 from __future__ import annotations
 
+import bisect
 import logging
 from collections.abc import Callable
-from typing import Union
+from concurrent.futures import Future
+from typing import Optional, Union
 
 import canopen.network
 from canopen import objectdictionary
 from canopen.emcy import EmcyProducer
 from canopen.nmt import NmtSlave
 from canopen.node.base import BaseNode
+from canopen.node.store import DataStore
 from canopen.objectdictionary import ObjectDictionary
 from canopen.pdo import PDO, RPDO, TPDO
 from canopen.sdo import SdoAbortedError, SdoServer
+from canopen.sdo.domain import BufferSource, DomainSink, DomainSource, as_source
 
 
 logger = logging.getLogger(__name__)
 
 
+def _then(future: Future, func: Callable) -> Future:
+    """Get a future for the result of *func* applied to the result of *future*.
+
+    If *func* returns a future itself, its result is passed on.
+    """
+    chained = Future()
+
+    def resolve(done: Future, func: Callable):
+        if chained.cancelled():
+            return
+        if done.cancelled():
+            chained.cancel()
+            return
+        try:
+            result = func(done.result())
+        except Exception as exc:
+            chained.set_exception(exc)
+            return
+        if isinstance(result, Future):
+            result.add_done_callback(lambda done: resolve(done, lambda value: value))
+        else:
+            chained.set_result(result)
+
+    future.add_done_callback(lambda done: resolve(done, func))
+    chained.add_done_callback(lambda chained: chained.cancelled() and future.cancel())
+    return chained
+
+
+class _CallbackIndex:
+    """Callbacks registered for all objects or for ranges of indices.
+
+    The interval boundaries are kept sorted, with the callbacks covering each
+    interval in registration order.  Lookups are memoized per index.
+    """
+
+    def __init__(self):
+        #: Callbacks for all objects, in registration order
+        self.catch_all: list[Callable] = []
+        self._ranges: list[tuple[int, int, Callable]] = []
+        self._bounds: list[int] = []
+        self._intervals: list[tuple[Callable, ...]] = []
+        self._cache: dict[int, tuple[Callable, ...]] = {}
+
+    def add(self, callback: Callable, index: Union[int, range, None] = None):
+        if index is None:
+            self.catch_all.append(callback)
+            start, stop = 0, 0x10000
+        elif isinstance(index, range):
+            if index.step != 1:
+                raise ValueError("Index ranges must be contiguous")
+            start, stop = index.start, index.stop
+        else:
+            start, stop = index, index + 1
+        self._ranges.append((start, stop, callback))
+        self._bounds = sorted({bound for low, high, _ in self._ranges
+                               for bound in (low, high)})
+        self._intervals = [
+            tuple(func for low, high, func in self._ranges if low <= bound < high)
+            for bound in self._bounds
+        ]
+        self._cache.clear()
+
+    def lookup(self, index: int) -> tuple[Callable, ...]:
+        """Get the callbacks to call for an index."""
+        try:
+            return self._cache[index]
+        except KeyError:
+            pos = bisect.bisect_right(self._bounds, index) - 1
+            callbacks = self._intervals[pos] if pos >= 0 else ()
+            self._cache[index] = callbacks
+            return callbacks
+
+
 class LocalNode(BaseNode):
     """Local CANopen node implementing essential communication services.
 
@@ -41,9 +118,14 @@ class LocalNode(BaseNode):
     ):
         super(LocalNode, self).__init__(node_id, object_dictionary)
 
-        self.data_store: dict[int, dict[int, bytes]] = {}
-        self._read_callbacks: list[Callable] = []
-        self._write_callbacks: list[Callable] = []
+        #: Values of the objects, see :class:`~canopen.node.store.DataStore`
+        self.data_store = DataStore(self.object_dictionary)
+        self._read_index = _CallbackIndex()
+        self._write_index = _CallbackIndex()
+        self._read_callbacks: list[Callable] = self._read_index.catch_all
+        self._write_callbacks: list[Callable] = self._write_index.catch_all
+        self._domain_sources: dict[tuple[int, int], object] = {}
+        self._domain_sinks: dict[tuple[int, int], Callable[[], DomainSink]] = {}
 
         self.sdo = SdoServer(0x600 + self.id, 0x580 + self.id, self)
         self.tpdo = TPDO(self)
@@ -51,7 +133,7 @@ class LocalNode(BaseNode):
         self.pdo = PDO(self, self.rpdo, self.tpdo)
         self.nmt = NmtSlave(self.id, self)
         # Let self.nmt handle writes for 0x1017
-        self.add_write_callback(self.nmt.on_write)
+        self.add_write_callback(self.nmt.on_write, index=0x1017)
         self.emcy = EmcyProducer(0x80 + self.id)
 
     def associate_network(self, network: canopen.network.Network):
@@ -78,36 +160,159 @@ class LocalNode(BaseNode):
         self.nmt.network = canopen.network._UNINITIALIZED_NETWORK
         self.emcy.network = canopen.network._UNINITIALIZED_NETWORK
 
-    def add_read_callback(self, callback: Callable):
-        self._read_callbacks.append(callback)
+    def add_read_callback(
+        self, callback: Callable, index: Union[int, range, None] = None
+    ):
+        """Add a callback providing the data of objects to read.
+
+        It is called with the keyword arguments *index*, *subindex* and *od*
+        and returns the value, or ``None`` to leave it to the next callback or
+        the data store.
 
-    def add_write_callback(self, callback: Callable):
-        self._write_callbacks.append(callback)
+        :param callback:
+            Function to call.
+        :param index:
+            Only call it for this index or range of indices, for example
+            ``range(0x2000, 0x3000)``, instead of for all objects.
+        """
+        self._read_index.add(callback, index)
+
+    def add_write_callback(
+        self, callback: Callable, index: Union[int, range, None] = None
+    ):
+        """Add a callback receiving the data of objects written.
+
+        It is called with the keyword arguments *index*, *subindex*, *od* and
+        *data* before the data is stored.
+
+        :param callback:
+            Function to call.
+        :param index:
+            Only call it for this index or range of indices, for example
+            ``range(0x2000, 0x3000)``, instead of for all objects.
+        """
+        self._write_index.add(callback, index)
+
+    def set_domain_source(self, index: int, subindex: int, source) -> None:
+        """Provide the data of an object for uploads as a stream.
+
+        The data is read in small pieces during each upload, so large objects
+        like firmware images or log files need not be held in memory.
+
+        :param index:
+            Index of object.
+        :param subindex:
+            Sub-index of object.
+        :param source:
+            A bytes-like object, which is served without copying, or a
+            callable returning a binary file object, an iterable of bytes-like
+            chunks or a :class:`~canopen.sdo.domain.DomainSource` for every
+            upload.  ``None`` removes the source again.
+        """
+        if source is None:
+            self._domain_sources.pop((index, subindex), None)
+        else:
+            self._domain_sources[(index, subindex)] = source
+
+    def set_domain_sink(
+        self, index: int, subindex: int, factory: Optional[Callable[[], DomainSink]]
+    ) -> None:
+        """Receive the data of downloads to an object as a stream.
+
+        For each download, *factory* is called to get an object with
+        ``write(data)`` and ``close()`` methods, for example a binary file.
+        The data is written to it as segments arrive and it is closed when
+        the download is complete or aborted.  Such downloads bypass the data
+        store and the write callbacks.
+
+        :param index:
+            Index of object.
+        :param subindex:
+            Sub-index of object.
+        :param factory:
+            Callable returning a new sink, or ``None`` to remove it again.
+        """
+        if factory is None:
+            self._domain_sinks.pop((index, subindex), None)
+        else:
+            self._domain_sinks[(index, subindex)] = factory
+
+    def open_source(
+        self, index: int, subindex: int, check_readable: bool = False,
+        deferred: bool = False,
+    ) -> Union[DomainSource, Future]:
+        """Get the data of an object for an upload as a stream."""
+        source = self._domain_sources.get((index, subindex))
+        if source is None:
+            data = self.get_data(index, subindex, check_readable, deferred)
+            if isinstance(data, Future):
+                return _then(data, BufferSource)
+            return BufferSource(data)
+        if check_readable and not self._find_object(index, subindex).readable:
+            raise SdoAbortedError(0x06010001)
+        if callable(source):
+            source = source()
+        return as_source(source)
+
+    def open_sink(
+        self, index: int, subindex: int, check_writable: bool = False
+    ) -> Optional[DomainSink]:
+        """Get a stream for a download to an object, if one was registered."""
+        factory = self._domain_sinks.get((index, subindex))
+        if factory is None:
+            return None
+        if check_writable and not self._find_object(index, subindex).writable:
+            raise SdoAbortedError(0x06010002)
+        return factory()
 
     def get_data(
-        self, index: int, subindex: int, check_readable: bool = False
-    ) -> bytes:
+        self, index: int, subindex: int, check_readable: bool = False,
+        deferred: bool = False,
+    ) -> Union[bytes, Future]:
+        """Get the data of an object from the read callbacks or the data store.
+
+        Read callbacks may return a :class:`concurrent.futures.Future` to
+        provide the value later.
+
+        :param index:
+            Index of object.
+        :param subindex:
+            Sub-index of object.
+        :param check_readable:
+            Abort if the object is not readable.
+        :param deferred:
+            Return a future instead of waiting if a read callback returned one.
+        """
         obj = self._find_object(index, subindex)
 
         if check_readable and not obj.readable:
             raise SdoAbortedError(0x06010001)
 
+        data = self._read(obj, index, subindex, self._read_index.lookup(index))
+        if not deferred and isinstance(data, Future):
+            data = data.result()
+        return data
+
+    def _read(self, obj, index, subindex, callbacks) -> Union[bytes, Future]:
         # Try callback
-        for callback in self._read_callbacks:
+        for i, callback in enumerate(callbacks):
             result = callback(index=index, subindex=subindex, od=obj)
+            if isinstance(result, Future):
+                # Continue with the remaining callbacks if it resolves to None
+                remaining = callbacks[i + 1:]
+                return _then(result, lambda value: obj.encode_raw(value)
+                             if value is not None
+                             else self._read(obj, index, subindex, remaining))
             if result is not None:
                 return obj.encode_raw(result)
 
         # Try stored data
-        try:
-            return self.data_store[index][subindex]
-        except KeyError:
-            # Try ParameterValue in EDS
-            if obj.value is not None:
-                return obj.encode_raw(obj.value)
-            # Try default value
-            if obj.default is not None:
-                return obj.encode_raw(obj.default)
+        data = self.data_store.get(index, subindex)
+        if data is None:
+            # Try ParameterValue in EDS, or else the default value
+            data = self.data_store.initial(obj)
+        if data is not None:
+            return data
 
         # Resource not available
         logger.info("Resource unavailable for 0x%04X:%02X", index, subindex)
@@ -119,7 +324,25 @@ class LocalNode(BaseNode):
         subindex: int,
         data: bytes,
         check_writable: bool = False,
-    ) -> None:
+        deferred: bool = False,
+    ) -> Optional[Future]:
+        """Pass the data of an object to the write callbacks and the data store.
+
+        Write callbacks may return a :class:`concurrent.futures.Future` to
+        complete the write later.  The remaining callbacks and the data store
+        follow once it is done.
+
+        :param index:
+            Index of object.
+        :param subindex:
+            Sub-index of object.
+        :param data:
+            Data to be written.
+        :param check_writable:
+            Abort if the object is not writable.
+        :param deferred:
+            Return a future instead of waiting if a write callback returned one.
+        """
         obj = self._find_object(index, subindex)
 
         if check_writable and not obj.writable:
@@ -131,13 +354,22 @@ class LocalNode(BaseNode):
         ):
             raise SdoAbortedError(0x06070010)
 
+        result = self._write(obj, index, subindex, data, self._write_index.lookup(index))
+        if not deferred and isinstance(result, Future):
+            result = result.result()
+        return result
+
+    def _write(self, obj, index, subindex, data, callbacks) -> Optional[Future]:
         # Try callbacks
-        for callback in self._write_callbacks:
-            callback(index=index, subindex=subindex, od=obj, data=data)
+        for i, callback in enumerate(callbacks):
+            result = callback(index=index, subindex=subindex, od=obj, data=data)
+            if isinstance(result, Future):
+                remaining = callbacks[i + 1:]
+                return _then(result, lambda _: self._write(
+                    obj, index, subindex, data, remaining))
 
         # Store data
-        self.data_store.setdefault(index, {})
-        self.data_store[index][subindex] = bytes(data)
+        self.data_store.set(index, subindex, data)
 
     def _find_object(self, index, subindex):
         if index not in self.object_dictionary:
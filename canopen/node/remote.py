@@ -7,9 +7,10 @@ import canopen.network
 from canopen.emcy import EmcyConsumer
 from canopen.nmt import NmtMaster
 from canopen.node.base import BaseNode
-from canopen.objectdictionary import ODArray, ODRecord, ODVariable, ObjectDictionary
+from canopen.objectdictionary import ODArray, ODRecord, ObjectDictionary
 from canopen.pdo import PDO, RPDO, TPDO
 from canopen.sdo import SdoAbortedError, SdoClient, SdoCommunicationError
+from canopen.sdo.pool import SdoPool
 
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,8 @@ class RemoteNode(BaseNode):
 
         self.sdo_channels: list[SdoClient] = []
         self.sdo = self.add_sdo(0x600 + self.id, 0x580 + self.id)
+        #: Pool sharing all SDO channels between concurrent transfers
+        self.sdo_pool = SdoPool(self.sdo_channels)
         self.tpdo = TPDO(self)
         self.rpdo = RPDO(self)
         self.pdo = PDO(self, self.rpdo, self.tpdo)
@@ -54,12 +57,12 @@ class RemoteNode(BaseNode):
         if self.has_network():
             raise RuntimeError("Node is already associated with a network")
         self.network = network
-        self.sdo.network = network
         self.pdo.network = network
         self.tpdo.network = network
         self.rpdo.network = network
         self.nmt.network = network
         for sdo in self.sdo_channels:
+            sdo.network = network
             network.subscribe(sdo.tx_cobid, sdo.on_response)
         network.subscribe(0x700 + self.id, self.nmt.on_heartbeat)
         network.subscribe(0x80 + self.id, self.emcy.on_emcy)
@@ -70,11 +73,11 @@ class RemoteNode(BaseNode):
             return
         for sdo in self.sdo_channels:
             self.network.unsubscribe(sdo.tx_cobid, sdo.on_response)
+            sdo.network = canopen.network._UNINITIALIZED_NETWORK
         self.network.unsubscribe(0x700 + self.id, self.nmt.on_heartbeat)
         self.network.unsubscribe(0x80 + self.id, self.emcy.on_emcy)
         self.network.unsubscribe(0, self.nmt.on_command)
         self.network = canopen.network._UNINITIALIZED_NETWORK
-        self.sdo.network = canopen.network._UNINITIALIZED_NETWORK
         self.pdo.network = canopen.network._UNINITIALIZED_NETWORK
         self.tpdo.network = canopen.network._UNINITIALIZED_NETWORK
         self.rpdo.network = canopen.network._UNINITIALIZED_NETWORK
@@ -83,7 +86,8 @@ class RemoteNode(BaseNode):
     def add_sdo(self, rx_cobid, tx_cobid):
         """Add an additional SDO channel.
 
-        The SDO client will be added to :attr:`sdo_channels`.
+        The SDO client will be added to :attr:`sdo_channels` and becomes
+        available for transfers through :attr:`sdo_pool`.
 
         :param int rx_cobid:
             COB-ID that the server receives on
@@ -96,6 +100,7 @@ class RemoteNode(BaseNode):
         client = SdoClient(rx_cobid, tx_cobid, self.object_dictionary)
         self.sdo_channels.append(client)
         if self.has_network():
+            client.network = self.network
             self.network.subscribe(client.tx_cobid, client.on_response)
         return client
 
@@ -120,6 +125,8 @@ class RemoteNode(BaseNode):
             4 - 127 = Manufacturer specific
         """
         self.sdo.download(0x1011, subindex, b"load")
+        if self.sdo.cache is not None:
+            self.sdo.cache.invalidate()
 
     def __load_configuration_helper(self, index, subindex, name, value):
         """Helper function to send SDOs to the remote node
@@ -164,13 +171,9 @@ class RemoteNode(BaseNode):
         self.pdo.save()
 
         # Now apply all other records in object dictionary
-        for obj in self.object_dictionary.values():
-            if 0x1400 <= obj.index < 0x1c00:
+        for var in self.object_dictionary.variables(writable=True, has_value=True):
+            if 0x1400 <= var.index < 0x1c00:
                 # Ignore PDO related objects
                 continue
-            if isinstance(obj, ODRecord) or isinstance(obj, ODArray):
-                for subobj in obj.values():
-                    if isinstance(subobj, ODVariable) and subobj.writable and (subobj.value is not None):
-                        self.__load_configuration_helper(subobj.index, subobj.subindex, subobj.name, subobj.value)
-            elif isinstance(obj, ODVariable) and obj.writable and (obj.value is not None):
-                self.__load_configuration_helper(obj.index, None, obj.name, obj.value)
+            subindex = var.subindex if isinstance(var.parent, (ODRecord, ODArray)) else None
+            self.__load_configuration_helper(var.index, subindex, var.name, var.value)
@@ -0,0 +1,135 @@
+"""Storage of object values for local nodes."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator, MutableMapping
+from typing import NamedTuple, Optional
+
+from canopen.objectdictionary import ObjectDictionary, ODVariable
+
+
+logger = logging.getLogger(__name__)
+
+# Values of an index with nothing written, never modified
+_NOTHING: dict[int, bytes] = {}
+
+
+class DataStoreSnapshot(NamedTuple):
+    """Copy of all values in a :class:`DataStore` at one point in time."""
+
+    #: Written values by index and sub-index
+    values: dict[int, dict[int, bytes]]
+
+
+class _Layout:
+    """Encoded initial values of the objects in an object dictionary.
+
+    Created once per object dictionary and shared by all stores using it.
+    """
+
+    def __init__(self):
+        # Source value, data type and encoded data by index and sub-index
+        self.initial: dict[tuple[int, int], tuple[object, int, bytes]] = {}
+
+    @classmethod
+    def of(cls, od: ObjectDictionary) -> _Layout:
+        layout = od._data_layout
+        if layout is None:
+            layout = od._data_layout = cls()
+        return layout
+
+
+class DataStore(MutableMapping):
+    """Values of a local node's objects.
+
+    Only written values are kept, in a ``dict`` of ``dict`` by index and
+    sub-index, so unused objects take no memory.  Objects which have not been
+    written take the value or default value from the object dictionary.  Those
+    are encoded once per object dictionary and shared by all nodes using it,
+    and encoded again only after the value in the object dictionary changes.
+
+    :param od:
+        Object dictionary to take initial values from.
+    """
+
+    def __init__(self, od: ObjectDictionary):
+        self._layout = _Layout.of(od)
+        self._values: dict[int, dict[int, bytes]] = {}
+
+    def get(self, index: int, subindex: int) -> Optional[bytes]:
+        """Get the written value of an object.
+
+        :return: The data, or ``None`` if not written.
+        """
+        return self._values.get(index, _NOTHING).get(subindex)
+
+    def set(self, index: int, subindex: int, data: bytes) -> None:
+        """Store the value of an object."""
+        values = self._values.get(index)
+        if values is None:
+            values = self._values[index] = {}
+        values[subindex] = bytes(data)
+
+    def initial(self, var: ODVariable) -> Optional[bytes]:
+        """Get the encoded value, or else the default value, of a variable
+        from the object dictionary.
+
+        :return: The data, or ``None`` if the variable has neither.
+        """
+        value = var.value
+        if value is None:
+            value = var.default
+            if value is None:
+                return None
+        key = (var.index, var.subindex)
+        entry = self._layout.initial.get(key)
+        if entry is not None and entry[0] is value and entry[1] == var.data_type:
+            return entry[2]
+        data = var.encode_raw(value)
+        self._layout.initial[key] = (value, var.data_type, data)
+        return data
+
+    def snapshot(self) -> DataStoreSnapshot:
+        """Copy all values, for example to restore them after a test run."""
+        return DataStoreSnapshot({index: dict(values)
+                                  for index, values in self._values.items()})
+
+    def restore(self, snapshot: Optional[DataStoreSnapshot] = None) -> None:
+        """Restore all values from a snapshot.
+
+        :param snapshot:
+            A snapshot of this store, or ``None`` to forget all written
+            values.
+        """
+        if snapshot is None:
+            self._values = {}
+        else:
+            self._values = {index: dict(values)
+                            for index, values in snapshot.values.items()}
+
+    # Mapping of written values by index, like a dict of dict
+
+    def __getitem__(self, index: int) -> dict[int, bytes]:
+        return self._values[index]
+
+    def __setitem__(self, index: int, values: dict[int, bytes]) -> None:
+        self._values[index] = values
+
+    def __delitem__(self, index: int) -> None:
+        del self._values[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, index) -> bool:
+        return index in self._values
+
+    def setdefault(self, index: int, default=None) -> dict[int, bytes]:
+        values = self._values.get(index)
+        if values is None:
+            values = self._values[index] = {} if default is None else default
+        return values
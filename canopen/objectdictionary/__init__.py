@@ -4,15 +4,20 @@ Object Dictionary module
 
 from __future__ import annotations
 
+import bisect
 import logging
+import os
 import struct
-from collections.abc import Collection, Iterator, Mapping, MutableMapping
-from typing import Optional, TextIO, Union
+from collections.abc import Collection, Iterable, Iterator, Mapping, MutableMapping
+from typing import TYPE_CHECKING, NamedTuple, Optional, TextIO, Union
 
 from canopen.objectdictionary.datatypes import *
 from canopen.objectdictionary.datatypes import IntegerN, UnsignedN
 from canopen.utils import pretty_index
 
+if TYPE_CHECKING:
+    from canopen.objectdictionary.cache import ObjectDictionaryCache
+
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +80,7 @@ def export_od(
 def import_od(
     source: Union[str, TextIO, None],
     node_id: Optional[int] = None,
+    cache: Optional[ObjectDictionaryCache] = None,
 ) -> ObjectDictionary:
     """Parse an EDS, DCF, or EPF file.
 
@@ -83,6 +89,9 @@ def import_od(
     :param node_id:
         For EDS and DCF files, the node ID to use.
         For other formats, this parameter is ignored.
+    :param cache:
+        Cache to load files given by path from, see
+        :class:`~canopen.objectdictionary.cache.ObjectDictionaryCache`.
     :raises ObjectDictionaryError:
         For object dictionary errors and inconsistencies.
     :raises ValueError:
@@ -90,6 +99,8 @@ def import_od(
     """
     if source is None:
         return ObjectDictionary()
+    if cache is not None and isinstance(source, (str, os.PathLike)):
+        return cache.load(source, node_id)
     if hasattr(source, "read"):
         # File like object
         filename = source.name
@@ -102,7 +113,7 @@ def import_od(
     suffix = filename[filename.rfind("."):].lower()
     if suffix in (".eds", ".dcf"):
         from canopen.objectdictionary import eds
-        return eds.import_eds(source, node_id)
+        return eds.import_eds_fast(source, node_id)
     elif suffix == ".epf":
         from canopen.objectdictionary import epf
         return epf.import_epf(source)
@@ -115,12 +126,46 @@ def import_od(
         )
 
 
+class _VariableIndex(NamedTuple):
+    """Variables of an object dictionary in order, grouped by properties."""
+
+    all: tuple[ODVariable, ...]
+    pdo_mappable: tuple[ODVariable, ...]
+    writable: tuple[ODVariable, ...]
+    has_value: tuple[ODVariable, ...]
+
+    @classmethod
+    def of(cls, objects: Iterable[Union[ODArray, ODRecord, ODVariable]]) -> _VariableIndex:
+        variables = []
+        for obj in objects:
+            if isinstance(obj, ODVariable):
+                variables.append(obj)
+            else:
+                variables.extend(obj.values())
+        return cls(
+            tuple(variables),
+            tuple(var for var in variables if var.pdo_mappable),
+            tuple(var for var in variables if var.writable),
+            tuple(var for var in variables if var.value is not None),
+        )
+
+
 class ObjectDictionary(MutableMapping):
     """Representation of the object dictionary as a Python dictionary."""
 
     def __init__(self):
         self.indices = {}
         self.names = {}
+        # All indices in ascending order, kept up to date on changes
+        self._sorted: list[int] = []
+        # Snapshot of _sorted to iterate over, created when needed
+        self._order: Optional[tuple[int, ...]] = None
+        # Secondary indexes of variables, created when needed
+        self._variables: Optional[_VariableIndex] = None
+        # Increased on every change of the objects or their members
+        self._version = 0
+        # Encoded initial values shared by local nodes, see canopen.node.store
+        self._data_layout = None
         self.comments = ""
         #: Default bitrate if specified by file
         self.bitrate: Optional[int] = None
@@ -153,12 +198,18 @@ class ObjectDictionary(MutableMapping):
         obj = self[index]
         del self.indices[obj.index]
         del self.names[obj.name]
+        pos = bisect.bisect_left(self._sorted, obj.index)
+        if pos < len(self._sorted) and self._sorted[pos] == obj.index:
+            del self._sorted[pos]
+        self._changed()
 
     def __iter__(self) -> Iterator[int]:
-        return iter(sorted(self.indices))
+        if self._order is None:
+            self._order = tuple(self._sorted)
+        return iter(self._order)
 
     def __len__(self) -> int:
-        return len(self.indices)
+        return len(self._sorted_indices())
 
     def __contains__(self, index: object) -> bool:
         return index in self.names or index in self.indices
@@ -175,6 +226,10 @@ class ObjectDictionary(MutableMapping):
         obj.parent = self
         self.indices[obj.index] = obj
         self.names[obj.name] = obj
+        pos = bisect.bisect_left(self._sorted, obj.index)
+        if pos == len(self._sorted) or self._sorted[pos] != obj.index:
+            self._sorted.insert(pos, obj.index)
+        self._changed()
 
     def get_variable(
         self, index: Union[int, str], subindex: int = 0
@@ -190,6 +245,74 @@ class ObjectDictionary(MutableMapping):
             return obj.get(subindex)
         return None
 
+    def index_range(
+        self, first: int, last: int
+    ) -> list[Union[ODArray, ODRecord, ODVariable]]:
+        """Get the objects within a range of indices, e.g. ``0x6000`` to
+        ``0x67FF`` for a device profile.
+
+        :param first: Lowest index to include
+        :param last: Highest index to include
+        :return: Objects in order of index
+        """
+        indices = self._sorted_indices()
+        start = bisect.bisect_left(indices, first)
+        stop = bisect.bisect_right(indices, last)
+        return [self[index] for index in indices[start:stop]]
+
+    def variables(
+        self,
+        pdo_mappable: Optional[bool] = None,
+        writable: Optional[bool] = None,
+        has_value: Optional[bool] = None,
+    ) -> list[ODVariable]:
+        """Get the variables, including members of records and arrays, in
+        order of index and subindex.
+
+        The variables are indexed by these properties on first use.  The
+        indexes are created again after objects or members are added or
+        removed, or any of these properties of a variable is changed.
+
+        :param pdo_mappable: Only variables which can be mapped to PDOs if true,
+            or cannot if false
+        :param writable: Only writable variables if true, or read-only if false
+        :param has_value: Only variables with a
+            :attr:`~canopen.objectdictionary.ODVariable.value` if true, or
+            without if false
+        """
+        index = self._variable_index()
+        # Start with the smallest selection possible
+        if pdo_mappable:
+            selection = index.pdo_mappable
+        elif writable:
+            selection = index.writable
+        elif has_value:
+            selection = index.has_value
+        else:
+            selection = index.all
+        return [
+            var for var in selection
+            if (pdo_mappable is None or bool(var.pdo_mappable) == pdo_mappable)
+            and (writable is None or var.writable == writable)
+            and (has_value is None or (var.value is not None) == has_value)
+        ]
+
+    def _sorted_indices(self) -> list[int]:
+        return self._sorted
+
+    def _variable_index(self) -> _VariableIndex:
+        if self._variables is None:
+            self._variables = _VariableIndex.of(self.values())
+        return self._variables
+
+    def _changed(self) -> None:
+        self._order = None
+        self._variables = None
+        self._version += 1
+
+    def _variables_changed(self) -> None:
+        self._variables = None
+
 
 class ODRecord(MutableMapping):
     """Groups multiple :class:`~canopen.objectdictionary.ODVariable` objects using
@@ -228,6 +351,8 @@ class ODRecord(MutableMapping):
         var = self[subindex]
         del self.subindices[var.subindex]
         del self.names[var.name]
+        if self.parent is not None:
+            self.parent._changed()
 
     def __len__(self) -> int:
         return len(self.subindices)
@@ -248,6 +373,8 @@ class ODRecord(MutableMapping):
         variable.parent = self
         self.subindices[variable.subindex] = variable
         self.names[variable.name] = variable
+        if self.parent is not None:
+            self.parent._changed()
 
 
 class ODArray(Mapping):
@@ -285,12 +412,12 @@ class ODArray(Mapping):
             template = self.subindices[1]
             name = f"{template.name}_{subindex:x}"
             var = ODVariable(name, self.index, subindex)
-            var.parent = self
             for attr in ("data_type", "unit", "factor", "min", "max", "default",
                          "access_type", "description", "value_descriptions",
                          "bit_definitions", "storage_location"):
-                if attr in template.__dict__:
-                    var.__dict__[attr] = template.__dict__[attr]
+                setattr(var, attr, getattr(template, attr))
+            # Not indexed in the object dictionary
+            var.parent = self
         else:
             raise KeyError(f"Could not find subindex {pretty_index(None, subindex)}")
         return var
@@ -311,10 +438,23 @@ class ODArray(Mapping):
         variable.parent = self
         self.subindices[variable.subindex] = variable
         self.names[variable.name] = variable
+        if self.parent is not None:
+            self.parent._changed()
 
 
 class ODVariable:
-    """Simple variable."""
+    """Simple variable.
+
+    Variables use slots to keep large object dictionaries compact, so
+    attributes other than the ones listed here cannot be added.
+    """
+
+    __slots__ = (
+        "parent", "index", "subindex", "name", "unit", "factor", "min", "max",
+        "default", "default_raw", "relative", "_value", "value_raw", "data_type",
+        "_access_type", "is_domain", "description", "_value_descriptions",
+        "_bit_definitions", "storage_location", "_pdo_mappable",
+    )
 
     STRUCT_TYPES: dict[int, struct.Struct] = {
         # Use struct module to pack/unpack data where possible and use the
@@ -361,26 +501,27 @@ class ODVariable:
         self.max: Optional[int] = None
         #: Default value at start-up
         self.default: Optional[int] = None
+        #: Default value as written in the file, if imported from one
+        self.default_raw: Optional[str] = None
         #: Is the default value relative to the node-ID (only applies to COB-IDs)
         self.relative = False
-        #: The value of this variable stored in the object dictionary
-        self.value: Optional[int] = None
+        self._value: Optional[int] = None
+        #: Parameter value as written in the file, if imported from one
+        self.value_raw: Optional[str] = None
         #: Data type according to the standard as an :class:`int`
         self.data_type: int = 0
-        #: Access type, should be "rw", "ro", "wo", or "const"
-        self.access_type: str = "rw"
+        self._access_type: str = "rw"
         #: The variable represents a DOMAIN ObjectType
         self.is_domain: bool = False
         #: Description of variable
         self.description: str = ""
-        #: Dictionary of value descriptions
-        self.value_descriptions: dict[int, str] = {}
-        #: Dictionary of bitfield definitions
-        self.bit_definitions: dict[str, list[int]] = {}
+        # Created on first use, see the value_descriptions and
+        # bit_definitions properties
+        self._value_descriptions: Optional[dict[int, str]] = None
+        self._bit_definitions: Optional[dict[str, list[int]]] = None
         #: Storage location of index
         self.storage_location: Optional[str] = None
-        #: Can this variable be mapped to a PDO
-        self.pdo_mappable = False
+        self._pdo_mappable = False
 
     def __repr__(self) -> str:
         subindex = self.subindex if isinstance(self.parent, (ODRecord, ODArray)) else None
@@ -406,6 +547,44 @@ class ODVariable:
         else:
             return 8
 
+    @property
+    def value(self) -> Optional[int]:
+        """The value of this variable stored in the object dictionary."""
+        return self._value
+
+    @value.setter
+    def value(self, value: Optional[int]) -> None:
+        self._value = value
+        self._indexed_changed()
+
+    @property
+    def access_type(self) -> str:
+        """Access type, should be "rw", "ro", "wo", or "const"."""
+        return self._access_type
+
+    @access_type.setter
+    def access_type(self, access_type: str) -> None:
+        self._access_type = access_type
+        self._indexed_changed()
+
+    @property
+    def pdo_mappable(self) -> bool:
+        """Can this variable be mapped to a PDO."""
+        return self._pdo_mappable
+
+    @pdo_mappable.setter
+    def pdo_mappable(self, pdo_mappable: bool) -> None:
+        self._pdo_mappable = pdo_mappable
+        self._indexed_changed()
+
+    def _indexed_changed(self) -> None:
+        # Let the object dictionary update its indexes of variables
+        parent = self.parent
+        if isinstance(parent, (ODRecord, ODArray)):
+            parent = parent.parent
+        if parent is not None:
+            parent._variables_changed()
+
     @property
     def writable(self) -> bool:
         return "w" in self.access_type
@@ -414,6 +593,34 @@ class ODVariable:
     def readable(self) -> bool:
         return "r" in self.access_type or self.access_type == "const"
 
+    @property
+    def value_descriptions(self) -> dict[int, str]:
+        """Dictionary of value descriptions.
+
+        Created on first use, so variables without any take no memory for it.
+        """
+        if self._value_descriptions is None:
+            self._value_descriptions = {}
+        return self._value_descriptions
+
+    @value_descriptions.setter
+    def value_descriptions(self, descriptions: dict[int, str]) -> None:
+        self._value_descriptions = descriptions
+
+    @property
+    def bit_definitions(self) -> dict[str, list[int]]:
+        """Dictionary of bitfield definitions.
+
+        Created on first use, so variables without any take no memory for it.
+        """
+        if self._bit_definitions is None:
+            self._bit_definitions = {}
+        return self._bit_definitions
+
+    @bit_definitions.setter
+    def bit_definitions(self, definitions: dict[str, list[int]]) -> None:
+        self._bit_definitions = definitions
+
     def add_value_description(self, value: int, descr: str) -> None:
         """Associate a value with a string description.
 
@@ -498,15 +705,15 @@ class ODVariable:
         return value
 
     def decode_desc(self, value: int) -> str:
-        if not self.value_descriptions:
+        if not self._value_descriptions:
             raise ObjectDictionaryError("No value descriptions exist")
-        elif (desc := self.value_descriptions.get(value)) is None:
+        elif (desc := self._value_descriptions.get(value)) is None:
             raise ObjectDictionaryError(
                 f"No value description exists for {value}")
         return desc
 
     def encode_desc(self, desc: str) -> int:
-        if not self.value_descriptions:
+        if not self._value_descriptions:
             raise ObjectDictionaryError("No value descriptions exist")
         else:
             for value, description in self.value_descriptions.items():
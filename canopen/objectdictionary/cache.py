@@ -0,0 +1,133 @@
+"""Persistent cache of parsed object dictionaries."""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import io
+import logging
+import os
+import pickle
+import tempfile
+from typing import Optional, Union
+
+from canopen.objectdictionary import ObjectDictionary, import_od
+
+
+logger = logging.getLogger(__name__)
+
+#: Version of the cache entries, to be increased when the object dictionary
+#: classes change in an incompatible way
+CACHE_VERSION = 7
+
+
+def _default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "canopen", "od")
+
+
+class ObjectDictionaryCache:
+    """Keeps parsed EDS and DCF files on disk to load them again quickly.
+
+    Entries are stored as pickles, keyed by a hash of the file contents, the
+    library version, :data:`CACHE_VERSION` and the node ID.  A changed file or
+    library therefore never hits a stale entry.  When an entry is added, older
+    entries for the same file path and node ID are removed.
+
+    Other file formats are imported without caching.
+
+    .. warning::
+       Loading a pickle can execute arbitrary code, so the directory must not
+       be writable by others.
+
+    :param directory:
+        Directory of the cache entries, by default ``canopen/od`` in the user's
+        cache directory.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike, None] = None):
+        #: Directory of the cache entries
+        self.directory = os.fspath(directory) if directory is not None else _default_directory()
+        #: Number of files loaded from the cache
+        self.hits = 0
+        #: Number of files which needed to be parsed
+        self.misses = 0
+
+    def load(self, path: Union[str, os.PathLike], node_id: Optional[int] = None) -> ObjectDictionary:
+        """Import an object dictionary file, using the cache if possible.
+
+        :param path:
+            Path to the file.
+        :param node_id:
+            The node ID to use, see :func:`~canopen.import_od`.
+        """
+        path = os.fspath(path)
+        name = os.path.basename(path)
+        if not name.lower().endswith((".eds", ".dcf")):
+            return import_od(path, node_id)
+        with open(path, "rb") as fp:
+            data = fp.read()
+        entry = self._entry(path, data, node_id)
+        try:
+            with open(entry, "rb") as fp:
+                od = pickle.load(fp)
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            logger.warning("Ignoring unreadable cache entry %s: %s", entry, exc)
+        else:
+            if isinstance(od, ObjectDictionary):
+                self.hits += 1
+                return od
+            logger.warning("Ignoring invalid cache entry %s", entry)
+        self.misses += 1
+        from canopen.objectdictionary import eds
+
+        # Decode like the parser does when opening the file itself
+        od = eds.import_eds_fast(io.TextIOWrapper(io.BytesIO(data)), node_id)
+        self._store(entry, od)
+        return od
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for entry in glob.glob(os.path.join(glob.escape(self.directory), "*.pickle")):
+            try:
+                os.remove(entry)
+            except OSError as exc:
+                logger.warning("Could not remove cache entry %s: %s", entry, exc)
+
+    def _entry(self, path: str, data: bytes, node_id: Optional[int]) -> str:
+        from canopen import __version__
+
+        # Files of the same name in different directories get their own entries
+        location = hashlib.sha256(os.path.realpath(path).encode(errors="surrogateescape"))
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{__version__}\0{CACHE_VERSION}\0{node_id}".encode())
+        name = os.path.basename(path)
+        return os.path.join(
+            self.directory,
+            f"{name}-{location.hexdigest()[:16]}-{node_id}-{digest.hexdigest()[:32]}.pickle")
+
+    def _store(self, entry: str, od: ObjectDictionary) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first, so readers never see a partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    pickle.dump(od, fp, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, entry)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        except (OSError, pickle.PicklingError) as exc:
+            logger.warning("Could not store cache entry %s: %s", entry, exc)
+            return
+        # Entries for previous contents of the file are stale now
+        prefix = entry[:entry.rfind("-") + 1]
+        for stale in glob.glob(glob.escape(prefix) + "*.pickle"):
+            if stale != entry:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
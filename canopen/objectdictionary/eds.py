@@ -3,7 +3,9 @@ from __future__ import annotations
 import copy
 import logging
 import re
-from configparser import NoOptionError, NoSectionError, RawConfigParser
+import sys
+from collections.abc import Mapping
+from configparser import NoOptionError, RawConfigParser
 from typing import Any, TYPE_CHECKING
 
 from canopen.objectdictionary import (
@@ -23,121 +25,220 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 def import_eds(source, node_id):
+    """Parse an EDS or DCF file with :mod:`configparser`.
+
+    :param source: The path to the file or a file like object
+    :param node_id: Node ID, or ``None`` to use the one of a DCF file
+    """
+    if hasattr(source, "read"):
+        sections = _read_config(source)
+    else:
+        with open(source) as fp:
+            sections = _read_config(fp)
+    return _build_od(sections, node_id)
+
+
+_HEX_DIGITS = "0123456789ABCDEFabcdef"
+
+_DUMMY_USAGE = frozenset(["DummyUsage", "Dummyusage", "dummyUsage", "dummyusage"])
+
+# Kinds of sections, see _classify_section()
+_SECTION_INDEX = 1
+_SECTION_SUBINDEX = 2
+_SECTION_NAMES = 3
+_SECTION_DUMMY_USAGE = 4
+
+_DEVICE_INFO_INT = [
+    ("VendorNumber", "vendor_number"),
+    ("ProductNumber", "product_number"),
+    ("RevisionNumber", "revision_number"),
+    ("NrOfRXPDO", "nr_of_RXPDO"),
+    ("NrOfTXPDO", "nr_of_TXPDO"),
+]
+_DEVICE_INFO_BOOL = [
+    ("SimpleBootUpMaster", "simple_boot_up_master"),
+    ("SimpleBootUpSlave", "simple_boot_up_slave"),
+    ("Granularity", "granularity"),
+    ("DynamicChannelsSupported", "dynamic_channels_supported"),
+    ("GroupMessaging", "group_messaging"),
+    ("LSS_Supported", "LSS_supported"),
+]
+_DEVICE_INFO_STR = [
+    ("VendorName", "vendor_name"),
+    ("ProductName", "product_name"),
+    ("OrderCode", "order_code"),
+]
+
+# Conversion of DefaultValue and ParameterValue for types other than integers
+_VALUE_CONVERTERS = {
+    datatypes.OCTET_STRING: bytes.fromhex,
+    datatypes.DOMAIN: bytes.fromhex,
+    datatypes.VISIBLE_STRING: str,
+    datatypes.UNICODE_STRING: str,
+    **{data_type: float for data_type in datatypes.FLOAT_TYPES},
+}
+
+
+class _UnsupportedSyntax(Exception):
+    """Raised for input which only configparser reads correctly."""
+
+
+def import_eds_fast(source, node_id):
+    """Parse an EDS or DCF file in a single pass.
+
+    Like :func:`import_eds`, but the file is split into sections by a
+    tokenizer specialized for EDS files instead of :mod:`configparser`.  Both
+    build the object dictionary the same way.  Unusual syntax, like values
+    continued on indented lines, is left to :mod:`configparser`, which also
+    reports syntax errors.
+
+    :param source: The path to the file or a file like object
+    :param node_id: Node ID, or ``None`` to use the one of a DCF file
+    """
+    if hasattr(source, "read"):
+        lines = source.readlines()
+        filename = getattr(source, "name", None)
+    else:
+        with open(source) as fp:
+            lines = fp.readlines()
+        filename = source
+    try:
+        sections = _read_sections(lines)
+    except _UnsupportedSyntax:
+        sections = _read_config(lines, filename)
+    return _build_od(sections, node_id)
+
+
+def _read_config(lines, filename=None) -> dict[str, dict[str, str]]:
+    """Split the lines into sections of options with RawConfigParser."""
     eds = RawConfigParser(inline_comment_prefixes=(';',))
     eds.optionxform = str
-    opened_here = False
+    eds.read_file(lines, filename)
+    return {name: dict(eds.items(name)) for name in eds.sections()}
+
+
+def _read_sections(lines: list[str]) -> dict[str, dict[str, str]]:
+    """Split the lines into sections of options, like RawConfigParser."""
+    sections: dict[str, dict[str, str]] = {}
+    options = None
+    for line in lines:
+        value = line.strip()
+        if not value or value[0] in "#;":
+            continue
+        if ";" in value:
+            # Inline comments start at the beginning or after whitespace
+            start = line.find(";")
+            while start > 0 and not line[start - 1].isspace():
+                start = line.find(";", start + 1)
+            if start != -1:
+                value = line[:start].strip()
+                if not value:
+                    continue
+        if line[0].isspace():
+            # Possibly a continuation line
+            raise _UnsupportedSyntax
+        if value[0] == "[" and (end := value.rfind("]")) > 1:
+            name = value[1:end]
+            if name in sections or name == "DEFAULT":
+                raise _UnsupportedSyntax
+            options = sections[name] = {}
+            continue
+        delimiter = value.find("=")
+        colon = value.find(":")
+        if colon != -1 and (delimiter == -1 or colon < delimiter):
+            delimiter = colon
+        if options is None or delimiter == -1:
+            raise _UnsupportedSyntax
+        option = value[:delimiter].rstrip()
+        if not option or option in options:
+            raise _UnsupportedSyntax
+        options[option] = value[delimiter + 1:].lstrip()
+    return sections
+
+
+def _classify_section(name: str) -> tuple[int, int, int]:
+    """Return the kind of section, with its index and subindex if any."""
+    if len(name) >= 4 and not name[:4].strip(_HEX_DIGITS):
+        index = int(name[:4], 16)
+        rest = name[4:]
+        if not rest:
+            return _SECTION_INDEX, index, 0
+        if (len(rest) > 3 and rest[0] in "S|s" and rest[1:3] == "ub"
+                and not rest[3:].strip(_HEX_DIGITS)):
+            return _SECTION_SUBINDEX, index, int(rest[3:], 16)
+        if rest.startswith("Name"):
+            return _SECTION_NAMES, index, 0
+    elif name in _DUMMY_USAGE:
+        return _SECTION_DUMMY_USAGE, 0, 0
+    return 0, 0, 0
+
+
+def _option(options: dict[str, str], section: str, option: str) -> str:
     try:
-        if hasattr(source, "read"):
-            fp = source
-        else:
-            fp = open(source)
-            opened_here = True
-        eds.read_file(fp)
-    finally:
-        # Only close object if opened in this fn
-        if opened_here:
-            fp.close()
+        return options[option]
+    except KeyError:
+        raise NoOptionError(option, section) from None
+
 
+def _build_od(sections: dict[str, dict[str, str]], node_id) -> ObjectDictionary:
+    """Create the object dictionary from the options of each section."""
     od = ObjectDictionary()
 
-    if eds.has_section("FileInfo"):
-        od.__edsFileInfo = {  # type: ignore[attr-defined] # custom addition
-            opt: eds.get("FileInfo", opt)
-            for opt in eds.options("FileInfo")
-        }
+    if (options := sections.get("FileInfo")) is not None:
+        od.__edsFileInfo = dict(options)  # type: ignore[attr-defined] # custom addition
 
-    if eds.has_section("Comments"):
-        linecount = int(eds.get("Comments", "Lines"), 0)
+    if (options := sections.get("Comments")) is not None:
+        linecount = int(_option(options, "Comments", "Lines"), 0)
         od.comments = '\n'.join([
-            eds.get("Comments", f"Line{line}")
+            _option(options, "Comments", f"Line{line}")
             for line in range(1, linecount + 1)
         ])
 
-    if not eds.has_section("DeviceInfo"):
-        logger.warn("eds file does not have a DeviceInfo section. This section is mandatory")
+    if (options := sections.get("DeviceInfo")) is None:
+        logger.warning("eds file does not have a DeviceInfo section. This section is mandatory")
     else:
+        info = od.device_information
         for rate in [10, 20, 50, 125, 250, 500, 800, 1000]:
-            baudPossible = int(
-                eds.get("DeviceInfo", f"BaudRate_{rate}", fallback='0'), 0)
-            if baudPossible != 0:
-                od.device_information.allowed_baudrates.add(rate*1000)
-
-        for t, eprop, odprop in [
-            (str, "VendorName", "vendor_name"),
-            (int, "VendorNumber", "vendor_number"),
-            (str, "ProductName", "product_name"),
-            (int, "ProductNumber", "product_number"),
-            (int, "RevisionNumber", "revision_number"),
-            (str, "OrderCode", "order_code"),
-            (bool, "SimpleBootUpMaster", "simple_boot_up_master"),
-            (bool, "SimpleBootUpSlave", "simple_boot_up_slave"),
-            (bool, "Granularity", "granularity"),
-            (bool, "DynamicChannelsSupported", "dynamic_channels_supported"),
-            (bool, "GroupMessaging", "group_messaging"),
-            (int, "NrOfRXPDO", "nr_of_RXPDO"),
-            (int, "NrOfTXPDO", "nr_of_TXPDO"),
-            (bool, "LSS_Supported", "LSS_supported"),
-        ]:
-            try:
-                if t in (int, bool):
-                    setattr(od.device_information, odprop,
-                            t(int(eds.get("DeviceInfo", eprop), 0))
-                            )
-                elif t is str:
-                    setattr(od.device_information, odprop,
-                            eds.get("DeviceInfo", eprop)
-                            )
-            except NoOptionError:
-                pass
-
-    if eds.has_section("DeviceComissioning"):
-        if val := eds.getint("DeviceComissioning", "Baudrate", fallback=None):
+            if int(options.get(f"BaudRate_{rate}", "0"), 0) != 0:
+                info.allowed_baudrates.add(rate*1000)
+        for eprop, odprop in _DEVICE_INFO_INT:
+            if (val := options.get(eprop)) is not None:
+                setattr(info, odprop, int(val, 0))
+        for eprop, odprop in _DEVICE_INFO_BOOL:
+            if (val := options.get(eprop)) is not None:
+                setattr(info, odprop, bool(int(val, 0)))
+        for eprop, odprop in _DEVICE_INFO_STR:
+            if (val := options.get(eprop)) is not None:
+                setattr(info, odprop, val)
+
+    if (options := sections.get("DeviceComissioning")) is not None:
+        if (val := options.get("Baudrate")) is not None and (val := int(val)):
             od.bitrate = val * 1000
-
         if node_id is None:
-            if val := eds.get("DeviceComissioning", "NodeID", fallback=None):
+            if val := options.get("NodeID"):
                 node_id = int(val, base=0)
         od.node_id = node_id
 
-    for section in eds.sections():
-        # Match dummy definitions
-        match = re.match(r"^[Dd]ummy[Uu]sage$", section)
-        if match is not None:
-            for i in range(1, 8):
-                key = f"Dummy{i:04d}"
-                if eds.getint(section, key) == 1:
-                    var = ODVariable(key, i, 0)
-                    var.data_type = i
-                    var.access_type = "const"
-                    od.add_object(var)
-
-        # Match indexes
-        match = re.match(r"^[0-9A-Fa-f]{4}$", section)
-        if match is not None:
-            index = int(section, 16)
-            name = eds.get(section, "ParameterName")
-            try:
-                object_type = int(eds.get(section, "ObjectType"), 0)
-            except NoOptionError:
-                # DS306 4.6.3.2 object description
-                # If the keyword ObjectType is missing, this is regarded as
-                # "ObjectType=0x7" (=VAR).
-                object_type = objectcodes.VAR
-            try:
-                storage_location = eds.get(section, "StorageLocation")
-            except NoOptionError:
-                storage_location = None
-
+    for section, options in sections.items():
+        kind, index, subindex = _classify_section(section)
+        if kind == _SECTION_INDEX:
+            name = _option(options, section, "ParameterName")
+            object_type = options.get("ObjectType")
+            # DS306 4.6.3.2 object description
+            # If the keyword ObjectType is missing, this is regarded as
+            # "ObjectType=0x7" (=VAR).
+            object_type = objectcodes.VAR if object_type is None else int(object_type, 0)
+            storage_location = options.get("StorageLocation")
             if object_type in (objectcodes.VAR, objectcodes.DOMAIN):
-                var = build_variable(eds, section, node_id, object_type, index)
-                od.add_object(var)
-            elif object_type == objectcodes.ARRAY and eds.has_option(section, "CompactSubObj"):
+                od.add_object(_build_variable(
+                    sections, section, options, node_id, object_type, index))
+            elif object_type == objectcodes.ARRAY and "CompactSubObj" in options:
                 arr = ODArray(name, index)
-                last_subindex = ODVariable(
-                    "Number of entries", index, 0)
+                last_subindex = ODVariable("Number of entries", index, 0)
                 last_subindex.data_type = datatypes.UNSIGNED8
                 arr.add_member(last_subindex)
-                arr.add_member(build_variable(eds, section, node_id, object_type, index, 1))
+                arr.add_member(_build_variable(
+                    sections, section, options, node_id, object_type, index, 1))
                 arr.storage_location = storage_location
                 od.add_object(arr)
             elif object_type == objectcodes.ARRAY:
@@ -148,39 +249,129 @@ def import_eds(source, node_id):
                 record = ODRecord(name, index)
                 record.storage_location = storage_location
                 od.add_object(record)
-
-            continue
-
-        # Match subindexes
-        match = re.match(r"^([0-9A-Fa-f]{4})[S|s]ub([0-9A-Fa-f]+)$", section)
-        if match is not None:
-            index = int(match.group(1), 16)
-            subindex = int(match.group(2), 16)
+        elif kind == _SECTION_SUBINDEX:
             entry = od[index]
             if isinstance(entry, (ODRecord, ODArray)):
-                try:
-                    object_type = int(eds.get(section, "ObjectType"), 0)
-                except NoOptionError:
-                    object_type = objectcodes.VAR
-                var = build_variable(eds, section, node_id, object_type, index, subindex)
-                entry.add_member(var)
-
-        # Match [index]Name
-        match = re.match(r"^([0-9A-Fa-f]{4})Name", section)
-        if match is not None:
-            index = int(match.group(1), 16)
-            num_of_entries = int(eds.get(section, "NrOfEntries"))
+                object_type = options.get("ObjectType")
+                object_type = objectcodes.VAR if object_type is None else int(object_type, 0)
+                entry.add_member(_build_variable(
+                    sections, section, options, node_id, object_type, index, subindex))
+        elif kind == _SECTION_NAMES:
+            num_of_entries = int(_option(options, section, "NrOfEntries"))
             entry = od[index]
             # For CompactSubObj index 1 is were we find the variable
             src_var = od[index][1]
             for subindex in range(1, num_of_entries + 1):
-                var = copy_variable(eds, section, subindex, src_var)
-                if var is not None:
-                    entry.add_member(var)
+                var = copy.copy(src_var)
+                var.name = _option(options, section, str(subindex))
+                var.subindex = subindex
+                entry.add_member(var)
+        elif kind == _SECTION_DUMMY_USAGE:
+            for i in range(1, 8):
+                key = f"Dummy{i:04d}"
+                if int(_option(options, section, key)) == 1:
+                    var = ODVariable(key, i, 0)
+                    var.data_type = i
+                    var.access_type = "const"
+                    od.add_object(var)
 
     return od
 
 
+def _build_variable(
+    sections: Mapping[str, Mapping[str, str]],
+    section: str,
+    options: Mapping[str, str],
+    node_id,
+    object_type: int,
+    index: int,
+    subindex: int = 0,
+) -> ODVariable:
+    """Create a variable from the options of its section."""
+    name = _option(options, section, "ParameterName")
+    var = ODVariable(name, index, subindex)
+    if (val := options.get("StorageLocation")) is not None:
+        var.storage_location = sys.intern(val)
+    var.data_type = data_type = int(_option(options, section, "DataType"), 0)
+    # Only a few different strings, so share them between variables
+    var.access_type = sys.intern(_option(options, section, "AccessType").lower())
+    var.is_domain = object_type == objectcodes.DOMAIN
+    if data_type > 0x1B:
+        # The object dictionary editor from CANFestival creates an optional object if min max
+        # values are used.  This optional object is then placed in the eds under the section
+        # [A0] (start point, iterates for more).  The sub1 part is then the section where the
+        # type parameter stands.
+        definition = f"{data_type:X}sub1"
+        if definition in sections:
+            data_type = int(_option(sections[definition], definition, "DefaultValue"), 0)
+        else:
+            logger.warning(
+                "%s has an unknown or unsupported data type (0x%X)", name, data_type
+            )
+            # Assume DOMAIN to force application to interpret the byte data
+            data_type = datatypes.DOMAIN
+        var.data_type = data_type
+
+    var.pdo_mappable = bool(int(options.get("PDOMapping", "0"), 0))
+
+    if (val := options.get("LowLimit")) is not None:
+        try:
+            if data_type in datatypes.SIGNED_TYPES:
+                var.min = _signed_int_from_hex(val, _calc_bit_length(data_type))
+            else:
+                var.min = int(val, 0)
+        except ValueError:
+            pass
+    if (val := options.get("HighLimit")) is not None:
+        try:
+            if data_type in datatypes.SIGNED_TYPES:
+                var.max = _signed_int_from_hex(val, _calc_bit_length(data_type))
+            else:
+                var.max = int(val, 0)
+        except ValueError:
+            pass
+    convert = _VALUE_CONVERTERS.get(data_type)
+    if (val := options.get("DefaultValue")) is not None:
+        var.default_raw = val
+        if _is_relative(val):
+            var.relative = True
+        try:
+            var.default = convert(val) if convert else _convert_integer(node_id, val)
+        except ValueError:
+            pass
+    if (val := options.get("ParameterValue")) is not None:
+        var.value_raw = val
+        try:
+            var.value = convert(val) if convert else _convert_integer(node_id, val)
+        except ValueError:
+            pass
+    if (val := options.get("Factor")) is not None:
+        try:
+            var.factor = float(val)
+        except ValueError:
+            pass
+    if (val := options.get("Description")) is not None:
+        var.description = val
+    if (val := options.get("Unit")) is not None:
+        var.unit = sys.intern(val)
+    return var
+
+
+def _is_relative(value: str) -> bool:
+    """Check if a raw value from the file is relative to ``$NODEID``."""
+    return "$" in value and '$NODEID' in value.replace(" ", "").upper()
+
+
+def _convert_integer(node_id, value: str) -> int:
+    if " " in value:
+        value = value.replace(" ", "")
+    if _is_relative(value):
+        if node_id is not None:
+            value = value.upper()
+            return int(re.sub(r'\+?\$NODEID\+?', '', value), 0) + node_id
+    return int(value, 0)
+
+
 def import_from_node(node_id: int, network: canopen.network.Network):
     """ Download the configuration from the remote node
     :param int node_id: Identifier of the node
@@ -229,22 +420,6 @@ def _signed_int_from_hex(hex_str, bit_length):
         return number
 
 
-def _convert_variable(node_id: int, var_type: int, value: Any) -> Any:
-    if var_type in (datatypes.OCTET_STRING, datatypes.DOMAIN):
-        return bytes.fromhex(value)
-    elif var_type in (datatypes.VISIBLE_STRING, datatypes.UNICODE_STRING):
-        return value
-    elif var_type in datatypes.FLOAT_TYPES:
-        return float(value)
-    else:
-        # COB-ID can contain '$NODEID+' so replace this with node_id before converting
-        value = value.replace(" ", "").upper()
-        if '$NODEID' in value and node_id is not None:
-            return int(re.sub(r'\+?\$NODEID\+?', '', value), 0) + node_id
-        else:
-            return int(value, 0)
-
-
 def _revert_variable(var_type: int, value: Any) -> Any:
     if value is None:
         return None
@@ -268,89 +443,14 @@ def build_variable(
 ) -> ODVariable:
     """Create a object dictionary entry.
 
-    :param eds: String stream of the eds file
-    :param section:
+    :param eds: The parsed eds file
+    :param section: Name of the section describing the entry
     :param node_id: Node ID
+    :param object_type: Object code of the entry
     :param index: Index of the CANOpen object
     :param subindex: Subindex of the CANOpen object (if present, else 0)
-    :param is_domain: variable represents a DOMAIN ObjectType (if present, else False)
     """
-    name = eds.get(section, "ParameterName")
-    var = ODVariable(name, index, subindex)
-    try:
-        var.storage_location = eds.get(section, "StorageLocation")
-    except NoOptionError:
-        var.storage_location = None
-    var.data_type = int(eds.get(section, "DataType"), 0)
-    var.access_type = eds.get(section, "AccessType").lower()
-    var.is_domain = object_type == objectcodes.DOMAIN
-    if var.data_type > 0x1B:
-        # The object dictionary editor from CANFestival creates an optional object if min max
-        # values are used.  This optional object is then placed in the eds under the section
-        # [A0] (start point, iterates for more).  The eds.get function gives us 0x00A0 now
-        # convert to String without hex representation and upper case.  The sub2 part is then
-        # the section where the type parameter stands.
-        try:
-            var.data_type = int(eds.get(f"{var.data_type:X}sub1", "DefaultValue"), 0)
-        except NoSectionError:
-            logger.warning(
-                "%s has an unknown or unsupported data type (0x%X)", name, var.data_type
-            )
-            # Assume DOMAIN to force application to interpret the byte data
-            var.data_type = datatypes.DOMAIN
-
-    var.pdo_mappable = bool(int(eds.get(section, "PDOMapping", fallback="0"), 0))
-
-    if eds.has_option(section, "LowLimit"):
-        try:
-            min_string = eds.get(section, "LowLimit")
-            if var.data_type in datatypes.SIGNED_TYPES:
-                var.min = _signed_int_from_hex(min_string, _calc_bit_length(var.data_type))
-            else:
-                var.min = int(min_string, 0)
-        except ValueError:
-            pass
-    if eds.has_option(section, "HighLimit"):
-        try:
-            max_string = eds.get(section, "HighLimit")
-            if var.data_type in datatypes.SIGNED_TYPES:
-                var.max = _signed_int_from_hex(max_string, _calc_bit_length(var.data_type))
-            else:
-                var.max = int(max_string, 0)
-        except ValueError:
-            pass
-    if eds.has_option(section, "DefaultValue"):
-        try:
-            var.default_raw = eds.get(section, "DefaultValue")
-            if '$NODEID' in var.default_raw:
-                var.relative = True
-            var.default = _convert_variable(node_id, var.data_type, var.default_raw)
-        except ValueError:
-            pass
-    if eds.has_option(section, "ParameterValue"):
-        try:
-            var.value_raw = eds.get(section, "ParameterValue")
-            var.value = _convert_variable(node_id, var.data_type, var.value_raw)
-        except ValueError:
-            pass
-    # Factor, Description and Unit are not standard according to the CANopen specifications, but
-    # they are implemented in the python canopen package, so we can at least try to use them
-    if eds.has_option(section, "Factor"):
-        try:
-            var.factor = float(eds.get(section, "Factor"))
-        except ValueError:
-            pass
-    if eds.has_option(section, "Description"):
-        try:
-            var.description = eds.get(section, "Description")
-        except ValueError:
-            pass
-    if eds.has_option(section, "Unit"):
-        try:
-            var.unit = eds.get(section, "Unit")
-        except ValueError:
-            pass
-    return var
+    return _build_variable(eds, section, eds[section], node_id, object_type, index, subindex)
 
 
 def copy_variable(eds, section, subindex, src_var):
@@ -1,4 +1,5 @@
 import logging
+import sys
 import xml.etree.ElementTree as etree
 
 from canopen import objectdictionary
@@ -92,7 +93,7 @@ def build_variable(par_tree):
     par.factor = int(factor) if factor.isdigit() else float(factor)
     unit = par_tree.get("Unit")
     if unit and unit != "-":
-        par.unit = unit
+        par.unit = sys.intern(unit)
     description = par_tree.find("Description")
     if description is not None:
         par.description = description.text
@@ -100,7 +101,7 @@ def build_variable(par_tree):
         par.data_type = DATA_TYPES[data_type]
     else:
         logger.warning("Don't know how to handle data type %s", data_type)
-    par.access_type = par_tree.get("AccessType", "rw")
+    par.access_type = sys.intern(par_tree.get("AccessType", "rw"))
     try:
         par.min = int(par_tree.get("MinimumValue"))
     except (ValueError, TypeError):
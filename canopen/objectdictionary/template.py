@@ -0,0 +1,209 @@
+"""Object dictionaries shared by several nodes of the same type."""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import operator
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional, TextIO, Union
+
+from canopen.objectdictionary import (
+    ODArray, ODRecord, ODVariable, ObjectDictionary, _VariableIndex, import_od,
+)
+from canopen.objectdictionary.eds import _is_relative
+
+if TYPE_CHECKING:
+    from canopen.objectdictionary.cache import ObjectDictionaryCache
+
+
+class ObjectDictionaryTemplate:
+    """An object dictionary parsed once and shared by nodes of the same type.
+
+    The file is imported for node ID 0, so values relative to ``$NODEID``
+    only hold their offset.  Each node gets a :class:`NodeObjectDictionary`
+    from :meth:`for_node`, which resolves them for its own node ID.  Pass the
+    template instead of a file when adding nodes to do this automatically::
+
+        template = ObjectDictionaryTemplate('drive.eds')
+        for node_id in range(1, 51):
+            network.add_node(node_id, template)
+
+    :param source:
+        The path to the object dictionary file or a file like object, see
+        :func:`~canopen.import_od`.
+    :param cache:
+        Cache to load the file from, see
+        :class:`~canopen.objectdictionary.cache.ObjectDictionaryCache`.
+    """
+
+    def __init__(self, source: Union[str, TextIO],
+                 cache: Optional[ObjectDictionaryCache] = None):
+        #: The shared object dictionary, which must not be modified
+        self.od = import_od(source, 0, cache=cache)
+
+    def for_node(self, node_id: int) -> NodeObjectDictionary:
+        """Create the object dictionary of one node.
+
+        :param node_id:
+            Node ID to resolve relative values for.
+        """
+        return NodeObjectDictionary(self.od, node_id)
+
+
+class NodeObjectDictionary(ObjectDictionary):
+    """Object dictionary of one node, backed by a shared template.
+
+    Objects of the template are wrapped in thin views on first access, which
+    copy the attributes they are asked for.  Default values and parameter
+    values relative to ``$NODEID`` are resolved for this node.  Attributes
+    assigned to a view, as well as objects or record members added or
+    removed, only affect this node.
+
+    :param template:
+        Object dictionary imported for node ID 0.
+    :param node_id:
+        Node ID to resolve relative values for.
+    """
+
+    def __init__(self, template: ObjectDictionary, node_id: int):
+        super().__init__()
+        #: The shared object dictionary
+        self.template = template
+        self.node_id = node_id
+        self.comments = template.comments
+        self.bitrate = template.bitrate
+        self.device_information = template.device_information
+        # Template indices deleted from this node
+        self._removed: set[int] = set()
+        # All indices of the node and the template in ascending order
+        self._merged: Optional[list[int]] = None
+        # Version of the template the merged indices were created for
+        self._template_version = template._version
+        # Variable indexes of the template merged into self._variables
+        self._shared_variables: Optional[_VariableIndex] = None
+
+    def __getitem__(
+        self, index: Union[int, str]
+    ) -> Union[ODArray, ODRecord, ODVariable]:
+        item = self.names.get(index)
+        if item is None:
+            item = self.indices.get(index)
+        if item is None:
+            shared = self._shared(index)
+            if shared is None:
+                return super().__getitem__(index)
+            # The contents do not change, so the object is not added as new
+            item = _view(shared, self.node_id)
+            item.parent = self
+            self.indices[item.index] = item
+            self.names[item.name] = item
+        return item
+
+    def __delitem__(self, index: Union[int, str]):
+        obj = self[index]
+        super().__delitem__(index)
+        self._removed.add(obj.index)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._sorted_indices())
+
+    def __contains__(self, index: object) -> bool:
+        return super().__contains__(index) or self._shared(index) is not None
+
+    def variables(
+        self,
+        pdo_mappable: Optional[bool] = None,
+        writable: Optional[bool] = None,
+        has_value: Optional[bool] = None,
+    ) -> list[ODVariable]:
+        # Objects of the template are filtered as they are, and only wrapped
+        # in views if selected
+        result = []
+        for var in super().variables(pdo_mappable, writable, has_value):
+            obj = self[var.index]
+            result.append(obj if isinstance(obj, ODVariable) else obj[var.subindex])
+        return result
+
+    def _sorted_indices(self) -> list[int]:
+        # Objects may still be added to or removed from the template
+        if self._merged is None or self._template_version != self.template._version:
+            self._template_version = self.template._version
+            self._merged = sorted(
+                self.indices.keys() | (self.template.indices.keys() - self._removed))
+        return self._merged
+
+    def _variable_index(self) -> _VariableIndex:
+        # The template creates new indexes after changes
+        shared = self.template._variable_index()
+        if self._variables is None or shared is not self._shared_variables:
+            self._shared_variables = shared
+            own = _VariableIndex.of(self.indices[index] for index in sorted(self.indices))
+            # Template objects which this node has taken over or deleted
+            skip = self.indices.keys() | self._removed
+            self._variables = _VariableIndex(*(
+                tuple(heapq.merge(own_vars,
+                                  (var for var in shared_vars if var.index not in skip),
+                                  key=_index_of))
+                for own_vars, shared_vars in zip(own, shared)
+            ))
+        return self._variables
+
+    def _changed(self) -> None:
+        super()._changed()
+        self._merged = None
+
+    def _shared(self, index: object) -> Union[ODArray, ODRecord, ODVariable, None]:
+        obj = self.template.names.get(index)
+        if obj is None:
+            obj = self.template.indices.get(index)
+        if obj is None or obj.index in self.indices or obj.index in self._removed:
+            return None
+        return obj
+
+
+_index_of = operator.attrgetter("index")
+
+
+class _VariableView(ODVariable):
+    """Variable of a node, copying attributes from the template on first read."""
+
+    def __init__(self, base: ODVariable, node_id: int):
+        # ODVariable.__init__() is skipped on purpose, so attributes which are
+        # not set on the view are looked up in the base variable
+        self._base = base
+        self._node_id = node_id
+        self.parent = None
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") or name in ("_base", "_node_id"):
+            raise AttributeError(name)
+        base = self._base
+        value = getattr(base, name)
+        # Properties store their values in private slots
+        public = name.lstrip("_")
+        if public in ("default", "value"):
+            # Resolved like import_od() does, from the raw value in the file
+            raw = getattr(base, f"{public}_raw", None)
+            if raw is not None and _is_relative(raw) and isinstance(value, int):
+                value += self._node_id
+        elif isinstance(value, (dict, list)):
+            # Changes in place must stay on this node
+            value = copy.copy(value)
+        # Keep the value for faster access next time
+        setattr(self, name, value)
+        return value
+
+
+def _view(
+    obj: Union[ODArray, ODRecord, ODVariable], node_id: int
+) -> Union[ODArray, ODRecord, ODVariable]:
+    if isinstance(obj, ODVariable):
+        return _VariableView(obj, node_id)
+    view = type(obj)(obj.name, obj.index)
+    for name, value in vars(obj).items():
+        if name not in ("parent", "subindices", "names"):
+            setattr(view, name, value)
+    for var in obj.subindices.values():
+        view.add_member(_VariableView(var, node_id))
+    return view
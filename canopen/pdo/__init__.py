@@ -3,7 +3,9 @@ import logging
 from collections.abc import Iterator
 
 from canopen import node
-from canopen.pdo.base import PdoBase, PdoMap, PdoMaps, PdoVariable
+from canopen.pdo.base import PdoBase, PdoMap, PdoMaps, PdoVariable, PdoWaiter
+from canopen.pdo.optimize import MappingPlan, bus_load, optimize_mapping
+from canopen.pdo.watchdog import PdoWatchdog
 
 
 __all__ = [
@@ -11,6 +13,11 @@ __all__ = [
     "PdoMap",
     "PdoMaps",
     "PdoVariable",
+    "PdoWaiter",
+    "PdoWatchdog",
+    "MappingPlan",
+    "bus_load",
+    "optimize_mapping",
     "PDO",
     "RPDO",
     "TPDO",
@@ -4,13 +4,15 @@ import binascii
 import contextlib
 import logging
 import math
+import struct
 import threading
-from collections.abc import Iterator, Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Callable, Optional, TYPE_CHECKING, Union
 
 import canopen.network
 from canopen import objectdictionary
 from canopen import variable
+from canopen.pdo.optimize import MappingPlan, optimize_mapping
 from canopen.sdo import SdoAbortedError
 
 if TYPE_CHECKING:
@@ -22,6 +24,18 @@ if TYPE_CHECKING:
 PDO_NOT_VALID = 1 << 31
 RTR_NOT_ALLOWED = 1 << 30
 
+#: Number of mapped objects indicating a source address mode MPDO
+MPDO_SAM = 0xFE
+#: Number of mapped objects indicating a destination address mode MPDO
+MPDO_DAM = 0xFF
+#: Address type bit in the first byte of an MPDO
+MPDO_DAM_FLAG = 0x80
+#: Object scanner list for SAM-MPDO producers
+MPDO_SCANNER_LIST = range(0x1FA0, 0x1FD0)
+
+# Address, index, subindex
+MPDO_STRUCT = struct.Struct("<BHB")
+
 logger = logging.getLogger(__name__)
 
 
@@ -143,6 +157,21 @@ class PdoBase(Mapping):
         for pdo_map in self.map.values():
             pdo_map.stop()
 
+    def optimize(self, objects, bitrate: Optional[int] = None) -> MappingPlan:
+        """Calculate a mapping which packs the given objects into few frames.
+
+        See :func:`canopen.pdo.optimize.optimize_mapping` for details.
+
+        :param objects:
+            Required update rate in Hz per object, given as name, index or
+            ``(index, subindex)`` tuple.
+        :param bitrate:
+            Bus bitrate in bit/s used for the load projection.
+
+        :return: A plan to be applied with :meth:`MappingPlan.apply`.
+        """
+        return optimize_mapping(self, objects, bitrate)
+
 
 class PdoMaps(Mapping[int, 'PdoMap']):
     """A collection of transmit or receive maps."""
@@ -226,6 +255,15 @@ class PdoMap:
         self.callbacks = []
         self.receive_condition = threading.Condition()
         self.is_received: bool = False
+        #: Multiplexed PDO mode, either ``None``, :data:`MPDO_SAM` or :data:`MPDO_DAM`
+        self.mpdo_mode: Optional[int] = None
+        #: Data of received MPDOs by (node ID, index, subindex)
+        self.mpdo_data: dict[tuple[int, int, int], bytes] = {}
+        #: Objects to transmit in turn with :meth:`transmit_next`
+        self.scanner_list: list[tuple[int, int]] = []
+        self._scanner_pos = 0
+        self._mpdo_callbacks: dict[tuple[int, int], list[Callable]] = {}
+        self._waiters: list[PdoWaiter] = []
         self._task = None
 
     def __repr__(self) -> str:
@@ -291,6 +329,10 @@ class PdoMap:
             self.map.append(var)
 
     def _update_data_size(self):
+        if self.mpdo_mode is not None:
+            # Multiplexor plus up to four bytes of data
+            self.data = bytearray(8)
+            return
         self.data = bytearray(int(math.ceil(self.length / 8.0)))
 
     @property
@@ -337,10 +379,26 @@ class PdoMap:
                 if self.timestamp is not None:
                     self.period = timestamp - self.timestamp
                 self.timestamp = timestamp
+                if self.mpdo_mode is not None:
+                    self._on_mpdo(data)
                 self.receive_condition.notify_all()
+                for waiter in self._waiters:
+                    waiter.on_reception(self, timestamp)
                 for callback in self.callbacks:
                     callback(self)
 
+    def _on_mpdo(self, data):
+        if len(data) < MPDO_STRUCT.size:
+            logger.warning("Ignoring MPDO of %d bytes on 0x%X, too short for an address",
+                           len(data), self.cob_id)
+            return
+        address, index, subindex = MPDO_STRUCT.unpack_from(data)
+        node_id = address & 0x7F
+        value = bytes(data[4:8])
+        self.mpdo_data[(node_id, index, subindex)] = value
+        for callback in self._mpdo_callbacks.get((index, subindex), ()):
+            callback(node_id, index, subindex, value)
+
     def add_callback(self, callback: Callable[[PdoMap], None]) -> None:
         """Add a callback which will be called on receive.
 
@@ -350,6 +408,31 @@ class PdoMap:
         """
         self.callbacks.append(callback)
 
+    def remove_callback(self, callback: Callable[[PdoMap], None]) -> None:
+        """Remove a callback previously added with :meth:`add_callback`.
+
+        :param callback: The function to remove.
+        :raises ValueError: If the callback was not registered.
+        """
+        self.callbacks.remove(callback)
+
+    def add_mpdo_callback(
+        self,
+        callback: Callable[[int, int, int, bytes], None],
+        index: int,
+        subindex: int = 0,
+    ) -> None:
+        """Add a callback for received MPDOs carrying a specific object.
+
+        :param callback:
+            The function to call with the node ID, index, subindex and data
+            of the received object.  For source address mode, the node ID is the
+            producer, for destination address mode it is the addressed node.
+        :param index: Index of the multiplexed object
+        :param subindex: Sub-index of the multiplexed object
+        """
+        self._mpdo_callbacks.setdefault((index, subindex), []).append(callback)
+
     def read(self, from_od=False) -> None:
         """Read PDO configuration for this map.
         
@@ -400,6 +483,14 @@ class PdoMap:
 
         self.clear()
         nof_entries = _raw_from(self.map_array[0])
+        if nof_entries in (MPDO_SAM, MPDO_DAM):
+            logger.info("PDO is a multiplexed PDO (%s)",
+                        "DAM" if nof_entries == MPDO_DAM else "SAM")
+            self.mpdo_mode = nof_entries
+            # A DAM producer maps the one object it transmits
+            nof_entries = 1 if nof_entries == MPDO_DAM else 0
+        else:
+            self.mpdo_mode = None
         for subindex in range(1, nof_entries + 1):
             value = _raw_from(self.map_array[subindex])
             index = value >> 16
@@ -468,7 +559,7 @@ class PdoMap:
             else:
                 entry.raw = var.index << 16 | var.subindex << 8 | var.length
         try:
-            self.map_array[0].raw = len(self.map)
+            self.map_array[0].raw = self.mpdo_mode or len(self.map)
         except SdoAbortedError as e:
             # WORKAROUND for broken implementations: If the array
             # number-of-entries parameter is not writable, we have already
@@ -548,6 +639,89 @@ class PdoMap:
             raise ValueError("A valid COB-ID has not been configured")
         self.pdo_node.network.send_message(self.cob_id, self.data)
 
+    def transmit_mpdo(
+        self, index: int, subindex: int, data: bytes, node_id: Optional[int] = None
+    ) -> None:
+        """Transmit one object as a multiplexed PDO.
+
+        :param index: Index of the object
+        :param subindex: Sub-index of the object
+        :param data: Up to four bytes of object data
+        :param node_id:
+            Addressed node for destination address mode (default 0 for all
+            nodes), or the producer for source address mode (default own ID).
+
+        :raises ValueError:
+            When the map is not configured as MPDO, no COB-ID was assigned or
+            the data is too long.
+        """
+        if self.mpdo_mode is None:
+            raise ValueError("PDO is not configured as a multiplexed PDO")
+        if not self.cob_id:
+            raise ValueError("A valid COB-ID has not been configured")
+        if len(data) > 4:
+            raise ValueError("MPDOs can carry at most four bytes of data")
+        if self.mpdo_mode == MPDO_DAM:
+            address = MPDO_DAM_FLAG | (node_id or 0)
+        else:
+            address = self.pdo_node.node.id if node_id is None else node_id
+        frame = bytearray(8)
+        MPDO_STRUCT.pack_into(frame, 0, address, index, subindex)
+        frame[4:4 + len(data)] = data
+        self.pdo_node.network.send_message(self.cob_id, frame)
+
+    def read_scanner_list(self, from_od: bool = False) -> None:
+        """Read the object scanner list (0x1FA0 - 0x1FCF) of the node.
+
+        Each entry describes a block of consecutive sub-indices, which are
+        expanded into :attr:`scanner_list`.
+
+        :param from_od:
+            Read using SDO if False, read from object dictionary if True.
+        """
+        od = self.pdo_node.node.object_dictionary
+        scanner_list = []
+        for list_index in MPDO_SCANNER_LIST:
+            if list_index not in od:
+                continue
+            entries = self.pdo_node.node.sdo[list_index]
+            for entry in entries.values():
+                if from_od:
+                    value = entry.od.value if entry.od.value is not None else entry.od.default
+                else:
+                    value = entry.raw
+                if not value:
+                    continue
+                block_size = (value >> 24) or 1
+                index = (value >> 8) & 0xFFFF
+                subindex = value & 0xFF
+                scanner_list.extend(
+                    (index, sub) for sub in range(subindex, subindex + block_size))
+        logger.info("Object scanner list contains %d objects", len(scanner_list))
+        self.scanner_list = scanner_list
+        self._scanner_pos = 0
+
+    def transmit_next(self) -> tuple[int, int]:
+        """Transmit the next object from the :attr:`scanner_list` as MPDO.
+
+        The objects are visited round-robin.  Their current value is read
+        from the data of the local node, so this is only supported for TPDOs
+        of a :class:`~canopen.LocalNode`.
+
+        :return: Index and sub-index of the transmitted object.
+        :raises ValueError: When the scanner list is empty.
+        :raises TypeError: When the PDO does not belong to a local node.
+        """
+        if not isinstance(self.pdo_node.node, canopen.node.LocalNode):
+            raise TypeError("Only a local node can produce MPDOs from its scanner list")
+        if not self.scanner_list:
+            raise ValueError("The object scanner list is empty")
+        index, subindex = self.scanner_list[self._scanner_pos]
+        self._scanner_pos = (self._scanner_pos + 1) % len(self.scanner_list)
+        data = self.pdo_node.node.sdo.upload(index, subindex)
+        self.transmit_mpdo(index, subindex, data[:4])
+        return index, subindex
+
     def start(self, period: Optional[float] = None) -> None:
         """Start periodic transmission of message in a background thread.
 
@@ -604,6 +778,70 @@ class PdoMap:
         return self.timestamp if self.is_received else None
 
 
+class PdoWaiter:
+    """Waits for the next reception of several PDO maps with one deadline.
+
+    While used as a context manager, the waiter is registered with each map and
+    gets notified from :meth:`PdoMap.on_message`.  Only the first reception of
+    each map is recorded.
+
+    :param maps: The PDO maps to observe.
+    :param armed:
+        Record receptions right away.  Otherwise wait for :meth:`arm` to be
+        called, e.g. upon reception of a SYNC message.
+    """
+
+    def __init__(self, maps: Iterable[PdoMap], armed: bool = True):
+        self.maps = list(maps)
+        #: Timestamps of the received maps
+        self.received: dict[PdoMap, float] = {}
+        #: Timestamp given when the waiter was armed
+        self.armed_timestamp: Optional[float] = None
+        self.armed = armed
+        self.condition = threading.Condition()
+
+    def __enter__(self) -> PdoWaiter:
+        for pdo_map in self.maps:
+            with pdo_map.receive_condition:
+                pdo_map._waiters.append(self)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        for pdo_map in self.maps:
+            with pdo_map.receive_condition:
+                pdo_map._waiters.remove(self)
+
+    def arm(self, timestamp: Optional[float] = None) -> None:
+        """Start recording receptions, if not already armed."""
+        with self.condition:
+            if not self.armed:
+                self.armed = True
+                self.armed_timestamp = timestamp
+
+    def on_sync(self, can_id: int, data: bytearray, timestamp: float) -> None:
+        """Arm the waiter, suitable as a network subscriber for SYNC."""
+        self.arm(timestamp)
+
+    def on_reception(self, pdo_map: PdoMap, timestamp: float) -> None:
+        with self.condition:
+            if self.armed and pdo_map not in self.received:
+                self.received[pdo_map] = timestamp
+                self.condition.notify_all()
+
+    def wait(self, count: Optional[int] = None, timeout: float = 10) -> bool:
+        """Wait until the given number of maps has been received.
+
+        :param count: Number of maps to wait for, defaults to all of them.
+        :param timeout: Max time to wait in seconds.
+        :return: ``True`` if enough maps were received before the deadline.
+        """
+        if count is None:
+            count = len(self.maps)
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: len(self.received) >= count, timeout)
+
+
 class PdoVariable(variable.Variable):
     """One object dictionary variable mapped to a PDO."""
 
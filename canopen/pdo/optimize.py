@@ -0,0 +1,255 @@
+"""Automatic packing of object dictionary variables into PDO maps."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping
+from typing import Optional, TYPE_CHECKING, Union
+
+from canopen import objectdictionary
+
+if TYPE_CHECKING:
+    from canopen.pdo.base import PdoBase, PdoMap
+
+
+logger = logging.getLogger(__name__)
+
+#: Maximum number of data bits in one PDO
+MAX_PDO_BITS = 64
+
+#: Transmission type used for the generated maps (event-driven, device profile)
+EVENT_DRIVEN = 254
+
+ObjectKey = Union[str, int, tuple[Union[str, int], Union[str, int]]]
+
+
+def frame_bits(nbytes: int) -> int:
+    """Worst-case length of a standard CAN data frame including bit stuffing.
+
+    :param nbytes: Number of data bytes (0 - 8)
+    :return: Number of bits on the bus
+    """
+    return 8 * nbytes + 44 + (34 + 8 * nbytes - 1) // 4
+
+
+def pdo_rate(pdo_map: PdoMap) -> Optional[float]:
+    """Determine the transmission rate of a PDO in messages per second.
+
+    Uses the measured or configured :attr:`~canopen.pdo.PdoMap.period` if known,
+    otherwise the event timer.
+
+    :return: Rate in Hz, or ``None`` if it cannot be determined
+    """
+    if pdo_map.period:
+        return 1.0 / pdo_map.period
+    if pdo_map.event_timer:
+        return 1000.0 / pdo_map.event_timer
+    return None
+
+
+def bus_load(maps: Iterable[PdoMap], bitrate: int) -> float:
+    """Calculate the fraction of the bus bandwidth used by the given PDOs.
+
+    Only enabled maps with a known rate (see :func:`pdo_rate`) are accounted for.
+
+    :param maps: PDO maps to consider
+    :param bitrate: Bus bitrate in bit/s
+    :return: Bus load as a fraction of the bitrate (1.0 meaning 100 %)
+    """
+    bits_per_second = 0.0
+    for pdo_map in maps:
+        rate = pdo_rate(pdo_map)
+        if not pdo_map.enabled or not pdo_map.length or rate is None:
+            continue
+        bits_per_second += rate * frame_bits((pdo_map.length + 7) // 8)
+    return bits_per_second / bitrate
+
+
+class _Frame:
+    """One planned PDO with its rate class and content."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.variables: list[objectdictionary.ODVariable] = []
+        self.length = 0
+
+    def fits(self, var: objectdictionary.ODVariable) -> bool:
+        return (len(self.variables) < self.capacity
+                and self.length + len(var) <= MAX_PDO_BITS)
+
+    def add(self, var: objectdictionary.ODVariable) -> None:
+        self.variables.append(var)
+        self.length += len(var)
+
+
+class MappingPlan:
+    """Result of :func:`optimize_mapping`, ready to be applied to the PDO maps.
+
+    :param pdo: The TPDO or RPDO object the plan was calculated for
+    :param frames: Planned frames in order of map number
+    :param bitrate: Bus bitrate used for the load projection
+    """
+
+    def __init__(self, pdo: PdoBase, frames: list[_Frame], bitrate: int):
+        self.pdo = pdo
+        self.frames = frames
+        self.bitrate = bitrate
+        #: Bus load of the current mapping as a fraction of the bitrate
+        self.current_load = bus_load(pdo.map.values(), bitrate)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def frames_per_second(self) -> float:
+        """Total number of frames per second generated by the plan."""
+        return sum(frame.rate for frame in self.frames)
+
+    @property
+    def projected_load(self) -> float:
+        """Bus load of the planned mapping as a fraction of the bitrate."""
+        bits = sum(frame.rate * frame_bits((frame.length + 7) // 8)
+                   for frame in self.frames)
+        return bits / self.bitrate
+
+    def apply(self, save: bool = False) -> None:
+        """Write the plan to the PDO maps.
+
+        Maps not needed by the plan are cleared and disabled.
+
+        :param save:
+            Also save the configuration to the node using SDO.
+        """
+        pdo_maps = list(self.pdo.map.values())
+        for pdo_map, frame in zip(pdo_maps, self.frames):
+            pdo_map.clear()
+            for var in frame.variables:
+                pdo_map.add_variable(var.index, var.subindex)
+            if pdo_map.cob_id is None:
+                pdo_map.cob_id = pdo_map.predefined_cob_id
+            pdo_map.trans_type = EVENT_DRIVEN
+            if 5 in pdo_map.com_record:
+                pdo_map.event_timer = max(1, round(1000.0 / frame.rate))
+            pdo_map.period = 1.0 / frame.rate
+            pdo_map.enabled = True
+        for pdo_map in pdo_maps[len(self.frames):]:
+            pdo_map.clear()
+            pdo_map.enabled = False
+        if save:
+            self.pdo.save()
+
+    def summary(self) -> str:
+        """Describe the planned frames and the projected bus load."""
+        lines = [f"{len(self.frames)} PDOs, {self.frames_per_second:.1f} frames/s"]
+        for map_no, frame in zip(self.pdo.map, self.frames):
+            content = ", ".join(var.qualname for var in frame.variables)
+            lines.append(f"  PDO {map_no}: {frame.rate:g} Hz, {frame.length} bits: {content}")
+        lines.append(f"Projected bus load {self.projected_load:.2%} "
+                     f"(current mapping {self.current_load:.2%})")
+        return "\n".join(lines)
+
+
+def _map_capacity(pdo_map: PdoMap) -> int:
+    """Number of mapping entries supported by the mapping parameter object."""
+    # Sub-index 0 holds the number of entries currently mapped, so count the
+    # entries defined in the object dictionary instead
+    entries = sum(1 for subindex in pdo_map.map_array.od if subindex)
+    return min(entries, MAX_PDO_BITS) if entries else MAX_PDO_BITS
+
+
+def _resolve(od: objectdictionary.ObjectDictionary, key: ObjectKey) -> objectdictionary.ODVariable:
+    if isinstance(key, tuple):
+        var = od.get_variable(*key)
+    else:
+        obj = od[key]
+        var = obj if isinstance(obj, objectdictionary.ODVariable) else None
+    if var is None:
+        raise KeyError(f"{key!r} is not a variable in the Object Dictionary")
+    return var
+
+
+def optimize_mapping(
+    pdo: PdoBase,
+    objects: Mapping[ObjectKey, float],
+    bitrate: Optional[int] = None,
+) -> MappingPlan:
+    """Pack the requested objects into as few PDO frames per second as possible.
+
+    Objects are grouped into classes of equal update rate and packed using a
+    first-fit decreasing strategy.  Afterwards, frames of slower classes are
+    dissolved if their content fits into free space of faster frames.
+
+    :param pdo:
+        The node's :class:`~canopen.pdo.TPDO` or :class:`~canopen.pdo.RPDO`.
+    :param objects:
+        Required update rate in Hz per object, given as name, index or
+        ``(index, subindex)`` tuple.
+    :param bitrate:
+        Bus bitrate in bit/s, defaults to the one from the object dictionary
+        or 500 kbit/s.
+
+    :return: A plan which can be inspected and applied to the maps.
+
+    :raises KeyError: If an object does not exist.
+    :raises ValueError:
+        If an object is not PDO mappable or the objects do not fit into
+        the available PDO maps.
+    """
+    od = pdo.node.object_dictionary
+    if bitrate is None:
+        bitrate = od.bitrate or 500000
+    pdo_maps = list(pdo.map.values())
+    if not pdo_maps:
+        raise ValueError("No PDO maps available in the Object Dictionary")
+    capacity = min(_map_capacity(pdo_map) for pdo_map in pdo_maps)
+
+    classes: dict[float, list[objectdictionary.ODVariable]] = {}
+    for key, rate in objects.items():
+        var = _resolve(od, key)
+        if not var.pdo_mappable:
+            raise ValueError(f"{var.qualname} cannot be mapped to a PDO")
+        if len(var) > MAX_PDO_BITS:
+            raise ValueError(f"{var.qualname} does not fit into a PDO")
+        if rate <= 0:
+            raise ValueError(f"Invalid update rate {rate} for {var.qualname}")
+        classes.setdefault(float(rate), []).append(var)
+
+    frames: list[_Frame] = []
+    for rate in sorted(classes, reverse=True):
+        class_frames: list[_Frame] = []
+        for var in sorted(classes[rate], key=len, reverse=True):
+            for frame in class_frames:
+                if frame.fits(var):
+                    break
+            else:
+                frame = _Frame(rate, capacity)
+                class_frames.append(frame)
+            frame.add(var)
+        frames.extend(class_frames)
+
+    # Free space in a faster frame transports an object at no additional cost
+    for frame in reversed(frames[:]):
+        faster = [other for other in frames if other.rate > frame.rate]
+        placement = []
+        free = {id(other): (other.capacity - len(other.variables),
+                            MAX_PDO_BITS - other.length) for other in faster}
+        for var in sorted(frame.variables, key=len, reverse=True):
+            for other in faster:
+                entries, bits = free[id(other)]
+                if entries and bits >= len(var):
+                    free[id(other)] = (entries - 1, bits - len(var))
+                    placement.append((other, var))
+                    break
+            else:
+                break
+        else:
+            logger.debug("Merging %d Hz PDO into faster PDOs", frame.rate)
+            for other, var in placement:
+                other.add(var)
+            frames.remove(frame)
+
+    if len(frames) > len(pdo_maps):
+        raise ValueError(f"Objects need {len(frames)} PDOs, "
+                         f"but only {len(pdo_maps)} are available")
+    return MappingPlan(pdo, frames, bitrate)
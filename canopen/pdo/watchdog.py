@@ -0,0 +1,182 @@
+"""Supervision of periodically received PDOs."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from canopen.pdo.base import PdoMap
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Supervision state of one PDO map."""
+
+    def __init__(self, pdo_map: PdoMap, timeout: float, deadline: float):
+        self.pdo_map = pdo_map
+        self.timeout = timeout
+        self.deadline = deadline
+        self.stale = False
+        self.missed = 0
+
+
+class PdoWatchdog:
+    """Detects PDOs which stopped arriving, using one shared timer wheel.
+
+    Every supervised map gets a deadline, which is pushed back on each
+    reception.  Receptions only update a timestamp, while a single thread
+    advances the wheel and handles expired deadlines, so the cost per frame
+    stays constant regardless of the number of supervised maps.
+
+    :param on_stale:
+        Function to call with the map when a deadline passes without reception.
+    :param on_recovered:
+        Function to call with the map when a stale map is received again.
+    :param tick:
+        Resolution of the timer wheel in seconds.
+    :param slots:
+        Number of slots in the timer wheel.
+    """
+
+    def __init__(
+        self,
+        on_stale: Optional[Callable[[PdoMap], None]] = None,
+        on_recovered: Optional[Callable[[PdoMap], None]] = None,
+        tick: float = 0.01,
+        slots: int = 512,
+    ):
+        self.on_stale = on_stale
+        self.on_recovered = on_recovered
+        self.tick = tick
+        self._wheel: list[set[_Entry]] = [set() for _ in range(slots)]
+        self._entries: dict[PdoMap, _Entry] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cursor = 0
+
+    def _slot(self, deadline: float) -> set[_Entry]:
+        return self._wheel[int(deadline / self.tick) % len(self._wheel)]
+
+    def add(
+        self, pdo_map: PdoMap, timeout: Optional[float] = None, tolerance: float = 1.5
+    ) -> None:
+        """Supervise a PDO map.
+
+        :param pdo_map:
+            The map to supervise.
+        :param timeout:
+            Max time in seconds between two receptions.  Defaults to the
+            map's :attr:`~canopen.pdo.PdoMap.period` or event timer,
+            multiplied by the tolerance.
+        :param tolerance:
+            Factor applied to the derived default timeout.
+
+        :raises ValueError: If no timeout is given and none can be derived.
+        """
+        if timeout is None:
+            if pdo_map.period:
+                timeout = pdo_map.period * tolerance
+            elif pdo_map.event_timer:
+                timeout = pdo_map.event_timer / 1000.0 * tolerance
+            else:
+                raise ValueError(f"No period known for {pdo_map.name}, specify a timeout")
+        entry = _Entry(pdo_map, timeout, time.monotonic() + timeout)
+        with self._lock:
+            if pdo_map in self._entries:
+                raise ValueError(f"{pdo_map.name} is already supervised")
+            self._entries[pdo_map] = entry
+            self._slot(entry.deadline).add(entry)
+        pdo_map.add_callback(self.on_reception)
+
+    def remove(self, pdo_map: PdoMap) -> None:
+        """Stop supervising a PDO map."""
+        pdo_map.remove_callback(self.on_reception)
+        with self._lock:
+            entry = self._entries.pop(pdo_map)
+            for slot in self._wheel:
+                slot.discard(entry)
+
+    def is_stale(self, pdo_map: PdoMap) -> bool:
+        """Check whether a supervised map is currently missing."""
+        return self._entries[pdo_map].stale
+
+    def missed(self, pdo_map: PdoMap) -> int:
+        """Number of timeouts elapsed without reception of the map."""
+        return self._entries[pdo_map].missed
+
+    @property
+    def stale_maps(self) -> list[PdoMap]:
+        """All supervised maps which are currently missing."""
+        with self._lock:
+            return [entry.pdo_map for entry in self._entries.values() if entry.stale]
+
+    def on_reception(self, pdo_map: PdoMap) -> None:
+        entry = self._entries.get(pdo_map)
+        if entry is None:
+            return
+        # The wheel picks up the new deadline lazily when the old slot expires
+        entry.deadline = time.monotonic() + entry.timeout
+        if entry.stale:
+            entry.stale = False
+            logger.info("%s received again", pdo_map.name)
+            if self.on_recovered is not None:
+                self.on_recovered(pdo_map)
+
+    def start(self) -> None:
+        """Start supervision in a background thread.
+
+        :raises RuntimeError: If already started.
+        """
+        if self._thread is not None:
+            raise RuntimeError("PDO watchdog already running")
+        self._stop_event.clear()
+        self._cursor = int(time.monotonic() / self.tick)
+        self._thread = threading.Thread(target=self._run, name="PdoWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.tick):
+            self._advance(time.monotonic())
+
+    def _advance(self, now: float) -> None:
+        expired = []
+        with self._lock:
+            # Only slots of completely elapsed ticks hold expired deadlines
+            last = int(now / self.tick) - 1
+            # Visit each slot at most once per call, even after a long delay
+            first = max(self._cursor, last - len(self._wheel) + 1)
+            for tick_no in range(first, last + 1):
+                slot = self._wheel[tick_no % len(self._wheel)]
+                for entry in list(slot):
+                    if entry.deadline > now:
+                        if self._slot(entry.deadline) is not slot:
+                            slot.discard(entry)
+                            self._slot(entry.deadline).add(entry)
+                        continue
+                    slot.discard(entry)
+                    entry.missed += 1
+                    if not entry.stale:
+                        entry.stale = True
+                        expired.append(entry.pdo_map)
+                    # Keep counting missed periods while stale
+                    entry.deadline = now + entry.timeout
+                    self._slot(entry.deadline).add(entry)
+            self._cursor = last + 1
+        for pdo_map in expired:
+            logger.warning("%s has not been received in time", pdo_map.name)
+            if self.on_stale is not None:
+                self.on_stale(pdo_map)
@@ -0,0 +1,188 @@
+"""Program download to devices according to CiA 302-3."""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
+
+from canopen.nmt import NmtError
+from canopen.sdo.client import BlockDownload
+from canopen.sdo.exceptions import SdoCommunicationError
+from canopen.sdo.scheduler import PRIORITY_BULK
+from canopen.utils import TokenBucket
+
+if TYPE_CHECKING:
+    from canopen.node import RemoteNode
+
+
+logger = logging.getLogger(__name__)
+
+#: Commands for the program control object 0x1F51
+PROGRAM_STOP = 0
+PROGRAM_START = 1
+PROGRAM_RESET = 2
+PROGRAM_CLEAR = 3
+
+PROGRAM_DATA = 0x1F50
+PROGRAM_CONTROL = 0x1F51
+
+# Burst of frames allowed by the bus-load budget, the max block size
+_MAX_BLOCK_FRAMES = 127
+
+
+class ProgramResult(NamedTuple):
+    """Outcome of the program download to one node."""
+
+    #: Node ID
+    node_id: int
+    #: Number of bytes downloaded
+    size: int
+    #: Time in seconds from stopping the program to the boot-up
+    duration: float
+    #: The exception if the download failed, otherwise ``None``
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Indicate whether the download succeeded."""
+        return self.error is None
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average throughput of the download."""
+        return self.size / self.duration if self.duration > 0 else 0.0
+
+
+class ProgramDownload:
+    """Downloads a program image to many nodes in parallel.
+
+    For every node, the program is stopped and optionally cleared through the
+    program control object 0x1F51.  The image is then streamed from a
+    memory-mapped file to the program data object 0x1F50 using a
+    :class:`~canopen.sdo.client.BlockDownload` with CRC, so it is never read
+    into memory as a whole.  Finally the program is started and the boot-up
+    message of the node is awaited.
+
+    :param path:
+        File containing the program image.
+    :param program:
+        Sub-index of the program data and control objects.
+    :param concurrency:
+        Max number of nodes to download to at the same time.
+    :param frame_rate:
+        Max number of data frames per second sent by all downloads together,
+        to leave bandwidth for other traffic.  ``None`` for no limit.  The
+        downloads also draw from :attr:`canopen.Network.sdo_scheduler` at
+        bulk priority, if set.
+    :param clear:
+        Clear the program memory before the download.
+    :param bootup_timeout:
+        Max time in seconds to wait for the boot-up message after starting the
+        program, or ``None`` to not wait.
+    :param progress:
+        Function called after each block with the node ID, the number of bytes
+        sent, the image size and the current throughput in bytes per second.
+        It is called from several threads.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        program: int = 1,
+        concurrency: int = 4,
+        frame_rate: Optional[float] = None,
+        clear: bool = True,
+        bootup_timeout: Optional[float] = 10.0,
+        progress: Optional[Callable[[int, int, int, float], None]] = None,
+    ):
+        self.path = path
+        self.program = program
+        self.concurrency = concurrency
+        self.clear = clear
+        self.bootup_timeout = bootup_timeout
+        self.progress = progress
+        #: Shared budget of data frames, or ``None``
+        self.bucket: Optional[TokenBucket] = None
+        if frame_rate is not None:
+            self.bucket = TokenBucket(frame_rate, burst=_MAX_BLOCK_FRAMES)
+
+    def run(self, nodes: Iterable[RemoteNode]) -> list[ProgramResult]:
+        """Download the program to the given nodes.
+
+        Failures are reported in the results instead of stopping the
+        downloads to other nodes.
+
+        :return: The result for each node, in the same order.
+        """
+        with open(self.path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                raise ValueError("Program image is empty")
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as image:
+                with ThreadPoolExecutor(max_workers=self.concurrency,
+                                        thread_name_prefix="canopen-program") as executor:
+                    return list(executor.map(
+                        lambda node: self._download(node, image), nodes))
+
+    def _control(self, node: RemoteNode, command: int) -> None:
+        node.sdo.download(PROGRAM_CONTROL, self.program, bytes([command]))
+
+    def _download(self, node: RemoteNode, image: mmap.mmap) -> ProgramResult:
+        size = len(image)
+        start = time.monotonic()
+        sent = 0
+        try:
+            logger.info("Stopping program %d on node %d", self.program, node.id)
+            self._control(node, PROGRAM_STOP)
+            if self.clear:
+                self._control(node, PROGRAM_CLEAR)
+            # Leave the SDO budget of the network to interactive requests first
+            download = BlockDownload(node.sdo, PROGRAM_DATA, self.program,
+                                     priority=PRIORITY_BULK)
+
+            def on_block(acknowledged):
+                nonlocal sent
+                sent = acknowledged
+                if self.progress is not None:
+                    self.progress(node.id, sent, size, sent / (time.monotonic() - start))
+
+            with memoryview(image) as view:
+                download.run(view, progress=on_block, bucket=self.bucket)
+            if not download.crc_supported:
+                logger.warning("Node %d does not support CRC checking of block transfers",
+                               node.id)
+            self._start(node)
+        except Exception as exc:
+            logger.error("Program download to node %d failed: %s", node.id, exc)
+            return ProgramResult(node.id, sent, time.monotonic() - start, exc)
+        duration = time.monotonic() - start
+        logger.info("Program downloaded to node %d in %.1f s", node.id, duration)
+        return ProgramResult(node.id, size, duration)
+
+    def _start(self, node: RemoteNode) -> None:
+        """Start the program and wait for the boot-up message."""
+        booted = threading.Event()
+
+        def on_heartbeat(can_id, data, timestamp):
+            # Remote frames and other empty messages carry no state
+            if data and data[0] == 0:
+                booted.set()
+
+        # Listen before starting, the boot-up may come right away
+        node.network.subscribe(0x700 + node.id, on_heartbeat)
+        try:
+            try:
+                self._control(node, PROGRAM_START)
+            except SdoCommunicationError:
+                # The device may restart before responding
+                if self.bootup_timeout is None or not booted.wait(self.bootup_timeout):
+                    raise
+            if self.bootup_timeout is not None and not booted.wait(self.bootup_timeout):
+                raise NmtError(f"Timeout waiting for boot-up of node {node.id}")
+        finally:
+            node.network.unsubscribe(0x700 + node.id, on_heartbeat)
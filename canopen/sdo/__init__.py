@@ -1,6 +1,9 @@
 from canopen.sdo.base import SdoArray, SdoRecord, SdoVariable
+from canopen.sdo.cache import SdoCache
 from canopen.sdo.client import SdoClient
 from canopen.sdo.exceptions import SdoAbortedError, SdoCommunicationError
+from canopen.sdo.metrics import SdoMetrics, SdoStats, SdoTransfer
+from canopen.sdo.scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, SdoScheduler
 from canopen.sdo.server import SdoServer
 
 # Compatibility
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import binascii
-from collections.abc import Iterator, Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Optional, Union
 
 import canopen.network
 from canopen import objectdictionary
 from canopen import variable
+from canopen.sdo.cache import SdoCache
+from canopen.sdo.exceptions import SdoError
 from canopen.utils import pretty_index
 
 
@@ -28,6 +30,9 @@ class SdoBase(Mapping):
     #: The CRC algorithm used for block transfers
     crc_cls = CrcXmodem
 
+    #: Optional :class:`~canopen.sdo.cache.SdoCache` for uploaded values
+    cache: Optional[SdoCache] = None
+
     def __init__(
         self,
         rx_cobid: int,
@@ -93,6 +98,92 @@ class SdoBase(Mapping):
     ) -> None:
         raise NotImplementedError()
 
+    def upload_many(
+        self, items: Iterable[tuple[int, int]]
+    ) -> list[Union[bytes, Exception]]:
+        """Read several objects without an Object Dictionary.
+
+        Transfers which fail do not stop the others.  Subclasses may perform
+        the transfers more efficiently than one by one.
+
+        :param items: Pairs of index and sub-index to read.
+        :return: Per item the data, or the exception raised by the transfer.
+        """
+        results: list[Union[bytes, Exception]] = []
+        for index, subindex in items:
+            try:
+                results.append(self.upload(index, subindex))
+            except SdoError as e:
+                results.append(e)
+        return results
+
+    def download_many(
+        self, items: Iterable[tuple[int, int, bytes, bool]]
+    ) -> list[Optional[Exception]]:
+        """Write several objects without an Object Dictionary.
+
+        Transfers which fail do not stop the others.  Subclasses may perform
+        the transfers more efficiently than one by one.
+
+        :param items:
+            Tuples of index, sub-index, data and whether to force a segmented
+            transfer.
+        :return: Per item ``None``, or the exception raised by the transfer.
+        """
+        results: list[Optional[Exception]] = []
+        for index, subindex, data, force_segment in items:
+            try:
+                self.download(index, subindex, data, force_segment)
+                results.append(None)
+            except SdoError as e:
+                results.append(e)
+        return results
+
+
+def _read_variables(
+    sdo_node: SdoBase, variables: list[objectdictionary.ODVariable]
+) -> dict[int, Union[int, bool, float, str, bytes]]:
+    """Read and decode several variables with as few requests as possible."""
+    cache = sdo_node.cache
+    data: dict[int, bytes] = {}
+    missing = []
+    for od in variables:
+        cached = cache.get(od) if cache is not None else None
+        if cached is None:
+            missing.append(od)
+        else:
+            data[od.subindex] = cached
+    results = sdo_node.upload_many([(od.index, od.subindex) for od in missing])
+    for od, result in zip(missing, results):
+        if isinstance(result, Exception):
+            raise result
+        if od.fixed_size:
+            # Some devices send more data than the OD entry holds
+            result = result[:len(od) // 8]
+        if cache is not None:
+            cache.put(od, result)
+        data[od.subindex] = result
+    return {od.subindex: od.decode_raw(data[od.subindex]) for od in variables}
+
+
+def _write_variables(
+    sdo_node: SdoBase,
+    values: list[tuple[objectdictionary.ODVariable, Union[int, bool, float, str, bytes]]],
+) -> None:
+    """Encode and write several variables with as few requests as possible."""
+    items = [(od.index, od.subindex, od.encode_raw(value),
+              od.data_type == objectdictionary.DOMAIN)
+             for od, value in values]
+    try:
+        results = sdo_node.download_many(items)
+    finally:
+        if sdo_node.cache is not None:
+            for od, _ in values:
+                sdo_node.cache.invalidate(od.index, od.subindex)
+    for result in results:
+        if result is not None:
+            raise result
+
 
 class SdoRecord(Mapping):
 
@@ -117,6 +208,22 @@ class SdoRecord(Mapping):
     def __contains__(self, subindex: object) -> bool:
         return subindex in self.od
 
+    def read_all(self) -> dict[int, Union[int, bool, float, str, bytes]]:
+        """Read all readable entries, except the "highest subindex" one.
+
+        :return: Decoded raw value per sub-index.
+        """
+        return _read_variables(self.sdo_node, [
+            self.od[subindex] for subindex in self if self.od[subindex].readable])
+
+    def write_all(self, values: Mapping[Union[int, str], Union[int, bool, float, str, bytes]]):
+        """Write several entries at once.
+
+        :param values: Raw value per sub-index or name.
+        """
+        _write_variables(self.sdo_node, [
+            (self.od[subindex], value) for subindex, value in values.items()])
+
 
 class SdoArray(Mapping):
 
@@ -142,6 +249,21 @@ class SdoArray(Mapping):
             return False
         return 0 <= subindex <= len(self)
 
+    def read_all(self) -> dict[int, Union[int, bool, float, str, bytes]]:
+        """Read all entries, after reading the number of entries once.
+
+        :return: Decoded raw value per sub-index.
+        """
+        return _read_variables(self.sdo_node, [self.od[subindex] for subindex in self])
+
+    def write_all(self, values: Mapping[Union[int, str], Union[int, bool, float, str, bytes]]):
+        """Write several entries at once.
+
+        :param values: Raw value per sub-index or name.
+        """
+        _write_variables(self.sdo_node, [
+            (self.od[subindex], value) for subindex, value in values.items()])
+
 
 class SdoVariable(variable.Variable):
     """Access object dictionary variable values using SDO protocol."""
@@ -151,6 +273,11 @@ class SdoVariable(variable.Variable):
         variable.Variable.__init__(self, od)
 
     def get_data(self) -> bytes:
+        cache = self.sdo_node.cache
+        if cache is not None:
+            data = cache.get(self.od)
+            if data is not None:
+                return data
         data = self.sdo_node.upload(self.od.index, self.od.subindex)
         response_size = len(data)
 
@@ -162,11 +289,17 @@ class SdoVariable(variable.Variable):
             if response_size is None or var_size < response_size:
                 # Truncate the data to specified size
                 data = data[:var_size]
+        if cache is not None:
+            cache.put(self.od, data)
         return data
 
     def set_data(self, data: bytes):
         force_segment = self.od.data_type == objectdictionary.DOMAIN
-        self.sdo_node.download(self.od.index, self.od.subindex, data, force_segment)
+        try:
+            self.sdo_node.download(self.od.index, self.od.subindex, data, force_segment)
+        finally:
+            if self.sdo_node.cache is not None:
+                self.sdo_node.cache.invalidate(self.od.index, self.od.subindex)
 
     @property
     def writable(self) -> bool:
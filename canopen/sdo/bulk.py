@@ -0,0 +1,328 @@
+"""Concurrent SDO transfers to many servers, driven by their responses."""
+
+from __future__ import annotations
+
+import logging
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import Optional, Union
+
+from canopen.sdo.client import SdoClient
+from canopen.sdo.constants import *
+from canopen.sdo.exceptions import SdoAbortedError, SdoCommunicationError
+from canopen.utils import pretty_index
+
+
+logger = logging.getLogger(__name__)
+
+#: Result of one item, the uploaded data, ``None`` for a download or the error
+BulkResult = Union[bytes, None, Exception]
+
+
+class BulkItem:
+    """One upload or download within a bulk operation.
+
+    :param sdo: The SDO client to use
+    :param index: Index of the object
+    :param subindex: Sub-index of the object
+    :param data: Data to download, or ``None`` to upload
+    :param force_segment: Use a segmented download regardless of the size
+    """
+
+    def __init__(
+        self,
+        sdo: SdoClient,
+        index: int,
+        subindex: int,
+        data: Optional[bytes] = None,
+        force_segment: bool = False,
+    ):
+        self.sdo = sdo
+        self.index = index
+        self.subindex = subindex
+        self.data = data
+        self.force_segment = force_segment
+        #: Uploaded data, ``None`` after a download, or the raised exception
+        self.result: BulkResult = None
+
+    def __repr__(self) -> str:
+        action = "upload" if self.data is None else "download"
+        return f"<{type(self).__name__} {action} {pretty_index(self.index, self.subindex)}>"
+
+
+class _Channel:
+    """Expedited and segmented transfers on one SDO client, one item at a time."""
+
+    def __init__(self, engine: BulkTransfer, sdo: SdoClient):
+        self.engine = engine
+        self.sdo = sdo
+        self.pending: deque[BulkItem] = deque()
+        self.item: Optional[BulkItem] = None
+        self.request = b""
+        self.deadline = 0.0
+        self.sent_at = 0.0
+        self.retries_left = 0
+        self.toggle = 0
+        self.segmented = False
+        self.buffer = bytearray()
+        self.size: Optional[int] = None
+        self.pos = 0
+
+    def next_item(self) -> None:
+        while self.pending:
+            item = self.item = self.pending.popleft()
+            self.toggle = 0
+            self.segmented = False
+            self.buffer = bytearray()
+            self.size = None
+            self.pos = 0
+            if item.data is None:
+                self.sdo._begin_transfer("upload", item.index, item.subindex)
+            else:
+                segmented = len(item.data) > 4 or item.force_segment
+                self.sdo._begin_transfer("download", item.index, item.subindex,
+                                         "segmented" if segmented else "expedited")
+            try:
+                self.send(self._initiate(item))
+                return
+            except Exception as e:
+                logger.error("Could not start %r: %s", item, e)
+                item.result = e
+                self.sdo._end_transfer(0)
+        self.item = None
+
+    @staticmethod
+    def _initiate(item: BulkItem) -> bytearray:
+        request = bytearray(8)
+        if item.data is None:
+            SDO_STRUCT.pack_into(request, 0, REQUEST_UPLOAD, item.index, item.subindex)
+        elif len(item.data) <= 4 and not item.force_segment:
+            command = REQUEST_DOWNLOAD | EXPEDITED | SIZE_SPECIFIED
+            command |= (4 - len(item.data)) << 2
+            SDO_STRUCT.pack_into(request, 0, command, item.index, item.subindex)
+            request[4:4 + len(item.data)] = item.data
+        else:
+            command = REQUEST_DOWNLOAD | SIZE_SPECIFIED
+            SDO_STRUCT.pack_into(request, 0, command, item.index, item.subindex)
+            struct.pack_into("<L", request, 4, len(item.data))
+        return request
+
+    def send(self, request: bytes) -> None:
+        self.request = bytes(request)
+        self.retries_left = self.sdo.MAX_RETRIES
+        self.sdo._kind = "segmented" if self.segmented else "expedited"
+        self.sdo.send_request(self.request)
+        self.sent_at = time.monotonic()
+        self.deadline = self.sent_at + self.sdo.response_timeout()
+
+    def finish(self, result: BulkResult) -> None:
+        item = self.item
+        item.result = result
+        if isinstance(result, bytes):
+            size = len(result)
+        elif result is None:
+            size = len(item.data)
+        else:
+            size = len(self.buffer) if item.data is None else self.pos
+        if item.data is not None:
+            self.sdo._invalidate(item.index, item.subindex)
+        self.sdo._end_transfer(size)
+        self.next_item()
+
+    def fail(self, exc: Exception, abort_code: Optional[int] = None) -> None:
+        if abort_code is not None:
+            try:
+                self.sdo.abort(abort_code)
+            except Exception as e:
+                logger.warning("Could not send SDO abort: %s", e)
+        self.finish(exc)
+
+    def check_timeout(self, now: float) -> None:
+        if self.item is None or now < self.deadline:
+            return
+        self.retries_left -= 1
+        if self.retries_left <= 0:
+            self.fail(SdoCommunicationError("No SDO response received"), ABORT_TIMED_OUT)
+            return
+        logger.warning("No SDO response received, retrying %r", self.item)
+        trace = self.sdo._trace
+        if trace is not None:
+            trace.waiting += now - self.sent_at
+            trace.retries += 1
+        self.sdo._retransmission = True
+        try:
+            self.sdo.send_request(self.request)
+        finally:
+            self.sdo._retransmission = False
+        self.sent_at = time.monotonic()
+        self.deadline = self.sent_at + self.sdo.response_timeout()
+
+    def on_response(self, response: bytes) -> None:
+        if self.item is None:
+            logger.debug("Ignoring unexpected SDO response %s", response.hex())
+            return
+        trace = self.sdo._trace
+        if trace is not None:
+            trace.waiting += time.monotonic() - self.sent_at
+        command = response[0]
+        if command == RESPONSE_ABORTED:
+            abort_code, = struct.unpack_from("<L", response, 4)
+            if trace is not None:
+                trace.abort_code = abort_code
+            self.finish(SdoAbortedError(abort_code))
+        elif self.item.data is None:
+            self._on_upload_response(command, response)
+        else:
+            self._on_download_response(command, response)
+
+    def _on_upload_response(self, command: int, response: bytes) -> None:
+        ccs = command & 0xE0
+        trace = self.sdo._trace
+        if ccs == RESPONSE_UPLOAD and not self.segmented:
+            if trace is not None:
+                trace.mode = "expedited" if command & EXPEDITED else "segmented"
+            if command & EXPEDITED:
+                size = 4
+                if command & SIZE_SPECIFIED:
+                    size -= (command >> 2) & 0x3
+                self.finish(bytes(response[4:4 + size]))
+                return
+            if command & SIZE_SPECIFIED:
+                self.size, = struct.unpack_from("<L", response, 4)
+            self.segmented = True
+        elif ccs == RESPONSE_SEGMENT_UPLOAD and self.segmented:
+            if command & TOGGLE_BIT != self.toggle:
+                self.fail(SdoCommunicationError("Toggle bit mismatch"),
+                          ABORT_TOGGLE_NOT_ALTERNATED)
+                return
+            if trace is not None:
+                trace.segments += 1
+            length = 7 - ((command >> 1) & 0x7)
+            self.buffer += response[1:length + 1]
+            self.toggle ^= TOGGLE_BIT
+            if command & NO_MORE_DATA:
+                data = bytes(self.buffer)
+                if self.size is not None and self.size < len(data):
+                    data = data[:self.size]
+                self.finish(data)
+                return
+        else:
+            self.fail(SdoCommunicationError(f"Unexpected response 0x{command:02X}"),
+                      ABORT_INVALID_COMMAND_SPECIFIER)
+            return
+        request = bytearray(8)
+        request[0] = REQUEST_SEGMENT_UPLOAD | self.toggle
+        self.send(request)
+
+    def _on_download_response(self, command: int, response: bytes) -> None:
+        ccs = command & 0xE0
+        data = self.item.data
+        if ccs == RESPONSE_DOWNLOAD and not self.segmented:
+            if len(data) <= 4 and not self.item.force_segment:
+                self.finish(None)
+                return
+            self.segmented = True
+        elif ccs == RESPONSE_SEGMENT_DOWNLOAD and self.segmented:
+            if command & TOGGLE_BIT != self.toggle:
+                self.fail(SdoCommunicationError("Toggle bit mismatch"),
+                          ABORT_TOGGLE_NOT_ALTERNATED)
+                return
+            self.toggle ^= TOGGLE_BIT
+            if self.pos >= len(data):
+                self.finish(None)
+                return
+        else:
+            self.fail(SdoCommunicationError(f"Unexpected response 0x{command:02X}"),
+                      ABORT_INVALID_COMMAND_SPECIFIER)
+            return
+        segment = data[self.pos:self.pos + 7]
+        self.pos += len(segment)
+        if self.sdo._trace is not None:
+            self.sdo._trace.segments += 1
+        request = bytearray(8)
+        request[0] = REQUEST_SEGMENT_DOWNLOAD | self.toggle | ((7 - len(segment)) << 1)
+        if self.pos >= len(data):
+            request[0] |= NO_MORE_DATA
+        request[1:1 + len(segment)] = segment
+        self.send(request)
+
+
+class BulkTransfer:
+    """Runs SDO transfers on many channels in parallel.
+
+    Each SDO client processes its items in order with one transfer in flight,
+    while all clients proceed concurrently.  Instead of waiting in a thread per
+    client, the thread calling :meth:`run` advances the state machines as the
+    responses arrive, so the total duration is bounded by the slowest server.
+    The receive callbacks only queue the responses, so a slow
+    :class:`~canopen.sdo.scheduler.SdoScheduler` never holds up the reception
+    of other messages.
+
+    Only expedited and segmented transfers are used.
+
+    :param items: The transfers to perform
+    """
+
+    def __init__(self, items: Iterable[BulkItem]):
+        self.items = list(items)
+        self.condition = threading.Condition()
+        # Responses received but not yet processed
+        self._responses: list[tuple[_Channel, bytes]] = []
+        # SDO clients are mappings and therefore not hashable
+        self._channels: dict[int, _Channel] = {}
+        for item in self.items:
+            if id(item.sdo) not in self._channels:
+                self._channels[id(item.sdo)] = _Channel(self, item.sdo)
+            self._channels[id(item.sdo)].pending.append(item)
+
+    def _hook(self, channel: _Channel):
+        def on_response(response: bytes) -> None:
+            with self.condition:
+                self._responses.append((channel, response))
+                self.condition.notify_all()
+        return on_response
+
+    def run(self) -> list[BulkResult]:
+        """Perform all transfers and wait for them to complete.
+
+        :return: The result of each item in order, see :attr:`BulkItem.result`.
+        """
+        for channel in self._channels.values():
+            if channel.sdo.response_hook is not None:
+                raise RuntimeError(f"SDO client 0x{channel.sdo.rx_cobid:X} is already in use")
+        try:
+            for channel in self._channels.values():
+                channel.sdo.response_hook = self._hook(channel)
+                channel.next_item()
+            while True:
+                with self.condition:
+                    responses, self._responses = self._responses, []
+                # Requests are sent from this thread only, never while holding
+                # the lock the receive callbacks need
+                for channel, response in responses:
+                    try:
+                        channel.on_response(response)
+                    except Exception as e:
+                        # Most likely the next request could not be sent
+                        if channel.item is not None:
+                            channel.finish(e)
+                now = time.monotonic()
+                for channel in self._channels.values():
+                    try:
+                        channel.check_timeout(now)
+                    except Exception as e:
+                        channel.finish(e)
+                active = [ch for ch in self._channels.values() if ch.item is not None]
+                if not active:
+                    break
+                deadline = min(channel.deadline for channel in active)
+                with self.condition:
+                    if not self._responses:
+                        self.condition.wait(max(deadline - now, 0))
+        finally:
+            for channel in self._channels.values():
+                channel.sdo.response_hook = None
+        return [item.result for item in self.items]
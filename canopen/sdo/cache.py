@@ -0,0 +1,127 @@
+"""Caching of SDO uploads depending on the object's access type."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from canopen import objectdictionary
+
+
+logger = logging.getLogger(__name__)
+
+
+class SdoCache:
+    """Remembers uploaded values to avoid repeated SDO requests.
+
+    Which values are cached and for how long depends on the access type in
+    the object dictionary:
+
+    ======== ==============================================================
+    Access   Caching
+    -------- --------------------------------------------------------------
+    const    Forever, until invalidated explicitly
+    ro       For :attr:`ttl` seconds
+    rw       Until our own download, or for :attr:`rw_ttl` seconds if set
+    rwr, rww Never, as these are usually mapped to PDOs
+    wo       Never
+    ======== ==============================================================
+
+    Writable values which the device changes by itself should get a short
+    :attr:`rw_ttl`, or be invalidated by the application.
+
+    :param ttl:
+        Seconds to keep read-only values, ``None`` to keep them until
+        invalidated or 0 to not cache them.
+    :param rw_ttl:
+        Seconds to keep writable values, ``None`` to keep them until written
+        or invalidated or 0 to not cache them.
+    """
+
+    #: Access types which are never cached
+    UNCACHED = frozenset(["rwr", "rww", "wo"])
+
+    def __init__(self, ttl: Optional[float] = 1.0, rw_ttl: Optional[float] = None):
+        #: Seconds to keep read-only values (``None`` for no limit, 0 to disable)
+        self.ttl = ttl
+        #: Seconds to keep writable values (``None`` for no limit, 0 to disable)
+        self.rw_ttl = rw_ttl
+        #: Skip the cache for reads, while still invalidating on writes
+        self.bypass = False
+        #: Number of reads served from the cache
+        self.hits = 0
+        #: Number of reads of cacheable values which needed an upload
+        self.misses = 0
+        #: Number of reads which needed an upload, as the value is not cached
+        #: for its access type
+        self.uncacheable = 0
+        self._entries: dict[tuple[int, int], tuple[bytes, Optional[float]]] = {}
+        # Reads and writes may happen from several threads
+        self._lock = threading.Lock()
+
+    def _lifetime(self, od: objectdictionary.ODVariable) -> Optional[float]:
+        """Seconds to keep the value, ``None`` for forever or 0 to not cache."""
+        if od.access_type == "const":
+            return None
+        if od.access_type == "ro":
+            return self.ttl
+        if od.access_type in self.UNCACHED:
+            return 0.0
+        return self.rw_ttl
+
+    def get(self, od: objectdictionary.ODVariable) -> Optional[bytes]:
+        """Look up a cached value.
+
+        :return: The data, or ``None`` if not cached or expired.
+        """
+        if self.bypass:
+            return None
+        if self._lifetime(od) == 0:
+            with self._lock:
+                self.uncacheable += 1
+            return None
+        key = (od.index, od.subindex)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, expires = entry
+                if expires is None or time.monotonic() < expires:
+                    self.hits += 1
+                    return data
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, od: objectdictionary.ODVariable, data: bytes) -> None:
+        """Store an uploaded value, if its access type allows caching."""
+        lifetime = self._lifetime(od)
+        if lifetime is None:
+            expires = None
+        elif lifetime > 0:
+            expires = time.monotonic() + lifetime
+        else:
+            return
+        with self._lock:
+            self._entries[(od.index, od.subindex)] = (data, expires)
+
+    def invalidate(self, index: Optional[int] = None, subindex: Optional[int] = None) -> None:
+        """Forget cached values.
+
+        :param index:
+            Only forget entries of this index, otherwise all.
+        :param subindex:
+            Only forget this sub-index of the given index, otherwise all.
+        """
+        with self._lock:
+            if index is None:
+                self._entries.clear()
+            elif subindex is None:
+                for key in [key for key in self._entries if key[0] == index]:
+                    del self._entries[key]
+            else:
+                self._entries.pop((index, subindex), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,8 +1,11 @@
 import io
 import logging
+import mmap
+import os
 import queue
 import struct
 import time
+from typing import Callable, Optional, Union
 
 from can import CanError
 
@@ -10,11 +13,63 @@ from canopen import objectdictionary
 from canopen.sdo.base import SdoBase
 from canopen.sdo.constants import *
 from canopen.sdo.exceptions import *
-from canopen.utils import pretty_index
+from canopen.sdo.metrics import SdoTransfer, _TransferTrace
+from canopen.sdo.scheduler import PRIORITY_INTERACTIVE
+from canopen.utils import TokenBucket, pretty_index
 
 
 logger = logging.getLogger(__name__)
 
+# Largest indicated size to allocate a buffer for up front in upload()
+_MAX_PREALLOCATE = 1 << 24
+
+
+class RttEstimator:
+    """Smoothed round-trip time and its variation, as used for TCP (RFC 6298)."""
+
+    #: Gain for the smoothed round-trip time
+    ALPHA = 1 / 8
+    #: Gain for the round-trip time variation
+    BETA = 1 / 4
+    #: Weight of the variation in the timeout
+    K = 4
+
+    def __init__(self):
+        #: Smoothed round-trip time in seconds, ``None`` before the first sample
+        self.srtt: Optional[float] = None
+        #: Round-trip time variation in seconds
+        self.rttvar = 0.0
+        #: Number of measurements taken
+        self.samples = 0
+        #: Factor applied to the timeout after consecutive timeouts
+        self.backoff = 1
+
+    def update(self, rtt: float) -> None:
+        """Add a round-trip time measurement."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+        self.samples += 1
+        self.backoff = 1
+
+    @property
+    def rto(self) -> Optional[float]:
+        """Retransmission timeout in seconds, including the backoff.
+
+        ``None`` until the first measurement.
+        """
+        if self.srtt is None:
+            return None
+        return (self.srtt + self.K * self.rttvar) * self.backoff
+
+    def __repr__(self) -> str:
+        srtt = "-" if self.srtt is None else f"{self.srtt * 1000:.2f} ms"
+        return (f"<{type(self).__name__} srtt={srtt} "
+                f"rttvar={self.rttvar * 1000:.2f} ms samples={self.samples}>")
+
 
 class SdoClient(SdoBase):
     """Handles communication with an SDO server."""
@@ -25,12 +80,25 @@ class SdoClient(SdoBase):
     #: Max number of request retries before raising error
     MAX_RETRIES = 1
 
-    #: Seconds to wait before sending a request, for rate limiting
+    #: Seconds to wait before sending a request, for rate limiting.  See also
+    #: :attr:`canopen.Network.sdo_scheduler`.
     PAUSE_BEFORE_SEND = 0.0
 
     #: Seconds to wait before retrying a request after a send error
     RETRY_DELAY = 0.1
 
+    #: Derive the response timeout from measured round-trip times
+    ADAPTIVE_TIMEOUT = False
+
+    #: Lower bound in seconds for the adaptive response timeout
+    MIN_TIMEOUT = 0.01
+
+    #: Upper bound in seconds for the adaptive response timeout
+    MAX_TIMEOUT = 3.0
+
+    #: Kinds of transfer with separate round-trip time estimates
+    TRANSFER_KINDS = ("expedited", "segmented", "block")
+
     def __init__(self, rx_cobid, tx_cobid, od):
         """
         :param int rx_cobid:
@@ -42,15 +110,104 @@ class SdoClient(SdoBase):
         """
         SdoBase.__init__(self, rx_cobid, tx_cobid, od)
         self.responses = queue.Queue()
+        #: Function receiving each response instead of the queue, while set
+        self.response_hook = None
+        #: Round-trip time estimates per kind of transfer
+        self.rtt = {kind: RttEstimator() for kind in self.TRANSFER_KINDS}
+        self._kind = "expedited"
+        self._sent_at: Optional[float] = None
+        self._retransmission = False
+        #: Priority class for the :class:`~canopen.sdo.scheduler.SdoScheduler`
+        #: of the network
+        self.priority = PRIORITY_INTERACTIVE
+        self._transfer_callbacks: list[Callable[[SdoTransfer], None]] = []
+        # Counters of the current transfer, only while callbacks are registered
+        self._trace: Optional[_TransferTrace] = None
+
+    def add_transfer_callback(self, callback: Callable[[SdoTransfer], None]) -> None:
+        """Call a function with the record of each transfer when it ends.
+
+        While no callback is added, no metrics are collected.
+
+        :param callback:
+            Function receiving a :class:`~canopen.sdo.metrics.SdoTransfer`,
+            e.g. a :class:`~canopen.sdo.metrics.SdoMetrics` instance.
+        """
+        self._transfer_callbacks.append(callback)
+
+    def remove_transfer_callback(self, callback: Callable[[SdoTransfer], None]) -> None:
+        """Stop calling a function added with :meth:`add_transfer_callback`."""
+        self._transfer_callbacks.remove(callback)
+
+    def _begin_transfer(self, direction: str, index: int, subindex: int,
+                        mode: Optional[str] = None) -> None:
+        if self._transfer_callbacks:
+            self._trace = _TransferTrace(self.rx_cobid & 0x7F, index, subindex,
+                                         direction, mode)
+
+    def _end_transfer(self, size: int) -> None:
+        trace = self._trace
+        if trace is None:
+            return
+        self._trace = None
+        transfer = trace.finish(size)
+        for callback in self._transfer_callbacks:
+            callback(transfer)
+
+    def _invalidate(self, index: int, subindex: int) -> None:
+        # Values in the cache may be outdated after a download
+        if self.cache is not None:
+            self.cache.invalidate(index, subindex)
+
+    def response_timeout(self, kind: Optional[str] = None) -> float:
+        """Time in seconds to wait for a response.
+
+        This is :attr:`RESPONSE_TIMEOUT`, unless :attr:`ADAPTIVE_TIMEOUT` is
+        enabled.  Then it is calculated from the measured round-trip times
+        and limited to :attr:`MIN_TIMEOUT` and :attr:`MAX_TIMEOUT`.
+
+        :param kind:
+            One of :attr:`TRANSFER_KINDS`, defaults to the current transfer.
+        """
+        if not self.ADAPTIVE_TIMEOUT:
+            return self.RESPONSE_TIMEOUT
+        estimate = self.rtt[kind or self._kind]
+        rto = estimate.rto
+        if rto is None:
+            rto = self.RESPONSE_TIMEOUT * estimate.backoff
+        return min(max(rto, self.MIN_TIMEOUT), self.MAX_TIMEOUT)
 
     def on_response(self, can_id, data, timestamp):
-        self.responses.put(bytes(data))
+        scheduler = self.network.sdo_scheduler
+        if scheduler is not None:
+            scheduler.charge()
+        sent_at = self._sent_at
+        if sent_at is not None:
+            self._sent_at = None
+            self.rtt[self._kind].update(time.monotonic() - sent_at)
+        if self.response_hook is not None:
+            self.response_hook(bytes(data))
+        else:
+            self.responses.put(bytes(data))
 
-    def send_request(self, request):
+    def send_request(self, request, priority: Optional[int] = None):
         retries_left = self.MAX_RETRIES
+        trace = self._trace
+        if trace is not None:
+            started = time.monotonic()
         if self.PAUSE_BEFORE_SEND:
             time.sleep(self.PAUSE_BEFORE_SEND)
+        scheduler = self.network.sdo_scheduler
+        if scheduler is not None:
+            if priority is None:
+                priority = self.priority
+            scheduler.acquire(self.rx_cobid & 0x7F, 1, priority)
+        if trace is not None:
+            sending = time.monotonic()
+            trace.waiting += sending - started
         while True:
+            # Responses to retransmitted requests are ambiguous (Karn's algorithm)
+            self._sent_at = None if self._retransmission else time.monotonic()
             try:
                 self.network.send_message(self.rx_cobid, request)
             except CanError as e:
@@ -63,6 +220,8 @@ class SdoClient(SdoBase):
                     time.sleep(self.RETRY_DELAY)
             else:
                 break
+        if trace is not None:
+            trace.sending += time.monotonic() - sending
 
     def read_response(self):
         """Wait for an SDO response and handle timeout or remote abort.
@@ -72,33 +231,61 @@ class SdoClient(SdoBase):
         :raises canopen.SdoCommunicationError:
             After timeout with no response received.
         """
+        trace = self._trace
+        if trace is not None:
+            started = time.monotonic()
         try:
             response = self.responses.get(
-                block=True, timeout=self.RESPONSE_TIMEOUT)
+                block=True, timeout=self.response_timeout())
         except queue.Empty:
+            self._sent_at = None
+            if self.ADAPTIVE_TIMEOUT and self.response_timeout() < self.MAX_TIMEOUT:
+                self.rtt[self._kind].backoff *= 2
             raise SdoCommunicationError("No SDO response received")
+        finally:
+            if trace is not None:
+                trace.waiting += time.monotonic() - started
         res_command, = struct.unpack_from("B", response)
         if res_command == RESPONSE_ABORTED:
             abort_code, = struct.unpack_from("<L", response, 4)
+            if trace is not None:
+                trace.abort_code = abort_code
             raise SdoAbortedError(abort_code)
         return response
 
-    def request_response(self, sdo_request):
+    @staticmethod
+    def _transfer_kind(request) -> str:
+        command = request[0] & 0xE0
+        if command in (REQUEST_SEGMENT_UPLOAD, REQUEST_SEGMENT_DOWNLOAD):
+            return "segmented"
+        if command in (REQUEST_BLOCK_UPLOAD, REQUEST_BLOCK_DOWNLOAD):
+            return "block"
+        return "expedited"
+
+    def request_response(self, sdo_request, priority: Optional[int] = None):
         retries_left = self.MAX_RETRIES
         if not self.responses.empty():
             # logger.warning("There were unexpected messages in the queue")
             self.responses = queue.Queue()
-        while True:
-            self.send_request(sdo_request)
-            # Wait for node to respond
-            try:
-                return self.read_response()
-            except SdoCommunicationError as e:
-                retries_left -= 1
-                if not retries_left:
-                    self.abort(ABORT_TIMED_OUT)
-                    raise
-                logger.warning(str(e))
+        # Block segments are sent with send_request() and keep the kind
+        self._kind = self._transfer_kind(sdo_request)
+        try:
+            while True:
+                self.send_request(sdo_request, priority)
+                # Wait for node to respond
+                try:
+                    return self.read_response()
+                except SdoCommunicationError as e:
+                    retries_left -= 1
+                    if not retries_left:
+                        self.abort(ABORT_TIMED_OUT)
+                        raise
+                    logger.warning(str(e))
+                    self._retransmission = True
+                    if self._trace is not None:
+                        self._trace.retries += 1
+        finally:
+            self._retransmission = False
 
     def abort(self, abort_code=ABORT_GENERAL_ERROR):
         """Abort current transfer."""
@@ -107,6 +294,10 @@ class SdoClient(SdoBase):
         # TODO: Is it necessary to include index and subindex?
         struct.pack_into("<L", request, 4, abort_code)
         self.send_request(request)
+        # No response expected
+        self._sent_at = None
+        if self._trace is not None:
+            self._trace.abort_code = abort_code
         logger.error("Transfer aborted by client with code 0x%08X", abort_code)
 
     def upload(self, index: int, subindex: int) -> bytes:
@@ -129,12 +320,95 @@ class SdoClient(SdoBase):
             When node responds with an error.
         """
         with self.open(index, subindex, buffering=0) as fp:
-            response_size = fp.size
-            data = fp.read()
+            if not fp.size or fp.size > _MAX_PREALLOCATE:
+                data = fp.read()
+                if fp.size and fp.size < len(data):
+                    data = data[:fp.size]
+                return data
+            # Receive into a buffer of the indicated size, drop any excess
+            data = bytearray(fp.size)
+            size = _fill(fp, data)
+            while fp.read(7):
+                pass
+        return bytes(data) if size == len(data) else bytes(data[:size])
+
+    def upload_into(self, index: int, subindex: int, buffer, block_transfer: bool = False) -> int:
+        """Read an object directly into a pre-allocated buffer.
+
+        Each segment is copied from the received frame into the buffer, which
+        avoids intermediate copies for large domains.
 
-        if response_size and response_size < len(data):
-            data = data[:response_size]
-        return data
+        :param index:
+            Index of object to read.
+        :param subindex:
+            Sub-index of object to read.
+        :param buffer:
+            A writable bytes-like object, e.g. a :class:`bytearray` or a
+            :class:`mmap.mmap`, large enough for the data.
+        :param block_transfer:
+            Use block transfer.
+
+        :return: The number of bytes read.
+
+        :raises ValueError:
+            If the data does not fit into the buffer.  The transfer is aborted.
+        :raises canopen.SdoCommunicationError:
+            On unexpected response or timeout.
+        :raises canopen.SdoAbortedError:
+            When node responds with an error.
+        """
+        with self.open(index, subindex, buffering=0, block_transfer=block_transfer) as fp:
+            return _read_into(fp, buffer)
+
+    def upload_to_file(
+        self,
+        index: int,
+        subindex: int,
+        path: Union[str, os.PathLike],
+        block_transfer: bool = False,
+    ) -> int:
+        """Read an object into a file.
+
+        If the server indicates the size, the file is created with that size
+        and the data is received into a memory map of it.
+
+        :param index:
+            Index of object to read.
+        :param subindex:
+            Sub-index of object to read.
+        :param path:
+            File to create or overwrite.
+        :param block_transfer:
+            Use block transfer.
+
+        :return: The number of bytes read.
+
+        :raises ValueError:
+            If the server sends more data than indicated.  The transfer is
+            aborted.
+        :raises canopen.SdoCommunicationError:
+            On unexpected response or timeout.
+        :raises canopen.SdoAbortedError:
+            When node responds with an error.
+        """
+        with self.open(index, subindex, buffering=0, block_transfer=block_transfer) as fp, \
+                open(path, "w+b") as out:
+            if fp.size:
+                out.truncate(fp.size)
+                with mmap.mmap(out.fileno(), fp.size) as image:
+                    size = _read_into(fp, image)
+                if size < fp.size:
+                    out.truncate(size)
+                return size
+            size = 0
+            chunk = bytearray(io.DEFAULT_BUFFER_SIZE)
+            with memoryview(chunk) as view:
+                while True:
+                    n = _fill(fp, view)
+                    out.write(view[:n])
+                    size += n
+                    if n < len(view):
+                        return size
 
     def download(
         self,
@@ -142,6 +416,7 @@ class SdoClient(SdoBase):
         subindex: int,
         data: bytes,
         force_segment: bool = False,
+        block_transfer: bool = False,
     ) -> None:
         """May be called to make a write operation without an Object Dictionary.
 
@@ -153,16 +428,39 @@ class SdoClient(SdoBase):
             Data to be written.
         :param force_segment:
             Force use of segmented transfer regardless of data size.
+        :param block_transfer:
+            Use block transfer, see :class:`BlockDownload`.
 
         :raises canopen.SdoCommunicationError:
             On unexpected response or timeout.
         :raises canopen.SdoAbortedError:
             When node responds with an error.
         """
+        if block_transfer:
+            BlockDownload(self, index, subindex).run(data)
+            return
         with self.open(index, subindex, "wb", buffering=7, size=len(data),
                        force_segment=force_segment) as fp:
             fp.write(data)
 
+    def upload_many(self, items):
+        """Read several objects, keeping one transfer in flight.
+
+        See :meth:`canopen.sdo.base.SdoBase.upload_many`.
+        """
+        from canopen.sdo.bulk import BulkItem, BulkTransfer
+        return BulkTransfer(BulkItem(self, index, subindex)
+                            for index, subindex in items).run()
+
+    def download_many(self, items):
+        """Write several objects, keeping one transfer in flight.
+
+        See :meth:`canopen.sdo.base.SdoBase.download_many`.
+        """
+        from canopen.sdo.bulk import BulkItem, BulkTransfer
+        return BulkTransfer(BulkItem(self, index, subindex, data, force_segment)
+                            for index, subindex, data, force_segment in items).run()
+
     def open(self, index, subindex=0, mode="rb", encoding="ascii",
              buffering=1024, size=None, block_transfer=False, force_segment=False, request_crc_support=True):
         """Open the data stream as a file like object.
@@ -201,20 +499,22 @@ class SdoClient(SdoBase):
             A file like object.
         """
         buffer_size = buffering if buffering > 1 else io.DEFAULT_BUFFER_SIZE
+        if "w" in mode:
+            self._invalidate(index, subindex)
+        self._begin_transfer("upload" if "r" in mode else "download", index, subindex,
+                             "block" if block_transfer else None)
+        try:
+            raw_stream = self._open_raw(index, subindex, mode, size, block_transfer,
+                                        force_segment, request_crc_support)
+        except Exception:
+            self._end_transfer(0)
+            raise
         if "r" in mode:
-            if block_transfer:
-                raw_stream = BlockUploadStream(self, index, subindex, request_crc_support=request_crc_support)
-            else:
-                raw_stream = ReadableStream(self, index, subindex)
             if buffering:
                 buffered_stream = io.BufferedReader(raw_stream, buffer_size=buffer_size)
             else:
                 return raw_stream
         if "w" in mode:
-            if block_transfer:
-                raw_stream = BlockDownloadStream(self, index, subindex, size, request_crc_support=request_crc_support)
-            else:
-                raw_stream = WritableStream(self, index, subindex, size, force_segment)
             if buffering:
                 buffered_stream = io.BufferedWriter(raw_stream, buffer_size=buffer_size)
             else:
@@ -226,6 +526,50 @@ class SdoClient(SdoBase):
                                     line_buffering=line_buffering)
         return buffered_stream
 
+    def _open_raw(self, index, subindex, mode, size, block_transfer, force_segment,
+                  request_crc_support):
+        if "r" in mode:
+            if block_transfer:
+                return BlockUploadStream(self, index, subindex, request_crc_support=request_crc_support)
+            return ReadableStream(self, index, subindex)
+        if block_transfer:
+            return BlockDownloadStream(self, index, subindex, size, request_crc_support=request_crc_support)
+        return WritableStream(self, index, subindex, size, force_segment)
+
+
+def _fill(fp, buffer) -> int:
+    """Read from a raw upload stream until the buffer is full or at EOF."""
+    with memoryview(buffer) as view, view.cast("B") as view:
+        pos = 0
+        end = len(view)
+        # Whole segments fit, copy them straight from the received frames
+        while end - pos >= 7:
+            data = fp.read(7)
+            if not data:
+                return pos
+            view[pos:pos + len(data)] = data
+            pos += len(data)
+        while pos < end:
+            n = fp.readinto(view[pos:])
+            if not n:
+                break
+            pos += n
+        return pos
+
+
+def _read_into(fp, buffer) -> int:
+    """Read all data of a raw upload stream into a buffer."""
+    with memoryview(buffer) as view:
+        if fp.size is not None and fp.size > view.nbytes:
+            fp.abort(ABORT_OUT_OF_MEMORY)
+            raise ValueError(f"Buffer of {view.nbytes} bytes is too small "
+                             f"for {fp.size} bytes")
+        size = _fill(fp, view)
+        if size == view.nbytes and fp.readinto(bytearray(1)):
+            fp.abort(ABORT_OUT_OF_MEMORY)
+            raise ValueError(f"More than {size} bytes received")
+    return size
+
 
 class ReadableStream(io.RawIOBase):
     """File like object for reading from a variable."""
@@ -246,6 +590,8 @@ class ReadableStream(io.RawIOBase):
         self.sdo_client = sdo_client
         self._toggle = 0
         self.pos = 0
+        # Received data not yet returned by readinto()
+        self._remainder = b""
 
         logger.debug("Reading 0x%04X:%02X from node %d", index, subindex,
                      sdo_client.rx_cobid - 0x600)
@@ -266,6 +612,9 @@ class ReadableStream(io.RawIOBase):
                 "on the same SDO channel?")
 
         self.exp_data = None
+        trace = sdo_client._trace
+        if trace is not None:
+            trace.mode = "expedited" if res_command & EXPEDITED else "segmented"
         if res_command & EXPEDITED:
             # Expedited upload
             if res_command & SIZE_SPECIFIED:
@@ -289,6 +638,10 @@ class ReadableStream(io.RawIOBase):
         :returns: 1 - 7 bytes of data or no bytes if EOF.
         :rtype: bytes
         """
+        if self._remainder:
+            data = self._remainder
+            self._remainder = b""
+            return data
         if self._done:
             return b""
         if self.exp_data is not None:
@@ -296,7 +649,10 @@ class ReadableStream(io.RawIOBase):
             return self.exp_data
         if size is None or size < 0:
             return self.readall()
+        return self._read_segment()
 
+    def _read_segment(self):
+        """Request the next segment and return its data."""
         command = REQUEST_SEGMENT_UPLOAD
         command |= self._toggle
         request = bytearray(8)
@@ -314,16 +670,44 @@ class ReadableStream(io.RawIOBase):
             self._done = True
         self._toggle ^= TOGGLE_BIT
         self.pos += length
+        if self.sdo_client._trace is not None:
+            self.sdo_client._trace.segments += 1
         return response[1:length + 1]
 
     def readinto(self, b):
+        """Read the next segment into a pre-allocated, writable bytes-like object.
+
+        The data is copied from the received frame to *b* directly.  Data
+        which does not fit is kept for the next call.
+
+        :returns: The number of bytes read, 0 if EOF.
         """
-        Read bytes into a pre-allocated, writable bytes-like object b,
-        and return the number of bytes read.
-        """
-        data = self.read(7)
-        b[:len(data)] = data
-        return len(data)
+        data = self._remainder
+        if not data:
+            if self._done:
+                return 0
+            if self.exp_data is not None:
+                self._done = True
+                data = self.exp_data
+            else:
+                data = self._read_segment()
+        n = min(len(b), len(data))
+        b[:n] = data[:n]
+        self._remainder = data[n:]
+        return n
+
+    def abort(self, abort_code=ABORT_GENERAL_ERROR):
+        """Abort the transfer."""
+        if not self._done:
+            self.sdo_client.abort(abort_code)
+        self._done = True
+        self._remainder = b""
+
+    def close(self):
+        if self.closed:
+            return
+        super(ReadableStream, self).close()
+        self.sdo_client._end_transfer(self.pos)
 
     def readable(self):
         return True
@@ -349,13 +733,18 @@ class WritableStream(io.RawIOBase):
             Force use of segmented transfer regardless of size.
         """
         self.sdo_client = sdo_client
+        self._index = index
+        self._subindex = subindex
         self.size = size
         self.pos = 0
         self._toggle = 0
         self._exp_header = None
         self._done = False
 
-        if size is None or size < 1 or size > 4 or force_segment:
+        segmented = size is None or size < 1 or size > 4 or force_segment
+        if sdo_client._trace is not None:
+            sdo_client._trace.mode = "segmented" if segmented else "expedited"
+        if segmented:
             # Initiate segmented download
             request = bytearray(8)
             command = REQUEST_DOWNLOAD
@@ -417,6 +806,8 @@ class WritableStream(io.RawIOBase):
             command |= (7 - bytes_sent) << 1
             request[0] = command
             request[1:bytes_sent + 1] = b[0:bytes_sent]
+            if self.sdo_client._trace is not None:
+                self.sdo_client._trace.segments += 1
             response = self.sdo_client.request_response(request)
             res_command, = struct.unpack("B", response[0:1])
             if res_command & 0xE0 != RESPONSE_SEGMENT_DOWNLOAD:
@@ -433,17 +824,25 @@ class WritableStream(io.RawIOBase):
 
         An empty segmented SDO message may be sent saying there is no more data.
         """
+        if self.closed:
+            return
         super(WritableStream, self).close()
-        if not self._done and not self._exp_header:
-            # Segmented download not finished
-            command = REQUEST_SEGMENT_DOWNLOAD | NO_MORE_DATA
-            command |= self._toggle
-            # No data in this message
-            command |= 7 << 1
-            request = bytearray(8)
-            request[0] = command
-            self.sdo_client.request_response(request)
-            self._done = True
+        try:
+            if not self._done and not self._exp_header:
+                # Segmented download not finished
+                command = REQUEST_SEGMENT_DOWNLOAD | NO_MORE_DATA
+                command |= self._toggle
+                # No data in this message
+                command |= 7 << 1
+                request = bytearray(8)
+                request[0] = command
+                if self.sdo_client._trace is not None:
+                    self.sdo_client._trace.segments += 1
+                self.sdo_client.request_response(request)
+                self._done = True
+        finally:
+            self.sdo_client._invalidate(self._index, self._subindex)
+            self.sdo_client._end_transfer(self.pos)
 
     def writable(self):
         return True
@@ -480,6 +879,8 @@ class BlockUploadStream(io.RawIOBase):
         self._server_crc = None
         self._ackseq = 0
         self._error = False
+        # Received data not yet returned by readinto()
+        self._remainder = b""
 
         logger.debug("Reading 0x%04X:%02X from node %d", index, subindex,
                      sdo_client.rx_cobid - 0x600)
@@ -521,11 +922,18 @@ class BlockUploadStream(io.RawIOBase):
         :returns: 1 - 7 bytes of data or no bytes if EOF.
         :rtype: bytes
         """
+        if self._remainder:
+            data = self._remainder
+            self._remainder = b""
+            return data
         if self._done:
             return b""
         if size is None or size < 0:
             return self.readall()
+        return self._read_segment()
 
+    def _read_segment(self):
+        """Receive the next segment and return its data."""
         try:
             response = self.sdo_client.read_response()
         except SdoCommunicationError:
@@ -555,12 +963,16 @@ class BlockUploadStream(io.RawIOBase):
                     raise SdoCommunicationError("CRC is not OK")
                 logger.info("CRC is OK")
         self.pos += len(data)
+        if self.sdo_client._trace is not None:
+            self.sdo_client._trace.segments += 1
         return data
 
     def _retransmit(self):
         logger.info("Only %d sequences were received. Requesting retransmission",
                     self._ackseq)
-        end_time = time.time() + self.sdo_client.RESPONSE_TIMEOUT
+        if self.sdo_client._trace is not None:
+            self.sdo_client._trace.retransmissions += 1
+        end_time = time.time() + self.sdo_client.response_timeout("block")
         self._ack_block()
         while time.time() < end_time:
             response = self.sdo_client.read_response()
@@ -604,22 +1016,42 @@ class BlockUploadStream(io.RawIOBase):
         if self.closed:
             return
         super(BlockUploadStream, self).close()
-        if self._done and not self._error:
-            request = bytearray(8)
-            request[0] = REQUEST_BLOCK_UPLOAD | END_BLOCK_TRANSFER
-            self.sdo_client.send_request(request)
+        try:
+            if self._done and not self._error:
+                request = bytearray(8)
+                request[0] = REQUEST_BLOCK_UPLOAD | END_BLOCK_TRANSFER
+                self.sdo_client.send_request(request)
+        finally:
+            self.sdo_client._end_transfer(self.pos)
+
+    def abort(self, abort_code=ABORT_GENERAL_ERROR):
+        """Abort the transfer."""
+        if not self._error:
+            self._error = True
+            self.sdo_client.abort(abort_code)
+        self._done = True
+        self._remainder = b""
 
     def tell(self):
         return self.pos
 
     def readinto(self, b):
+        """Read the next segment into a pre-allocated, writable bytes-like object.
+
+        The data is copied from the received frame to *b* directly.  Data
+        which does not fit is kept for the next call.
+
+        :returns: The number of bytes read, 0 if EOF.
         """
-        Read bytes into a pre-allocated, writable bytes-like object b,
-        and return the number of bytes read.
-        """
-        data = self.read(7)
-        b[:len(data)] = data
-        return len(data)
+        data = self._remainder
+        if not data:
+            if self._done:
+                return 0
+            data = self._read_segment()
+        n = min(len(b), len(data))
+        b[:n] = data[:n]
+        self._remainder = data[n:]
+        return n
 
     def readable(self):
         return True
@@ -642,6 +1074,8 @@ class BlockDownloadStream(io.RawIOBase):
             If crc calculation should be requested when using block transfer
         """
         self.sdo_client = sdo_client
+        self._index = index
+        self._subindex = subindex
         self.size = size
         self.pos = 0
         self._done = False
@@ -730,6 +1164,8 @@ class BlockDownloadStream(io.RawIOBase):
         request = bytearray(8)
         request[0] = command
         request[1:len(b) + 1] = b
+        if self.sdo_client._trace is not None:
+            self.sdo_client._trace.segments += 1
         self.sdo_client.send_request(request)
         self.pos += len(b)
         # Add the sent data to the current block buffer
@@ -777,6 +1213,8 @@ class BlockDownloadStream(io.RawIOBase):
         """Retransmit the failed block"""
         logger.info("%d of %d sequences were received. "
                     "Will start retransmission", ackseq, self._blksize)
+        if self.sdo_client._trace is not None:
+            self.sdo_client._trace.retransmissions += 1
         # Sub blocks betwen ackseq and end of corrupted block need to be resent
         # Get the part of the block to resend
         block = self._current_block[ackseq:]
@@ -802,6 +1240,13 @@ class BlockDownloadStream(io.RawIOBase):
         if not getattr(self, "_initialized", False):
             # Don't do finalization if initialization was not successful
             return
+        try:
+            self._end_download()
+        finally:
+            self.sdo_client._invalidate(self._index, self._subindex)
+            self.sdo_client._end_transfer(self.pos)
+
+    def _end_download(self):
         if not self._done:
             logger.error("Block transfer was not finished")
         command = REQUEST_BLOCK_DOWNLOAD | END_BLOCK_TRANSFER
@@ -821,3 +1266,192 @@ class BlockDownloadStream(io.RawIOBase):
 
     def writable(self):
         return True
+
+
+class BlockDownload:
+    """Block download of a whole buffer, sending each block in one batch.
+
+    Unlike :class:`BlockDownloadStream`, the frames of a block are prepared
+    from the buffer up front and passed to
+    :meth:`canopen.Network.send_messages` together.  Segments lost in
+    transmission are sent again from their offset in the buffer, and the CRC
+    is calculated over each acknowledged part at once.
+    :attr:`SdoClient.PAUSE_BEFORE_SEND` does not apply to the segments.
+
+    :param sdo_client:
+        The SDO client to use for communication.
+    :param index:
+        Object dictionary index to write to.
+    :param subindex:
+        Object dictionary sub-index to write to.
+    :param request_crc_support:
+        If CRC calculation should be requested.
+    :param priority:
+        Priority class for the :class:`~canopen.sdo.scheduler.SdoScheduler`
+        of the network, or ``None`` for :attr:`SdoClient.priority`.
+    """
+
+    def __init__(self, sdo_client, index, subindex=0, request_crc_support=True,
+                 priority: Optional[int] = None):
+        self.sdo_client = sdo_client
+        self.index = index
+        self.subindex = subindex
+        self.request_crc_support = request_crc_support
+        self.priority = sdo_client.priority if priority is None else priority
+        #: Indicates if the server checks the CRC, known after initiating
+        self.crc_supported = False
+        #: Number of bytes acknowledged by the server
+        self.pos = 0
+
+    def _initiate(self, size):
+        command = REQUEST_BLOCK_DOWNLOAD | INITIATE_BLOCK_TRANSFER | BLOCK_SIZE_SPECIFIED
+        if self.request_crc_support:
+            command |= CRC_SUPPORTED
+        request = bytearray(8)
+        SDO_STRUCT.pack_into(request, 0, command, self.index, self.subindex)
+        struct.pack_into("<L", request, 4, size)
+        logger.info("Initiating block download for 0x%04X:%02X, size %d",
+                    self.index, self.subindex, size)
+        response = self.sdo_client.request_response(request, self.priority)
+        res_command, res_index, res_subindex = SDO_STRUCT.unpack_from(response)
+        if res_command & 0xE0 != RESPONSE_BLOCK_DOWNLOAD:
+            self.sdo_client.abort(ABORT_INVALID_COMMAND_SPECIFIER)
+            raise SdoCommunicationError(f"Unexpected response 0x{res_command:02X}")
+        if res_index != self.index or res_subindex != self.subindex:
+            self.sdo_client.abort()
+            raise SdoCommunicationError(
+                f"Node returned a value for {pretty_index(res_index, res_subindex)} instead, "
+                "maybe there is another SDO client communicating "
+                "on the same SDO channel?")
+        self.crc_supported = bool(res_command & CRC_SUPPORTED)
+        blksize, = struct.unpack_from("B", response, 4)
+        if not 1 <= blksize <= 127:
+            self.sdo_client.abort(ABORT_INVALID_BLOCK_SIZE)
+            raise SdoCommunicationError(f"Invalid block size {blksize}")
+        return blksize
+
+    def _send_block(self, frames):
+        retries_left = self.sdo_client.MAX_RETRIES
+        trace = self.sdo_client._trace
+        if trace is not None:
+            started = time.monotonic()
+            trace.segments += len(frames)
+        scheduler = self.sdo_client.network.sdo_scheduler
+        if scheduler is not None:
+            scheduler.acquire(self.sdo_client.rx_cobid & 0x7F, len(frames),
+                              self.priority)
+        if trace is not None:
+            sending = time.monotonic()
+            trace.waiting += sending - started
+        # The acknowledgement includes the transfer time, no round-trip sample
+        self.sdo_client._sent_at = None
+        while True:
+            try:
+                self.sdo_client.network.send_messages(self.sdo_client.rx_cobid, frames)
+            except CanError as e:
+                # Could be a buffer overflow, segments already received are
+                # ignored by the server when sending the block again
+                retries_left -= 1
+                if not retries_left:
+                    raise
+                logger.info(str(e))
+                if self.sdo_client.RETRY_DELAY:
+                    time.sleep(self.sdo_client.RETRY_DELAY)
+            else:
+                break
+        if trace is not None:
+            trace.sending += time.monotonic() - sending
+
+    def _read_ack(self):
+        try:
+            response = self.sdo_client.read_response()
+        except SdoCommunicationError:
+            self.sdo_client.abort(ABORT_TIMED_OUT)
+            raise
+        res_command, ackseq, blksize = struct.unpack_from("BBB", response)
+        if (res_command & 0xE0 != RESPONSE_BLOCK_DOWNLOAD
+                or res_command & 0x3 != BLOCK_TRANSFER_RESPONSE):
+            self.sdo_client.abort(ABORT_INVALID_COMMAND_SPECIFIER)
+            raise SdoCommunicationError(f"Unexpected response 0x{res_command:02X}")
+        return ackseq, blksize
+
+    def run(
+        self,
+        data,
+        progress: Optional[Callable[[int], None]] = None,
+        bucket: Optional[TokenBucket] = None,
+    ) -> None:
+        """Download the data.
+
+        :param data:
+            A bytes-like object, which is not copied as a whole.
+        :param progress:
+            Function called with the number of bytes acknowledged after each
+            block.
+        :param bucket:
+            Rate limit to take one token from per segment before each block.
+
+        :raises canopen.SdoCommunicationError:
+            On unexpected response or timeout.
+        :raises canopen.SdoAbortedError:
+            When node responds with an error, e.g. on a CRC mismatch.
+        """
+        self.sdo_client._begin_transfer("download", self.index, self.subindex, "block")
+        try:
+            self._run(data, progress, bucket)
+        finally:
+            self.sdo_client._invalidate(self.index, self.subindex)
+            self.sdo_client._end_transfer(self.pos)
+
+    def _run(self, data, progress, bucket):
+        with memoryview(data) as view, view.cast("B") as view:
+            size = len(view)
+            # An empty buffer is sent as one segment without data
+            segments = max(1, (size + 6) // 7)
+            blksize = self._initiate(size)
+            crc = self.sdo_client.crc_cls()
+            first = 0
+            while first < segments:
+                count = min(blksize, segments - first)
+                frames = []
+                for seqno in range(1, count + 1):
+                    offset = 7 * (first + seqno - 1)
+                    frame = bytearray(8)
+                    frame[0] = seqno
+                    frame[1:1 + min(7, size - offset)] = view[offset:offset + 7]
+                    frames.append(frame)
+                if first + count == segments:
+                    frames[-1][0] |= NO_MORE_BLOCKS
+                if bucket is not None:
+                    bucket.consume(count)
+                self._send_block(frames)
+                ackseq, blksize = self._read_ack()
+                if ackseq > count:
+                    self.sdo_client.abort(ABORT_INVALID_SEQUENCE_NUMBER)
+                    raise SdoCommunicationError(f"Invalid sequence number {ackseq}")
+                if ackseq < count:
+                    logger.info("%d of %d segments were received, retransmitting",
+                                ackseq, count)
+                    if self.sdo_client._trace is not None:
+                        self.sdo_client._trace.retransmissions += 1
+                end = min(size, 7 * (first + ackseq))
+                if self.crc_supported:
+                    crc.process(view[self.pos:end])
+                self.pos = end
+                first += ackseq
+                if progress is not None:
+                    progress(end)
+                if not 1 <= blksize <= 127:
+                    self.sdo_client.abort(ABORT_INVALID_BLOCK_SIZE)
+                    raise SdoCommunicationError(f"Invalid block size {blksize}")
+
+        unused = 7 * segments - size
+        request = bytearray(8)
+        request[0] = REQUEST_BLOCK_DOWNLOAD | END_BLOCK_TRANSFER | (unused << 2)
+        if self.crc_supported:
+            struct.pack_into("<H", request, 1, crc.final())
+        response = self.sdo_client.request_response(request, self.priority)
+        res_command, = struct.unpack_from("B", response)
+        if not res_command & END_BLOCK_TRANSFER:
+            raise SdoCommunicationError("Block download unsuccessful")
+        logger.info("Block download of %d bytes successful", size)
@@ -0,0 +1,114 @@
+"""Streaming data sources and sinks for large objects on an SDO server."""
+
+from __future__ import annotations
+
+import io
+import os
+from collections.abc import Iterable, Iterator
+from typing import Optional, Protocol, Union
+
+
+class DomainSink(Protocol):
+    """Receives the data of a download incrementally, like a binary file."""
+
+    def write(self, data: bytes) -> object: ...
+
+    def close(self) -> None: ...
+
+
+class DomainSource:
+    """Data of an upload, read in pieces from an offset cursor."""
+
+    #: Total size in bytes, or ``None`` if unknown in advance
+    size: Optional[int] = None
+
+    def read(self, n: int) -> bytes:
+        """Return the next *n* bytes, fewer only at the end of the data."""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Release any resources held by the source."""
+
+
+class BufferSource(DomainSource):
+    """Source for any bytes-like object, returning views without copying.
+
+    :param data: The data to upload
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+        self.size = len(self._view)
+
+    def read(self, n: int) -> memoryview:
+        chunk = self._view[self._pos:self._pos + n]
+        self._pos += len(chunk)
+        return chunk
+
+
+class FileSource(DomainSource):
+    """Source for a binary file object.
+
+    :param fp: File opened for reading in binary mode
+    """
+
+    def __init__(self, fp: io.RawIOBase):
+        self._fp = fp
+        try:
+            self.size = os.fstat(fp.fileno()).st_size - fp.tell()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self.size = None
+
+    def read(self, n: int) -> bytes:
+        data = self._fp.read(n)
+        # Short reads are allowed for files, but not for sources
+        while data and len(data) < n:
+            more = self._fp.read(n - len(data))
+            if not more:
+                break
+            data += more
+        return data
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class ChunkSource(DomainSource):
+    """Source for an iterable of chunks of arbitrary size.
+
+    :param chunks: Bytes-like objects which are uploaded one after another
+    :param size: Total size, if known in advance
+    """
+
+    def __init__(self, chunks: Iterable[bytes], size: Optional[int] = None):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._current = memoryview(b"")
+        self.size = size
+
+    def read(self, n: int) -> bytes:
+        if len(self._current) >= n:
+            chunk = self._current[:n]
+            self._current = self._current[n:]
+            return chunk
+        data = bytearray(self._current)
+        for chunk in self._chunks:
+            view = memoryview(chunk).cast("B")
+            needed = n - len(data)
+            data += view[:needed]
+            if len(view) >= needed:
+                self._current = view[needed:]
+                return data
+        self._current = memoryview(b"")
+        return data
+
+
+def as_source(data) -> DomainSource:
+    """Wrap bytes-like objects, binary files or iterables of chunks as a source."""
+    if isinstance(data, DomainSource):
+        return data
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return BufferSource(data)
+    if hasattr(data, "read"):
+        return FileSource(data)
+    return ChunkSource(data)
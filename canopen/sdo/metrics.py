@@ -0,0 +1,154 @@
+"""Recording and aggregation of SDO transfer metrics."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import NamedTuple, Optional
+
+
+class SdoTransfer(NamedTuple):
+    """Record of one completed or failed SDO transfer."""
+
+    #: Node ID of the server
+    node_id: int
+    #: Index of the object
+    index: int
+    #: Sub-index of the object
+    subindex: int
+    #: ``"upload"`` or ``"download"``
+    direction: str
+    #: ``"expedited"``, ``"segmented"`` or ``"block"``, ``None`` if the
+    #: transfer failed before the server decided
+    mode: Optional[str]
+    #: Number of data bytes transferred
+    size: int
+    #: Number of segments, including repeated ones
+    segments: int
+    #: Number of requests repeated after a timeout
+    retries: int
+    #: Number of blocks with segments to send again
+    retransmissions: int
+    #: Abort code sent or received, ``None`` if not aborted
+    abort_code: Optional[int]
+    #: Time in seconds from start to end of the transfer
+    duration: float
+    #: Part of the duration spent waiting for responses
+    waiting: float
+    #: Part of the duration spent sending requests
+    sending: float
+
+    @property
+    def ok(self) -> bool:
+        """Indicate whether the transfer was not aborted."""
+        return self.abort_code is None
+
+
+class _TransferTrace:
+    """Counters of a transfer in progress, updated by the client."""
+
+    __slots__ = ("node_id", "index", "subindex", "direction", "mode", "start",
+                 "segments", "retries", "retransmissions", "abort_code",
+                 "waiting", "sending")
+
+    def __init__(self, node_id: int, index: int, subindex: int,
+                 direction: str, mode: Optional[str]):
+        self.node_id = node_id
+        self.index = index
+        self.subindex = subindex
+        self.direction = direction
+        self.mode = mode
+        self.start = time.monotonic()
+        self.segments = 0
+        self.retries = 0
+        self.retransmissions = 0
+        self.abort_code: Optional[int] = None
+        self.waiting = 0.0
+        self.sending = 0.0
+
+    def finish(self, size: int) -> SdoTransfer:
+        return SdoTransfer(self.node_id, self.index, self.subindex,
+                           self.direction, self.mode, size, self.segments,
+                           self.retries, self.retransmissions, self.abort_code,
+                           time.monotonic() - self.start, self.waiting,
+                           self.sending)
+
+
+class SdoStats:
+    """Totals over a number of transfers."""
+
+    def __init__(self):
+        #: Number of transfers
+        self.transfers = 0
+        #: Number of aborted transfers
+        self.aborts = 0
+        #: Number of data bytes
+        self.size = 0
+        #: Number of segments
+        self.segments = 0
+        #: Number of repeated requests
+        self.retries = 0
+        #: Number of retransmitted blocks
+        self.retransmissions = 0
+        #: Total time in seconds
+        self.duration = 0.0
+        #: Time in seconds waiting for responses
+        self.waiting = 0.0
+        #: Time in seconds sending requests
+        self.sending = 0.0
+        #: Duration of the slowest transfer
+        self.max_duration = 0.0
+
+    def add(self, transfer: SdoTransfer) -> None:
+        """Add a transfer to the totals."""
+        self.transfers += 1
+        if transfer.abort_code is not None:
+            self.aborts += 1
+        self.size += transfer.size
+        self.segments += transfer.segments
+        self.retries += transfer.retries
+        self.retransmissions += transfer.retransmissions
+        self.duration += transfer.duration
+        self.waiting += transfer.waiting
+        self.sending += transfer.sending
+        self.max_duration = max(self.max_duration, transfer.duration)
+
+    def __repr__(self) -> str:
+        return (f"<{type(self).__name__} {self.transfers} transfers, "
+                f"{self.size} bytes in {self.duration:.3f} s>")
+
+
+class SdoMetrics:
+    """Aggregates transfer records per node and per object index.
+
+    Register an instance as transfer callback of the SDO clients to observe::
+
+        metrics = SdoMetrics()
+        for node in network.values():
+            node.sdo.add_transfer_callback(metrics)
+    """
+
+    def __init__(self):
+        #: Totals by node ID
+        self.by_node: dict[int, SdoStats] = {}
+        #: Totals by node ID and index
+        self.by_index: dict[tuple[int, int], SdoStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, transfer: SdoTransfer) -> None:
+        with self._lock:
+            stats = self.by_node.get(transfer.node_id)
+            if stats is None:
+                stats = self.by_node[transfer.node_id] = SdoStats()
+            stats.add(transfer)
+            key = (transfer.node_id, transfer.index)
+            stats = self.by_index.get(key)
+            if stats is None:
+                stats = self.by_index[key] = SdoStats()
+            stats.add(transfer)
+
+    def clear(self) -> None:
+        """Forget all recorded transfers."""
+        with self._lock:
+            self.by_node.clear()
+            self.by_index.clear()
@@ -0,0 +1,92 @@
+"""Sharing of several SDO channels to one node between threads."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+from collections.abc import Iterator
+from typing import Optional
+
+from canopen.sdo.client import SdoClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class SdoPool:
+    """Leases the SDO channels of a node to one transfer at a time.
+
+    Devices implementing several SDO servers can process requests on each of
+    them in parallel.  Threads using the pool get a channel of their own for
+    the duration of a transfer, so for example a long domain upload does not
+    block the polling of status parameters.
+
+    Additional channels are preferred over the default one, which stays free
+    for direct use through ``node.sdo`` as long as possible.  A channel leased
+    from the pool must not be used directly at the same time.
+
+    :param channels:
+        The SDO clients to share, with the default channel first.  The list is
+        referenced, so channels appended later become available as well.
+    """
+
+    def __init__(self, channels: list[SdoClient]):
+        self.channels = channels
+        self._busy: set[int] = set()
+        self._condition = threading.Condition()
+
+    def _free(self) -> Optional[SdoClient]:
+        for sdo in reversed(self.channels):
+            if id(sdo) not in self._busy:
+                return sdo
+        return None
+
+    @contextlib.contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[SdoClient]:
+        """Reserve a free channel for the duration of a ``with`` block.
+
+        :param timeout:
+            Max time in seconds to wait for a free channel, or ``None`` to
+            wait indefinitely.
+
+        :raises TimeoutError: If no channel became free in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._free() is not None, timeout
+            ):
+                raise TimeoutError("No free SDO channel available")
+            sdo = self._free()
+            self._busy.add(id(sdo))
+        logger.debug("Leased SDO channel 0x%X", sdo.rx_cobid)
+        try:
+            yield sdo
+        finally:
+            with self._condition:
+                self._busy.discard(id(sdo))
+                self._condition.notify()
+
+    @property
+    def available(self) -> int:
+        """Number of channels currently not leased."""
+        with self._condition:
+            return sum(1 for sdo in self.channels if id(sdo) not in self._busy)
+
+    def upload(self, index: int, subindex: int) -> bytes:
+        """Read an object on the next free channel.
+
+        See :meth:`canopen.sdo.SdoClient.upload`.
+        """
+        with self.lease() as sdo:
+            return sdo.upload(index, subindex)
+
+    def download(
+        self, index: int, subindex: int, data: bytes, force_segment: bool = False
+    ) -> None:
+        """Write an object on the next free channel.
+
+        See :meth:`canopen.sdo.SdoClient.download`.
+        """
+        with self.lease() as sdo:
+            sdo.download(index, subindex, data, force_segment)
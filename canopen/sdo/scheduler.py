@@ -0,0 +1,114 @@
+"""Sharing a bus-load budget between the SDO clients of a network."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from typing import Optional
+
+from canopen.utils import TokenBucket
+
+
+#: Priority class of requests made on behalf of a user or application logic
+PRIORITY_INTERACTIVE = 0
+#: Priority class of background work, like parameter polling or firmware
+PRIORITY_BULK = 1
+
+#: Worst-case length of a CAN frame with 8 data bytes and an 11-bit
+#: identifier, including bit stuffing and the interframe space
+FRAME_BITS = 135
+
+
+class SdoScheduler:
+    """Limits the SDO traffic on a network and shares it fairly between nodes.
+
+    All SDO clients of the network draw from one budget of CAN frames per
+    second, counting both the requests they send and the responses they
+    receive.  When several clients are waiting, requests of a higher priority
+    class are sent first.  Within a class, the frames are shared between the
+    nodes in proportion to their :attr:`weights`, using self-clocked weighted
+    fair queueing.  Bulk transfers therefore only get the budget left over by
+    interactive ones.
+
+    :param rate:
+        Frames per second for all SDO traffic.
+    :param burst:
+        Max frames to send at once after an idle period, defaults to the
+        largest block of a block transfer.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = 127):
+        #: Budget of frames shared by all clients
+        self.bucket = TokenBucket(rate, burst)
+        #: Relative share of each node ID, 1 if not given
+        self.weights: dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, float, int]] = []
+        self._sequence = itertools.count()
+        # Finish tag of the last request of each node
+        self._finish: dict[int, float] = {}
+        # Finish tag of the request sent last
+        self._virtual_time = 0.0
+
+    @classmethod
+    def for_bus_load(
+        cls, bitrate: int, share: float, burst: Optional[float] = 127
+    ) -> SdoScheduler:
+        """Create a scheduler allowing SDO traffic to use part of the bus.
+
+        :param bitrate:
+            Bitrate of the bus in bit/s.
+        :param share:
+            Fraction of the bus capacity, e.g. 0.2 for 20 %.
+        :param burst:
+            Max frames to send at once after an idle period.
+        """
+        if not 0 < share <= 1:
+            raise ValueError("Share must be greater than 0 and at most 1")
+        return cls(bitrate * share / FRAME_BITS, burst)
+
+    def acquire(self, node_id: int, frames: int = 1,
+                priority: int = PRIORITY_INTERACTIVE) -> None:
+        """Wait until the given number of frames may be sent.
+
+        :param node_id:
+            Node which the frames are sent to.
+        :param frames:
+            Number of frames to send.
+        :param priority:
+            Priority class, lower values go first.
+        """
+        with self._cond:
+            start = max(self._virtual_time, self._finish.get(node_id, 0.0))
+            finish = start + frames / self.weights.get(node_id, 1.0)
+            self._finish[node_id] = finish
+            entry = (priority, finish, next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            # The head of the queue may change
+            self._cond.notify_all()
+            try:
+                while True:
+                    if self._queue[0] is entry:
+                        delay = self.bucket.try_consume(frames)
+                        if not delay:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self._virtual_time = finish
+            self._cond.notify_all()
+
+    def charge(self, frames: int = 1) -> None:
+        """Account for frames received, without waiting.
+
+        :param frames:
+            Number of frames received.
+        """
+        self.bucket.charge(frames)
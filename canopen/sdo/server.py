@@ -1,7 +1,10 @@
 import logging
+import threading
+from concurrent.futures import Future
 
 from canopen.sdo.base import SdoBase
 from canopen.sdo.constants import *
+from canopen.sdo.domain import DomainSource
 from canopen.sdo.exceptions import *
 
 
@@ -9,7 +12,17 @@ logger = logging.getLogger(__name__)
 
 
 class SdoServer(SdoBase):
-    """Creates an SDO server."""
+    """Creates an SDO server.
+
+    Read and write callbacks of the node may return a
+    :class:`concurrent.futures.Future` instead of blocking the reception of
+    messages.  The response is sent when the future is done, or the request is
+    aborted if that takes longer than :attr:`RESPONSE_TIMEOUT`.  A new request
+    from the client in the meantime replaces the pending one.
+    """
+
+    #: Max time in seconds to wait for deferred callbacks before aborting
+    RESPONSE_TIMEOUT = 1.0
 
     def __init__(self, rx_cobid, tx_cobid, node):
         """
@@ -27,58 +40,192 @@ class SdoServer(SdoBase):
         self._index = None
         self._subindex = None
         self.last_received_error = 0x00000000
+        #: Number of segments per block requested from clients (1 - 127)
+        self.blksize = 127
+        #: Offer CRC checking of block transfers
+        self.block_crc = True
+        # Block transfer state, one of the _BLOCK_* values or None
+        self._block_state = None
+        self._crc_enabled = False
+        self._size = None
+        self._count = 0
+        self._crc = None
+        self._ackseq = 0
+        self._client_blksize = 0
+        # Streams of the current transfer
+        self._source: DomainSource = None
+        self._next = b""
+        self._segments = []
+        self._last_segment = b""
+        self._sink = None
+        self._pending = None
+        # Request waiting for a callback result
+        self._lock = threading.RLock()
+        self._deferred: Future = None
+        self._timer: threading.Timer = None
+
+    _BLOCK_DOWNLOAD = "download"
+    _BLOCK_DOWNLOAD_END = "download end"
+    _BLOCK_UPLOAD_START = "upload start"
+    _BLOCK_UPLOAD = "upload"
+    _BLOCK_UPLOAD_END = "upload end"
 
     def on_request(self, can_id, data, timestamp):
+        with self._lock:
+            if self._deferred is not None:
+                logger.info("New request while waiting for a callback, dropping the old one")
+                self._cancel_deferred()
+            self._handle(self._process, data)
+
+    def _process(self, data):
         command, = struct.unpack_from("B", data, 0)
         ccs = command & 0xE0
 
+        if self._block_state == self._BLOCK_DOWNLOAD and command != REQUEST_ABORTED:
+            # Segments carry a sequence number instead of a command
+            self.block_download_segment(command, data)
+        elif ccs == REQUEST_UPLOAD:
+            self.init_upload(data)
+        elif ccs == REQUEST_SEGMENT_UPLOAD:
+            self.segmented_upload(command)
+        elif ccs == REQUEST_DOWNLOAD:
+            self.init_download(data)
+        elif ccs == REQUEST_SEGMENT_DOWNLOAD:
+            self.segmented_download(command, data)
+        elif ccs == REQUEST_BLOCK_UPLOAD:
+            self.block_upload(data)
+        elif ccs == REQUEST_BLOCK_DOWNLOAD:
+            self.block_download(data)
+        elif ccs == REQUEST_ABORTED:
+            self.request_aborted(data)
+        else:
+            self.abort(ABORT_INVALID_COMMAND_SPECIFIER)
+
+    def _handle(self, func, *args):
+        """Run a step of the transfer, aborting it on errors."""
         try:
-            if ccs == REQUEST_UPLOAD:
-                self.init_upload(data)
-            elif ccs == REQUEST_SEGMENT_UPLOAD:
-                self.segmented_upload(command)
-            elif ccs == REQUEST_DOWNLOAD:
-                self.init_download(data)
-            elif ccs == REQUEST_SEGMENT_DOWNLOAD:
-                self.segmented_download(command, data)
-            elif ccs == REQUEST_BLOCK_UPLOAD:
-                self.block_upload(data)
-            elif ccs == REQUEST_BLOCK_DOWNLOAD:
-                self.block_download(data)
-            elif ccs == REQUEST_ABORTED:
-                self.request_aborted(data)
-            else:
-                self.abort(ABORT_INVALID_COMMAND_SPECIFIER)
+            func(*args)
         except SdoAbortedError as exc:
+            self._close_streams()
             self.abort(exc.code)
         except KeyError as exc:
+            self._close_streams()
             self.abort(ABORT_NOT_IN_OD)
         except Exception as exc:
+            self._close_streams()
             self.abort()
             logger.exception(exc)
 
+    def _defer(self, future, continuation):
+        """Continue the transfer with the result of *future* once it is done."""
+        logger.debug("Waiting for callback result of 0x%04X:%02X",
+                     self._index, self._subindex)
+        self._deferred = future
+        self._timer = threading.Timer(self.RESPONSE_TIMEOUT, self._on_deferred_timeout,
+                                      (future,))
+        self._timer.daemon = True
+        self._timer.start()
+        future.add_done_callback(
+            lambda future: self._on_deferred_done(future, continuation))
+
+    def _on_deferred_done(self, future, continuation):
+        with self._lock:
+            if future is not self._deferred:
+                # Replaced by another request or timed out
+                return
+            self._deferred = None
+            self._timer.cancel()
+            self._handle(lambda: continuation(future.result()))
+
+    def _on_deferred_timeout(self, future):
+        with self._lock:
+            if future is not self._deferred:
+                return
+            logger.info("Callback for 0x%04X:%02X timed out", self._index, self._subindex)
+            self._cancel_deferred()
+            self._close_streams()
+            self.abort(ABORT_TIMED_OUT)
+
+    def _cancel_deferred(self):
+        future, self._deferred = self._deferred, None
+        self._timer.cancel()
+        future.cancel()
+
+    def _close_streams(self):
+        """End the current transfer and release its source or sink."""
+        self._block_state = None
+        self._buffer = None
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        self._segments = []
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _write(self, data):
+        """Pass downloaded data to the sink or collect it."""
+        if self._sink is not None:
+            self._sink.write(data)
+        else:
+            self._buffer.extend(data)
+        self._count += len(data)
+
+    def _finish_download(self, respond):
+        """Store the collected data or complete the sink, then respond."""
+        if self._sink is not None:
+            sink, self._sink = self._sink, None
+            sink.close()
+            result = None
+        else:
+            data, self._buffer = self._buffer, None
+            result = self._node.set_data(self._index, self._subindex, data,
+                                         check_writable=True, deferred=True)
+        if isinstance(result, Future):
+            self._defer(result, lambda _: respond())
+        else:
+            respond()
+
     def init_upload(self, request):
         _, index, subindex = SDO_STRUCT.unpack_from(request)
         self._index = index
         self._subindex = subindex
-        res_command = RESPONSE_UPLOAD | SIZE_SPECIFIED
-        response = bytearray(8)
+        self._close_streams()
+        source = self._node.open_source(index, subindex, check_readable=True,
+                                        deferred=True)
+        if isinstance(source, Future):
+            self._defer(source, self._start_upload)
+        else:
+            self._start_upload(source)
 
-        data = self._node.get_data(index, subindex, check_readable=True)
-        size = len(data)
-        if size == 0:
+    def _start_upload(self, source):
+        index = self._index
+        subindex = self._subindex
+        res_command = RESPONSE_UPLOAD
+        response = bytearray(8)
+        size = source.size
+        if size is not None and size <= 4:
+            data = source.read(4)
+            source.close()
+        else:
+            self._next = source.read(7)
+            data = self._next
+        if not data:
+            source.close()
             logger.info("No content to upload for 0x%04X:%02X", index, subindex)
             self.abort(ABORT_NO_DATA_AVAILABLE)
             return
-        elif size <= 4:
+        elif size is not None and size <= 4:
             logger.info("Expedited upload for 0x%04X:%02X", index, subindex)
-            res_command |= EXPEDITED
+            res_command |= EXPEDITED | SIZE_SPECIFIED
             res_command |= (4 - size) << 2
             response[4:4 + size] = data
         else:
             logger.info("Initiating segmented upload for 0x%04X:%02X", index, subindex)
-            struct.pack_into("<L", response, 4, size)
-            self._buffer = bytearray(data)
+            if size is not None:
+                res_command |= SIZE_SPECIFIED
+                struct.pack_into("<L", response, 4, size)
+            self._source = source
             self._toggle = 0
 
         SDO_STRUCT.pack_into(response, 0, res_command, index, subindex)
@@ -88,20 +235,23 @@ class SdoServer(SdoBase):
         if command & TOGGLE_BIT != self._toggle:
             # Toggle bit mismatch
             raise SdoAbortedError(ABORT_TOGGLE_NOT_ALTERNATED)
-        data = self._buffer[:7]
+        if self._source is None:
+            raise SdoAbortedError(ABORT_INVALID_COMMAND_SPECIFIER)
+        data = self._next
         size = len(data)
 
-        # Remove sent data from buffer
-        del self._buffer[:7]
+        # Look ahead to detect the end of data
+        self._next = self._source.read(7) if size == 7 else b""
 
         res_command = RESPONSE_SEGMENT_UPLOAD
         # Add toggle bit
         res_command |= self._toggle
         # Add nof bytes not used
         res_command |= (7 - size) << 1
-        if not self._buffer:
-            # Nothing left in buffer
+        if not self._next:
+            # Nothing left in source
             res_command |= NO_MORE_DATA
+            self._close_streams()
         # Toggle bit for next message
         self._toggle ^= TOGGLE_BIT
 
@@ -111,25 +261,194 @@ class SdoServer(SdoBase):
         self.send_response(response)
 
     def block_upload(self, data):
-        # We currently don't support BLOCK UPLOAD
-        # according to CIA301 the server is allowed
-        # to switch to regular upload
-        logger.info("Received block upload, switch to regular SDO upload")
-        self.init_upload(data)
+        command, = struct.unpack_from("B", data)
+        cs = command & 0x3
+        if cs == INITIATE_BLOCK_TRANSFER:
+            self.init_block_upload(data)
+        elif self._block_state == self._BLOCK_UPLOAD_START and cs == START_BLOCK_UPLOAD:
+            self._block_state = self._BLOCK_UPLOAD
+            self._send_upload_block()
+        elif self._block_state == self._BLOCK_UPLOAD and cs == BLOCK_TRANSFER_RESPONSE:
+            self._on_upload_block_ack(data)
+        elif self._block_state == self._BLOCK_UPLOAD_END and cs == END_BLOCK_TRANSFER:
+            logger.info("Block upload of 0x%04X:%02X finished", self._index, self._subindex)
+            self._close_streams()
+        else:
+            raise SdoAbortedError(ABORT_INVALID_COMMAND_SPECIFIER)
+
+    def init_block_upload(self, request):
+        command, index, subindex, blksize, pst = struct.unpack_from("<BHBBB", request)
+        self._index = index
+        self._subindex = subindex
+        if not 1 <= blksize <= 127:
+            raise SdoAbortedError(ABORT_INVALID_BLOCK_SIZE)
+        self._close_streams()
+        source = self._node.open_source(index, subindex, check_readable=True,
+                                        deferred=True)
+        if isinstance(source, Future):
+            self._defer(source, lambda source: self._start_block_upload(
+                source, command, blksize, pst))
+        else:
+            self._start_block_upload(source, command, blksize, pst)
+
+    def _start_block_upload(self, source, command, blksize, pst):
+        index = self._index
+        subindex = self._subindex
+        if pst and source.size is not None and source.size <= pst:
+            # According to CiA 301, the server may switch to a regular upload
+            logger.info("Block upload of %d bytes, switch to regular SDO upload", source.size)
+            self._start_upload(source)
+            return
+        self._source = source
+        self._next = source.read(7)
+        if not self._next:
+            raise SdoAbortedError(ABORT_NO_DATA_AVAILABLE)
+        logger.info("Initiating block upload for 0x%04X:%02X", index, subindex)
+        self._segments = []
+        self._client_blksize = blksize
+        self._crc_enabled = bool(command & CRC_SUPPORTED) and self.block_crc
+        self._crc = self.crc_cls() if self._crc_enabled else None
+        self._block_state = self._BLOCK_UPLOAD_START
+        res_command = RESPONSE_BLOCK_UPLOAD | INITIATE_BLOCK_TRANSFER
+        if self._crc_enabled:
+            res_command |= CRC_SUPPORTED
+        response = bytearray(8)
+        if source.size is not None:
+            res_command |= BLOCK_SIZE_SPECIFIED
+            struct.pack_into("<L", response, 4, source.size)
+        SDO_STRUCT.pack_into(response, 0, res_command, index, subindex)
+        self.send_response(response)
+
+    def _send_upload_block(self):
+        """Send unacknowledged segments, completed with new ones to a full block."""
+        segments = self._segments
+        while len(segments) < self._client_blksize and self._next:
+            segments.append(self._next)
+            self._next = self._source.read(7) if len(self._next) == 7 else b""
+        for seqno, segment in enumerate(segments, 1):
+            response = bytearray(8)
+            response[0] = seqno
+            if seqno == len(segments) and not self._next:
+                response[0] |= NO_MORE_BLOCKS
+            response[1:1 + len(segment)] = segment
+            self.send_response(response)
+
+    def _on_upload_block_ack(self, request):
+        _, ackseq, blksize = struct.unpack_from("BBB", request)
+        if not 1 <= blksize <= 127:
+            raise SdoAbortedError(ABORT_INVALID_BLOCK_SIZE)
+        if ackseq > len(self._segments):
+            raise SdoAbortedError(ABORT_INVALID_SEQUENCE_NUMBER)
+        if ackseq < len(self._segments):
+            logger.info("Client received %d of %d segments, retransmitting",
+                        ackseq, len(self._segments))
+        for segment in self._segments[:ackseq]:
+            if self._crc is not None:
+                self._crc.process(segment)
+            self._last_segment = segment
+        del self._segments[:ackseq]
+        self._client_blksize = blksize
+        if self._segments or self._next:
+            self._send_upload_block()
+            return
+        # All data acknowledged, end the transfer
+        unused = 7 - len(self._last_segment)
+        res_command = RESPONSE_BLOCK_UPLOAD | END_BLOCK_TRANSFER | (unused << 2)
+        response = bytearray(8)
+        response[0] = res_command
+        if self._crc is not None:
+            struct.pack_into("<H", response, 1, self._crc.final())
+        self._block_state = self._BLOCK_UPLOAD_END
+        self.send_response(response)
 
     def request_aborted(self, data):
         _, index, subindex, code = struct.unpack_from("<BHBL", data)
         self.last_received_error = code
+        self._close_streams()
         logger.info("Received request aborted for 0x%04X:%02X with code 0x%X", index, subindex, code)
 
     def block_download(self, data):
-        # We currently don't support BLOCK DOWNLOAD
-        # Unpack the index and subindex in order to send appropriate abort
         command, index, subindex = SDO_STRUCT.unpack_from(data)
+        if command & 0x1 == INITIATE_BLOCK_TRANSFER:
+            self.init_block_download(data)
+        elif self._block_state == self._BLOCK_DOWNLOAD_END:
+            self.end_block_download(command, data)
+        else:
+            raise SdoAbortedError(ABORT_INVALID_COMMAND_SPECIFIER)
+
+    def init_block_download(self, request):
+        command, index, subindex = SDO_STRUCT.unpack_from(request)
         self._index = index
         self._subindex = subindex
-        logger.error("Block download is not supported")
-        self.abort(ABORT_INVALID_COMMAND_SPECIFIER)
+        self._size = None
+        if command & BLOCK_SIZE_SPECIFIED:
+            self._size, = struct.unpack_from("<L", request, 4)
+        logger.info("Initiating block download for 0x%04X:%02X, size %s",
+                    index, subindex, self._size)
+        self._close_streams()
+        self._sink = self._node.open_sink(index, subindex, check_writable=True)
+        self._buffer = bytearray() if self._sink is None else None
+        self._count = 0
+        self._pending = None
+        self._ackseq = 0
+        self._crc_enabled = bool(command & CRC_SUPPORTED) and self.block_crc
+        self._crc = self.crc_cls() if self._crc_enabled else None
+        self._block_state = self._BLOCK_DOWNLOAD
+        res_command = RESPONSE_BLOCK_DOWNLOAD | INITIATE_BLOCK_TRANSFER
+        if self._crc_enabled:
+            res_command |= CRC_SUPPORTED
+        response = bytearray(8)
+        SDO_STRUCT.pack_into(response, 0, res_command, index, subindex)
+        response[4] = self.blksize
+        self.send_response(response)
+
+    def block_download_segment(self, command, request):
+        seqno = command & 0x7F
+        last = bool(command & NO_MORE_BLOCKS)
+        if seqno == self._ackseq + 1:
+            self._ackseq = seqno
+            # The unused bytes of the last segment are only known at the end
+            if self._pending is not None:
+                self._write_block_data(self._pending)
+            self._pending = bytes(request[1:8])
+        else:
+            # Ignore until the end of the block, the client will retransmit
+            logger.debug("Unexpected sequence number %d, expected %d",
+                         seqno, self._ackseq + 1)
+            last = False
+        if seqno < self.blksize and not command & NO_MORE_BLOCKS:
+            return
+        response = bytearray(8)
+        response[0] = RESPONSE_BLOCK_DOWNLOAD | BLOCK_TRANSFER_RESPONSE
+        response[1] = self._ackseq
+        response[2] = self.blksize
+        self._ackseq = 0
+        if last:
+            self._block_state = self._BLOCK_DOWNLOAD_END
+        self.send_response(response)
+
+    def _write_block_data(self, data):
+        if self._crc is not None:
+            self._crc.process(data)
+        self._write(data)
+
+    def end_block_download(self, command, request):
+        unused = (command >> 2) & 0x7
+        if self._pending is not None:
+            self._write_block_data(self._pending[:7 - unused])
+            self._pending = None
+        if self._size is not None and self._size != self._count:
+            raise SdoAbortedError(ABORT_LENGTH_NOT_MATCHED)
+        if self._crc is not None:
+            client_crc, = struct.unpack_from("<H", request, 1)
+            if self._crc.final() != client_crc:
+                raise SdoAbortedError(ABORT_CRC_ERROR)
+        self._block_state = None
+        logger.info("Block download of %d bytes to 0x%04X:%02X finished",
+                    self._count, self._index, self._subindex)
+        response = bytearray(8)
+        response[0] = RESPONSE_BLOCK_DOWNLOAD | END_BLOCK_TRANSFER
+        self._finish_download(lambda: self.send_response(response))
 
     def init_download(self, request):
         # TODO: Check if writable (now would fail on end of segmented downloads)
@@ -138,6 +457,7 @@ class SdoServer(SdoBase):
         self._subindex = subindex
         res_command = RESPONSE_DOWNLOAD
         response = bytearray(8)
+        SDO_STRUCT.pack_into(response, 0, res_command, index, subindex)
 
         if command & EXPEDITED:
             logger.info("Expedited download for 0x%04X:%02X", index, subindex)
@@ -145,30 +465,31 @@ class SdoServer(SdoBase):
                 size = 4 - ((command >> 2) & 0x3)
             else:
                 size = 4
-            self._node.set_data(index, subindex, request[4:4 + size], check_writable=True)
+            self._close_streams()
+            self._sink = self._node.open_sink(index, subindex, check_writable=True)
+            self._buffer = bytearray() if self._sink is None else None
+            self._write(request[4:4 + size])
+            self._finish_download(lambda: self.send_response(response))
         else:
             logger.info("Initiating segmented download for 0x%04X:%02X", index, subindex)
             if command & SIZE_SPECIFIED:
                 size, = struct.unpack_from("<L", request, 4)
                 logger.info("Size is %d bytes", size)
-            self._buffer = bytearray()
+            self._close_streams()
+            self._sink = self._node.open_sink(index, subindex, check_writable=True)
+            self._buffer = bytearray() if self._sink is None else None
+            self._count = 0
             self._toggle = 0
-
-        SDO_STRUCT.pack_into(response, 0, res_command, index, subindex)
-        self.send_response(response)
+            self.send_response(response)
 
     def segmented_download(self, command, request):
         if command & TOGGLE_BIT != self._toggle:
             # Toggle bit mismatch
             raise SdoAbortedError(ABORT_TOGGLE_NOT_ALTERNATED)
+        if self._buffer is None and self._sink is None:
+            raise SdoAbortedError(ABORT_INVALID_COMMAND_SPECIFIER)
         last_byte = 8 - ((command >> 1) & 0x7)
-        self._buffer.extend(request[1:last_byte])
-
-        if command & NO_MORE_DATA:
-            self._node.set_data(self._index,
-                                self._subindex,
-                                self._buffer,
-                                check_writable=True)
+        self._write(request[1:last_byte])
 
         res_command = RESPONSE_SEGMENT_DOWNLOAD
         # Add toggle bit
@@ -178,7 +499,10 @@ class SdoServer(SdoBase):
 
         response = bytearray(8)
         response[0] = res_command
-        self.send_response(response)
+        if command & NO_MORE_DATA:
+            self._finish_download(lambda: self.send_response(response))
+        else:
+            self.send_response(response)
 
     def send_response(self, response):
         self.network.send_message(self.tx_cobid, response)
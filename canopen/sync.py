@@ -1,9 +1,18 @@
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING
+import logging
+import queue
+import threading
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+from typing import Any, Callable, NamedTuple, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     import canopen.network
+    from canopen.pdo import PdoMap
+
+
+logger = logging.getLogger(__name__)
 
 
 class SyncProducer:
@@ -54,3 +63,151 @@ class SyncProducer:
         if self._task is not None:
             self._task.stop()
         self._task = None
+
+
+class CycleSnapshot(NamedTuple):
+    """Synchronous TPDO data belonging to one SYNC cycle."""
+
+    #: SYNC counter value, or ``None`` if the SYNC carried no counter
+    counter: Optional[int]
+    #: Timestamp of the SYNC message
+    timestamp: float
+    #: Decoded raw values by node ID and variable name
+    values: Mapping[int, Mapping[str, Any]]
+    #: Expected maps which were not received within the cycle
+    missing: frozenset[PdoMap]
+    #: Delay in seconds from the SYNC to the reception of each map
+    latency: Mapping[PdoMap, float]
+
+    @property
+    def complete(self) -> bool:
+        """Indicate whether all expected maps were received."""
+        return not self.missing
+
+
+class _Cycle:
+    """Mutable collection state of the currently running cycle."""
+
+    def __init__(self, counter: Optional[int], timestamp: float):
+        self.counter = counter
+        self.timestamp = timestamp
+        self.values: dict[int, dict[str, Any]] = {}
+        self.latency: dict[PdoMap, float] = {}
+
+
+class CycleAssembler:
+    """Groups synchronous TPDOs of all nodes by the SYNC cycle they follow.
+
+    Each SYNC message starts a new cycle.  A cycle is delivered as one
+    :class:`CycleSnapshot` once all expected maps have been received, or when
+    the next SYNC arrives, flagging the maps still missing.
+
+    Snapshots are passed to the callback if given.  Otherwise they are put into
+    the bounded :attr:`queue`, where the oldest entries are discarded if the
+    consumer does not keep up.
+
+    :param network:
+        The network to observe for SYNC messages.
+    :param maps:
+        The expected TPDOs, by default
+        :meth:`~canopen.Network.synchronous_tpdos` at the time of :meth:`start`.
+    :param callback:
+        Function to call from the receiving thread with each snapshot.
+    :param maxsize:
+        Capacity of the snapshot queue.
+    """
+
+    def __init__(
+        self,
+        network: canopen.network.Network,
+        maps: Optional[Iterable[PdoMap]] = None,
+        callback: Optional[Callable[[CycleSnapshot], None]] = None,
+        maxsize: int = 16,
+    ):
+        self.network = network
+        self.maps: Optional[list[PdoMap]] = list(maps) if maps is not None else None
+        self.callback = callback
+        #: Delivered snapshots, if no callback is given
+        self.queue: queue.Queue[CycleSnapshot] = queue.Queue(maxsize)
+        #: Number of snapshots discarded because the queue was full
+        self.dropped = 0
+        self._cycle: Optional[_Cycle] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self) -> None:
+        """Start observing SYNC and the expected TPDOs.
+
+        :raises RuntimeError: If already started.
+        """
+        if self._running:
+            raise RuntimeError("Cycle assembler already running")
+        self._running = True
+        if self.maps is None:
+            self.maps = self.network.synchronous_tpdos()
+        for pdo_map in self.maps:
+            pdo_map.add_callback(self.on_pdo)
+        self.network.subscribe(self.network.sync.cob_id, self.on_sync)
+
+    def stop(self) -> None:
+        """Stop observing, discarding the incomplete current cycle."""
+        if not self._running:
+            return
+        self._running = False
+        self.network.unsubscribe(self.network.sync.cob_id, self.on_sync)
+        for pdo_map in self.maps or ():
+            pdo_map.remove_callback(self.on_pdo)
+        with self._lock:
+            self._cycle = None
+
+    def on_sync(self, can_id: int, data: bytearray, timestamp: float) -> None:
+        counter = data[0] if data else None
+        with self._lock:
+            finished = self._cycle
+            self._cycle = _Cycle(counter, timestamp)
+        if finished is not None:
+            self._deliver(finished)
+
+    def on_pdo(self, pdo_map: PdoMap) -> None:
+        with self._lock:
+            cycle = self._cycle
+            if cycle is None or pdo_map in cycle.latency:
+                return
+            cycle.latency[pdo_map] = pdo_map.timestamp - cycle.timestamp
+            values = cycle.values.setdefault(pdo_map.pdo_node.node.id, {})
+            for var in pdo_map.map:
+                if var.length:
+                    values[var.name] = var.raw
+            if len(cycle.latency) < len(self.maps):
+                return
+            # All expected maps received, deliver before the next SYNC
+            self._cycle = None
+        self._deliver(cycle)
+
+    def _deliver(self, cycle: _Cycle) -> None:
+        snapshot = CycleSnapshot(
+            counter=cycle.counter,
+            timestamp=cycle.timestamp,
+            values=MappingProxyType({
+                node_id: MappingProxyType(values)
+                for node_id, values in cycle.values.items()
+            }),
+            missing=frozenset(self.maps).difference(cycle.latency),
+            latency=MappingProxyType(cycle.latency),
+        )
+        if snapshot.missing:
+            logger.debug("SYNC cycle %s incomplete, %d PDOs missing",
+                         cycle.counter, len(snapshot.missing))
+        if self.callback is not None:
+            self.callback(snapshot)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
@@ -1,5 +1,7 @@
 """Additional utility functions for canopen."""
 
+import threading
+import time
 from typing import Optional, Union
 
 
@@ -21,3 +23,80 @@ def pretty_index(index: Optional[Union[int, str]],
         sub_str = f"{sub!r}"
 
     return ":".join(s for s in (index_str, sub_str) if s)
+
+
+class TokenBucket:
+    """Limits the rate of events, shared between threads.
+
+    Tokens are added at a constant rate up to a maximum burst.  Consuming more
+    tokens than available waits until the balance has been refilled, so large
+    requests are served at the same rate as small ones.
+
+    :param rate:
+        Tokens added per second.
+    :param burst:
+        Max tokens to accumulate while idle, defaults to one second worth.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = rate if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Take tokens from the bucket, waiting until they are available.
+
+        :param tokens:
+            Number of tokens to take.
+        :param timeout:
+            Max time in seconds to wait, or ``None`` to wait as long as needed.
+
+        :return: ``False`` if the tokens would not be available in time.
+        """
+        with self._lock:
+            self._refill()
+            delay = (tokens - self._tokens) / self.rate
+            if timeout is not None and delay > timeout:
+                return False
+            # Reserve the tokens now, possibly going into debt
+            self._tokens -= tokens
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def try_consume(self, tokens: float = 1) -> float:
+        """Take tokens from the bucket only if they are available now.
+
+        Requests for more tokens than the burst size are granted when the
+        bucket is full, going into debt.
+
+        :return:
+            0 if the tokens were taken, otherwise the time in seconds until
+            they will be available.
+        """
+        with self._lock:
+            self._refill()
+            needed = min(tokens, self.burst)
+            if self._tokens >= needed:
+                self._tokens -= tokens
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def charge(self, tokens: float = 1) -> None:
+        """Take tokens without waiting, possibly going into debt.
+
+        This accounts for events which have happened already, so they delay
+        the following ones.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,329 @@
+"""Frozen copy of the configparser based EDS import, as it was before
+import_eds_fast() was added.
+
+Kept as the reference which the current parsers are compared against in
+test_eds.py and benchmarks/eds_parser.py, so do not change it along with
+the library.
+"""
+
+import copy
+import logging
+import re
+from configparser import NoOptionError, NoSectionError, RawConfigParser
+from typing import Any
+
+from canopen.objectdictionary import (
+    ODArray,
+    ODRecord,
+    ODVariable,
+    ObjectDictionary,
+    datatypes,
+    objectcodes,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def import_eds(source, node_id):
+    eds = RawConfigParser(inline_comment_prefixes=(';',))
+    eds.optionxform = str
+    opened_here = False
+    try:
+        if hasattr(source, "read"):
+            fp = source
+        else:
+            fp = open(source)
+            opened_here = True
+        eds.read_file(fp)
+    finally:
+        # Only close object if opened in this fn
+        if opened_here:
+            fp.close()
+
+    od = ObjectDictionary()
+
+    if eds.has_section("FileInfo"):
+        od.__edsFileInfo = {  # type: ignore[attr-defined] # custom addition
+            opt: eds.get("FileInfo", opt)
+            for opt in eds.options("FileInfo")
+        }
+
+    if eds.has_section("Comments"):
+        linecount = int(eds.get("Comments", "Lines"), 0)
+        od.comments = '\n'.join([
+            eds.get("Comments", f"Line{line}")
+            for line in range(1, linecount + 1)
+        ])
+
+    if not eds.has_section("DeviceInfo"):
+        logger.warning("eds file does not have a DeviceInfo section. This section is mandatory")
+    else:
+        for rate in [10, 20, 50, 125, 250, 500, 800, 1000]:
+            baudPossible = int(
+                eds.get("DeviceInfo", f"BaudRate_{rate}", fallback='0'), 0)
+            if baudPossible != 0:
+                od.device_information.allowed_baudrates.add(rate*1000)
+
+        for t, eprop, odprop in [
+            (str, "VendorName", "vendor_name"),
+            (int, "VendorNumber", "vendor_number"),
+            (str, "ProductName", "product_name"),
+            (int, "ProductNumber", "product_number"),
+            (int, "RevisionNumber", "revision_number"),
+            (str, "OrderCode", "order_code"),
+            (bool, "SimpleBootUpMaster", "simple_boot_up_master"),
+            (bool, "SimpleBootUpSlave", "simple_boot_up_slave"),
+            (bool, "Granularity", "granularity"),
+            (bool, "DynamicChannelsSupported", "dynamic_channels_supported"),
+            (bool, "GroupMessaging", "group_messaging"),
+            (int, "NrOfRXPDO", "nr_of_RXPDO"),
+            (int, "NrOfTXPDO", "nr_of_TXPDO"),
+            (bool, "LSS_Supported", "LSS_supported"),
+        ]:
+            try:
+                if t in (int, bool):
+                    setattr(od.device_information, odprop,
+                            t(int(eds.get("DeviceInfo", eprop), 0))
+                            )
+                elif t is str:
+                    setattr(od.device_information, odprop,
+                            eds.get("DeviceInfo", eprop)
+                            )
+            except NoOptionError:
+                pass
+
+    if eds.has_section("DeviceComissioning"):
+        if val := eds.getint("DeviceComissioning", "Baudrate", fallback=None):
+            od.bitrate = val * 1000
+
+        if node_id is None:
+            if val := eds.get("DeviceComissioning", "NodeID", fallback=None):
+                node_id = int(val, base=0)
+        od.node_id = node_id
+
+    for section in eds.sections():
+        # Match dummy definitions
+        match = re.match(r"^[Dd]ummy[Uu]sage$", section)
+        if match is not None:
+            for i in range(1, 8):
+                key = f"Dummy{i:04d}"
+                if eds.getint(section, key) == 1:
+                    var = ODVariable(key, i, 0)
+                    var.data_type = i
+                    var.access_type = "const"
+                    od.add_object(var)
+
+        # Match indexes
+        match = re.match(r"^[0-9A-Fa-f]{4}$", section)
+        if match is not None:
+            index = int(section, 16)
+            name = eds.get(section, "ParameterName")
+            try:
+                object_type = int(eds.get(section, "ObjectType"), 0)
+            except NoOptionError:
+                # DS306 4.6.3.2 object description
+                # If the keyword ObjectType is missing, this is regarded as
+                # "ObjectType=0x7" (=VAR).
+                object_type = objectcodes.VAR
+            try:
+                storage_location = eds.get(section, "StorageLocation")
+            except NoOptionError:
+                storage_location = None
+
+            if object_type in (objectcodes.VAR, objectcodes.DOMAIN):
+                var = build_variable(eds, section, node_id, object_type, index)
+                od.add_object(var)
+            elif object_type == objectcodes.ARRAY and eds.has_option(section, "CompactSubObj"):
+                arr = ODArray(name, index)
+                last_subindex = ODVariable(
+                    "Number of entries", index, 0)
+                last_subindex.data_type = datatypes.UNSIGNED8
+                arr.add_member(last_subindex)
+                arr.add_member(build_variable(eds, section, node_id, object_type, index, 1))
+                arr.storage_location = storage_location
+                od.add_object(arr)
+            elif object_type == objectcodes.ARRAY:
+                arr = ODArray(name, index)
+                arr.storage_location = storage_location
+                od.add_object(arr)
+            elif object_type == objectcodes.RECORD:
+                record = ODRecord(name, index)
+                record.storage_location = storage_location
+                od.add_object(record)
+
+            continue
+
+        # Match subindexes
+        match = re.match(r"^([0-9A-Fa-f]{4})[S|s]ub([0-9A-Fa-f]+)$", section)
+        if match is not None:
+            index = int(match.group(1), 16)
+            subindex = int(match.group(2), 16)
+            entry = od[index]
+            if isinstance(entry, (ODRecord, ODArray)):
+                try:
+                    object_type = int(eds.get(section, "ObjectType"), 0)
+                except NoOptionError:
+                    object_type = objectcodes.VAR
+                var = build_variable(eds, section, node_id, object_type, index, subindex)
+                entry.add_member(var)
+
+        # Match [index]Name
+        match = re.match(r"^([0-9A-Fa-f]{4})Name", section)
+        if match is not None:
+            index = int(match.group(1), 16)
+            num_of_entries = int(eds.get(section, "NrOfEntries"))
+            entry = od[index]
+            # For CompactSubObj index 1 is were we find the variable
+            src_var = od[index][1]
+            for subindex in range(1, num_of_entries + 1):
+                var = copy_variable(eds, section, subindex, src_var)
+                if var is not None:
+                    entry.add_member(var)
+
+    return od
+
+
+def _calc_bit_length(data_type: int) -> int:
+    if data_type == datatypes.INTEGER8:
+        return 8
+    elif data_type == datatypes.INTEGER16:
+        return 16
+    elif data_type == datatypes.INTEGER32:
+        return 32
+    elif data_type == datatypes.INTEGER64:
+        return 64
+    else:
+        raise ValueError(
+            f"Invalid data_type 0x{data_type:04X}, expecting an integer data_type."
+        )
+
+
+def _signed_int_from_hex(hex_str, bit_length):
+    number = int(hex_str, 0)
+    max_value = (1 << (bit_length - 1)) - 1
+
+    if number > max_value:
+        return number - (1 << bit_length)
+    else:
+        return number
+
+
+def _convert_variable(node_id: int, var_type: int, value: Any) -> Any:
+    if var_type in (datatypes.OCTET_STRING, datatypes.DOMAIN):
+        return bytes.fromhex(value)
+    elif var_type in (datatypes.VISIBLE_STRING, datatypes.UNICODE_STRING):
+        return value
+    elif var_type in datatypes.FLOAT_TYPES:
+        return float(value)
+    else:
+        # COB-ID can contain '$NODEID+' so replace this with node_id before converting
+        value = value.replace(" ", "").upper()
+        if '$NODEID' in value and node_id is not None:
+            return int(re.sub(r'\+?\$NODEID\+?', '', value), 0) + node_id
+        else:
+            return int(value, 0)
+
+
+def build_variable(
+    eds: RawConfigParser,
+    section: str,
+    node_id: int,
+    object_type: int,
+    index: int,
+    subindex: int = 0
+) -> ODVariable:
+    """Create a object dictionary entry.
+
+    :param eds: String stream of the eds file
+    :param section:
+    :param node_id: Node ID
+    :param index: Index of the CANOpen object
+    :param subindex: Subindex of the CANOpen object (if present, else 0)
+    :param is_domain: variable represents a DOMAIN ObjectType (if present, else False)
+    """
+    name = eds.get(section, "ParameterName")
+    var = ODVariable(name, index, subindex)
+    try:
+        var.storage_location = eds.get(section, "StorageLocation")
+    except NoOptionError:
+        var.storage_location = None
+    var.data_type = int(eds.get(section, "DataType"), 0)
+    var.access_type = eds.get(section, "AccessType").lower()
+    var.is_domain = object_type == objectcodes.DOMAIN
+    if var.data_type > 0x1B:
+        # The object dictionary editor from CANFestival creates an optional object if min max
+        # values are used.  This optional object is then placed in the eds under the section
+        # [A0] (start point, iterates for more).  The eds.get function gives us 0x00A0 now
+        # convert to String without hex representation and upper case.  The sub2 part is then
+        # the section where the type parameter stands.
+        try:
+            var.data_type = int(eds.get(f"{var.data_type:X}sub1", "DefaultValue"), 0)
+        except NoSectionError:
+            logger.warning(
+                "%s has an unknown or unsupported data type (0x%X)", name, var.data_type
+            )
+            # Assume DOMAIN to force application to interpret the byte data
+            var.data_type = datatypes.DOMAIN
+
+    var.pdo_mappable = bool(int(eds.get(section, "PDOMapping", fallback="0"), 0))
+
+    if eds.has_option(section, "LowLimit"):
+        try:
+            min_string = eds.get(section, "LowLimit")
+            if var.data_type in datatypes.SIGNED_TYPES:
+                var.min = _signed_int_from_hex(min_string, _calc_bit_length(var.data_type))
+            else:
+                var.min = int(min_string, 0)
+        except ValueError:
+            pass
+    if eds.has_option(section, "HighLimit"):
+        try:
+            max_string = eds.get(section, "HighLimit")
+            if var.data_type in datatypes.SIGNED_TYPES:
+                var.max = _signed_int_from_hex(max_string, _calc_bit_length(var.data_type))
+            else:
+                var.max = int(max_string, 0)
+        except ValueError:
+            pass
+    if eds.has_option(section, "DefaultValue"):
+        try:
+            var.default_raw = eds.get(section, "DefaultValue")
+            if '$NODEID' in var.default_raw:
+                var.relative = True
+            var.default = _convert_variable(node_id, var.data_type, var.default_raw)
+        except ValueError:
+            pass
+    if eds.has_option(section, "ParameterValue"):
+        try:
+            var.value_raw = eds.get(section, "ParameterValue")
+            var.value = _convert_variable(node_id, var.data_type, var.value_raw)
+        except ValueError:
+            pass
+    # Factor, Description and Unit are not standard according to the CANopen specifications, but
+    # they are implemented in the python canopen package, so we can at least try to use them
+    if eds.has_option(section, "Factor"):
+        try:
+            var.factor = float(eds.get(section, "Factor"))
+        except ValueError:
+            pass
+    if eds.has_option(section, "Description"):
+        try:
+            var.description = eds.get(section, "Description")
+        except ValueError:
+            pass
+    if eds.has_option(section, "Unit"):
+        try:
+            var.unit = eds.get(section, "Unit")
+        except ValueError:
+            pass
+    return var
+
+
+def copy_variable(eds, section, subindex, src_var):
+    name = eds.get(section, str(subindex))
+    var = copy.copy(src_var)
+    # It is only the name and subindex that varies
+    var.name = name
+    var.subindex = subindex
+    return var
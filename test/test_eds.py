@@ -1,10 +1,19 @@
+import configparser
+import io
 import os
+import shutil
+import tempfile
 import unittest
 
 import canopen
-from canopen.objectdictionary.eds import _signed_int_from_hex
+from canopen.objectdictionary.cache import ObjectDictionaryCache
+from canopen.objectdictionary.eds import (
+    _signed_int_from_hex, build_variable, import_eds, import_eds_fast,
+)
+from canopen.objectdictionary.template import NodeObjectDictionary, ObjectDictionaryTemplate
 from canopen.utils import pretty_index
 
+from . import eds_reference
 from .util import DATATYPES_EDS, SAMPLE_EDS, tmp_file
 
 
@@ -397,5 +406,275 @@ class TestEDS(unittest.TestCase):
                 self.assertEqual(self.od.comments, exported_od.comments)
 
 
+VARIABLE_ATTRS = (
+    "index", "subindex", "name", "unit", "factor", "min", "max", "default",
+    "default_raw", "relative", "value", "value_raw", "data_type", "access_type",
+    "is_domain", "description", "value_descriptions", "bit_definitions",
+    "storage_location", "pdo_mappable",
+)
+
+
+def describe_od(od):
+    """Return the contents of an object dictionary as comparable values."""
+    def describe(obj):
+        if isinstance(obj, canopen.objectdictionary.ODVariable):
+            attrs = {key: getattr(obj, key, None) for key in VARIABLE_ATTRS}
+            return "ODVariable", attrs
+        attrs = {key: value for key, value in vars(obj).items()
+                 if key not in ("parent", "subindices", "names")}
+        attrs["members"] = [describe(var) for var in obj.values()]
+        return type(obj).__name__, attrs
+    info = dict(vars(od.device_information))
+    return ([describe(obj) for obj in od.values()], info, od.node_id,
+            od.bitrate, od.comments)
+
+
+class TestFastImport(unittest.TestCase):
+
+    SYNTAX = """\
+[FileInfo]
+FileName = odd.eds ; inline comment
+Description=A;B
+
+; Comment line
+# Other comment line
+[DeviceInfo]
+VendorName: Vendor
+ProductName=Name: with colon
+
+[1017]
+ParameterName=Producer heartbeat time
+ObjectType=0x7
+DataType=0x0006
+AccessType=RW
+DefaultValue = 0 x10
+"""
+
+    def assertSameResult(self, source, node_id=None):
+        """Check that both parsers give the same result as the frozen
+        reference implementation."""
+        def parse(func):
+            if isinstance(source, str) and "\n" in source:
+                return func(io.StringIO(source), node_id)
+            return func(source, node_id)
+        expected = parse(eds_reference.import_eds)
+        for func in import_eds, import_eds_fast:
+            od = parse(func)
+            self.assertEqual(describe_od(od), describe_od(expected), func.__name__)
+            self.assertEqual(getattr(od, "__edsFileInfo", None),
+                             getattr(expected, "__edsFileInfo", None))
+        return od
+
+    def test_files(self):
+        for path in SAMPLE_EDS, DATATYPES_EDS:
+            for node_id in None, 0, 3:
+                with self.subTest(path=path, node_id=node_id):
+                    self.assertSameResult(path, node_id)
+
+    def test_syntax(self):
+        od = self.assertSameResult(self.SYNTAX)
+        self.assertEqual(od.device_information.vendor_name, "Vendor")
+        self.assertEqual(od.device_information.product_name, "Name: with colon")
+        self.assertEqual(od[0x1017].access_type, "rw")
+
+    def test_continuation_line(self):
+        text = self.SYNTAX.replace("Description=A;B", "Description=A;B\n  continued")
+        od = self.assertSameResult(text)
+        self.assertEqual(getattr(od, "__edsFileInfo")["Description"], "A;B\ncontinued")
+
+    def test_errors(self):
+        with self.assertRaises(configparser.DuplicateSectionError):
+            import_eds_fast(io.StringIO(self.SYNTAX + "[1017]\n"), None)
+        with self.assertRaises(configparser.NoOptionError):
+            import_eds_fast(io.StringIO(self.SYNTAX.replace("AccessType=RW", "")), None)
+
+    def test_build_variable(self):
+        eds = configparser.RawConfigParser(inline_comment_prefixes=(";",))
+        eds.optionxform = str
+        eds.read(SAMPLE_EDS)
+        for section, index, subindex in ("1017", 0x1017, 0), ("1400sub1", 0x1400, 1):
+            var = build_variable(eds, section, 2, 7, index, subindex)
+            expected = eds_reference.build_variable(eds, section, 2, 7, index, subindex)
+            self.assertEqual({key: getattr(var, key) for key in VARIABLE_ATTRS},
+                             {key: getattr(expected, key) for key in VARIABLE_ATTRS})
+
+
+class TestObjectDictionaryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = ObjectDictionaryCache(os.path.join(self.tmp.name, "cache"))
+        self.path = os.path.join(self.tmp.name, "drive.eds")
+        shutil.copy(SAMPLE_EDS, self.path)
+
+    def entries(self):
+        return sorted(os.listdir(self.cache.directory))
+
+    def test_load(self):
+        od = self.cache.load(self.path, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        cached = self.cache.load(self.path, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(describe_od(cached), describe_od(od))
+        self.assertEqual(describe_od(cached), describe_od(canopen.import_od(SAMPLE_EDS, 2)))
+        self.assertIs(cached[0x1018][1].parent, cached[0x1018])
+        self.assertIs(cached["Identity object"], cached[0x1018])
+
+    def test_import_od(self):
+        canopen.import_od(self.path, 2, cache=self.cache)
+        od = canopen.import_od(self.path, 2, cache=self.cache)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(od[0x1400][1].default, 0x202)
+
+    def test_invalidate(self):
+        self.cache.load(self.path, 2)
+        self.cache.load(self.path, 3)
+        self.assertEqual(len(self.entries()), 2)
+        # A changed file is parsed again and replaces the old entry
+        with open(self.path) as fp:
+            text = fp.read()
+        with open(self.path, "w") as fp:
+            fp.write(text.replace("VendorName=", "VendorName=Changed "))
+        od = self.cache.load(self.path, 2)
+        self.assertEqual(self.cache.misses, 3)
+        self.assertTrue(od.device_information.vendor_name.startswith("Changed "))
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_same_name(self):
+        os.mkdir(os.path.join(self.tmp.name, "other"))
+        other = os.path.join(self.tmp.name, "other", "drive.eds")
+        with open(SAMPLE_EDS) as fp:
+            text = fp.read()
+        with open(other, "w") as fp:
+            fp.write(text.replace("VendorName=", "VendorName=Other "))
+        self.cache.load(self.path, 2)
+        self.cache.load(other, 2)
+        self.assertEqual(len(self.entries()), 2)
+        od = self.cache.load(self.path, 2)
+        other_od = self.cache.load(other, 2)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertFalse(od.device_information.vendor_name.startswith("Other "))
+        self.assertTrue(other_od.device_information.vendor_name.startswith("Other "))
+
+    def test_corrupt_entry(self):
+        self.cache.load(self.path, 2)
+        entry, = self.entries()
+        with open(os.path.join(self.cache.directory, entry), "wb") as fp:
+            fp.write(b"garbage")
+        with self.assertLogs("canopen.objectdictionary.cache", "WARNING"):
+            od = self.cache.load(self.path, 2)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(od[0x1018][1].name, "Vendor-ID")
+        # Repaired
+        self.cache.load(self.path, 2)
+        self.assertEqual(self.cache.hits, 1)
+        self.cache.clear()
+        self.assertEqual(self.entries(), [])
+
+
+class TestObjectDictionaryTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.template = ObjectDictionaryTemplate(SAMPLE_EDS)
+
+    def test_for_node(self):
+        od = self.template.for_node(2)
+        self.assertEqual(describe_od(od)[0], describe_od(canopen.import_od(SAMPLE_EDS, 2))[0])
+        self.assertEqual(od.node_id, 2)
+        self.assertEqual(self.template.for_node(3)[0x1400][1].default, 0x203)
+        self.assertEqual(self.template.od[0x1400][1].default, 0x200)
+        self.assertIs(od["Identity object"], od[0x1018])
+        self.assertIs(od["Identity object.Vendor-ID"], od[0x1018][1])
+        self.assertIs(od[0x1018][1].parent, od[0x1018])
+        self.assertIs(od[0x1018].parent, od)
+        # Dynamic array members take the attributes of the view
+        self.assertEqual(od[0x1003][5].data_type, self.template.od[0x1003][1].data_type)
+
+    def test_relative_value(self):
+        template = canopen.ObjectDictionary()
+        var = canopen.objectdictionary.ODVariable("COB-ID", 0x1800)
+        var.data_type = canopen.objectdictionary.UNSIGNED32
+        var.value_raw = "$NODEID+0x180"
+        var.value = 0x180
+        var.default_raw = "$nodeid + 0x180"
+        var.default = 0x180
+        template.add_object(var)
+        node_od = NodeObjectDictionary(template, 5)
+        self.assertEqual(node_od[0x1800].value, 0x185)
+        self.assertEqual(node_od[0x1800].default, 0x185)
+        # Same as when importing the file for the node
+        self.assertEqual(canopen.objectdictionary.eds._convert_integer(5, var.default_raw),
+                         0x185)
+
+    def test_copy_on_write(self):
+        od2 = self.template.for_node(2)
+        od3 = self.template.for_node(3)
+        od2[0x1400][1].default = 5
+        od2[0x1018][1].add_value_description(1, "Vendor")
+        self.assertEqual(od2[0x1400][1].default, 5)
+        self.assertEqual(od3[0x1400][1].default, 0x203)
+        self.assertEqual(self.template.od[0x1400][1].default, 0x200)
+        self.assertEqual(od3[0x1018][1].value_descriptions, {})
+        self.assertEqual(self.template.od[0x1018][1].value_descriptions, {})
+
+        del od2[0x1018]
+        del od2[0x1400][1]
+        od2.add_object(canopen.objectdictionary.ODVariable("Extra", 0x5000))
+        self.assertNotIn(0x1018, od2)
+        self.assertNotIn("Identity object", od2)
+        self.assertNotIn(1, od2[0x1400])
+        self.assertIn(0x5000, od2)
+        self.assertNotIn(0x1018, [obj.index for obj in od2.index_range(0x1000, 0x1FFF)])
+        self.assertIn(0x1018, [obj.index for obj in od3.index_range(0x1000, 0x1FFF)])
+        self.assertEqual(len(od2), len(od3))
+        self.assertEqual(list(od3), list(self.template.od))
+        self.assertEqual(len(self.template.od[0x1400]), len(od3[0x1400]))
+        with self.assertRaises(KeyError):
+            od2[0x1018]
+
+    def test_template_changed(self):
+        od = self.template.for_node(2)
+        list(od)
+        od.variables()
+        var = canopen.objectdictionary.ODVariable("Added later", 0x5000)
+        self.template.od.add_object(var)
+        self.assertIn(0x5000, list(od))
+        self.assertEqual(len(od), len(self.template.od))
+        self.assertEqual(od.variables()[-1].name, "Added later")
+        self.assertEqual([obj.index for obj in od.index_range(0x5000, 0x5000)], [0x5000])
+
+    def test_cached_lists(self):
+        od = self.template.for_node(2)
+        indices = od._sorted_indices()
+        self.assertIs(od._sorted_indices(), indices)
+        self.assertEqual(indices, list(self.template.od))
+        # Filtering only creates views for the selected objects
+        mappable = od.variables(pdo_mappable=True)
+        self.assertEqual([var.name for var in mappable],
+                         [var.name for var in self.template.od.variables(pdo_mappable=True)])
+        self.assertEqual(set(od.indices), {var.index for var in mappable})
+        self.assertIs(od.variables(pdo_mappable=True)[0], mappable[0])
+        # Changes of views are taken into account
+        od[0x1017].pdo_mappable = True
+        self.assertIn(od[0x1017], od.variables(pdo_mappable=True))
+        self.assertNotIn(0x1017, [var.index for var in
+                                  self.template.od.variables(pdo_mappable=True)])
+        # Changes of the template replace the cached lists
+        self.template.od[0x1018][1].pdo_mappable = True
+        self.assertIs(od._sorted_indices(), indices)
+        del self.template.od[0x1008]
+        self.assertNotIn(0x1008, od._sorted_indices())
+        self.assertIn(od[0x1018][1], od.variables(pdo_mappable=True))
+
+    def test_add_node(self):
+        network = canopen.Network()
+        node = network.add_node(2, self.template)
+        self.assertIsInstance(node.object_dictionary, NodeObjectDictionary)
+        self.assertEqual(node.sdo[0x1400][1].od.default, 0x202)
+        with self.assertRaises(ValueError):
+            canopen.RemoteNode(None, self.template)
+
+
 if __name__ == "__main__":
     unittest.main()
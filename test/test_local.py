@@ -1,9 +1,12 @@
+import io
+import threading
 import time
 import unittest
+from unittest.mock import patch
 
 import canopen
 
-from .util import SAMPLE_EDS
+from .util import SAMPLE_EDS, tmp_file
 
 
 class TestSDO(unittest.TestCase):
@@ -37,22 +40,88 @@ class TestSDO(unittest.TestCase):
         vendor_id = self.remote_node.sdo[0x1400][1].raw
         self.assertEqual(vendor_id, 0x99)
 
-    def test_block_upload_switch_to_expedite_upload(self):
-        with self.assertRaises(canopen.SdoCommunicationError) as context:
-            with self.remote_node.sdo[0x1008].open('r', block_transfer=True) as fp:
-                pass
-        # We get this since the sdo client don't support the switch
-        # from block upload to expedite upload
-        self.assertEqual("Unexpected response 0x41", str(context.exception))
-
-    def test_block_download_not_supported(self):
+    def test_block_upload(self):
+        data = b"".join(b"%04d" % i for i in range(250))
+        self.local_node.sdo[0x2000].data = data
+        with self.remote_node.sdo[0x2000].open('rb', block_transfer=True) as fp:
+            self.assertEqual(fp.read(), data)
+
+    def test_block_download(self):
+        data = b"".join(b"%04d" % i for i in range(250))
+        with self.remote_node.sdo[0x2000].open('wb', size=len(data),
+                                               block_transfer=True) as fp:
+            fp.write(data)
+        self.assertEqual(self.local_node.sdo[0x2000].data, data)
+
+    def test_block_download_burst(self):
+        for size in (0, 1, 7, 889, 1000):
+            data = bytes(i % 251 for i in range(size))
+            self.remote_node.sdo.download(0x2000, 0, data, block_transfer=True)
+            self.assertEqual(self.local_node.sdo[0x2000].data, data)
+
+    def test_block_download_read_only(self):
         data = b"TEST DEVICE"
         with self.assertRaises(canopen.SdoAbortedError) as context:
             with self.remote_node.sdo[0x1008].open('wb',
                                                    size=len(data),
                                                    block_transfer=True) as fp:
-                pass
-        self.assertEqual(context.exception.code, 0x05040001)
+                fp.write(data)
+        self.assertEqual(context.exception.code, 0x06010002)
+
+    def test_domain_source_segmented(self):
+        data = bytes(range(256)) * 4
+        chunks = [data[i:i + 100] for i in range(0, len(data), 100)]
+        self.local_node.set_domain_source(0x2000, 0, lambda: iter(chunks))
+        self.addCleanup(self.local_node.set_domain_source, 0x2000, 0, None)
+        self.assertEqual(self.remote_node.sdo.upload(0x2000, 0), data)
+        # A new stream is used for every upload
+        self.assertEqual(self.remote_node.sdo.upload(0x2000, 0), data)
+
+    def test_domain_source_block(self):
+        data = bytes(range(256)) * 4
+        self.local_node.set_domain_source(0x2000, 0, lambda: io.BytesIO(data))
+        self.addCleanup(self.local_node.set_domain_source, 0x2000, 0, None)
+        with self.remote_node.sdo[0x2000].open('rb', block_transfer=True) as fp:
+            self.assertEqual(fp.read(), data)
+
+    def test_upload_into(self):
+        data = bytes(range(256)) * 4
+        self.local_node.set_domain_source(0x2000, 0, lambda: iter([data]))
+        self.addCleanup(self.local_node.set_domain_source, 0x2000, 0, None)
+        for block_transfer in (False, True):
+            buffer = bytearray(2000)
+            size = self.remote_node.sdo.upload_into(0x2000, 0, buffer,
+                                                    block_transfer=block_transfer)
+            self.assertEqual(buffer[:size], data)
+            with tmp_file() as tmp:
+                size = self.remote_node.sdo.upload_to_file(0x2000, 0, tmp.name,
+                                                           block_transfer=block_transfer)
+                self.assertEqual(size, len(data))
+                with open(tmp.name, "rb") as fp:
+                    self.assertEqual(fp.read(), data)
+        # Known size, received into a memory map of the file
+        self.local_node.set_domain_source(0x2000, 0, data)
+        with tmp_file() as tmp:
+            self.remote_node.sdo.upload_to_file(0x2000, 0, tmp.name)
+            with open(tmp.name, "rb") as fp:
+                self.assertEqual(fp.read(), data)
+
+    def test_domain_sink(self):
+
+        class Sink(io.BytesIO):
+            def close(self):
+                received.append(self.getvalue())
+                super().close()
+
+        received = []
+        self.local_node.set_domain_sink(0x2000, 0, Sink)
+        self.addCleanup(self.local_node.set_domain_sink, 0x2000, 0, None)
+        data = bytes(range(256)) * 4
+        self.remote_node.sdo.download(0x2000, 0, data)
+        with self.remote_node.sdo[0x2000].open('wb', size=len(data),
+                                               block_transfer=True) as fp:
+            fp.write(data)
+        self.assertEqual(received, [data, data])
 
     def test_expedited_upload_default_value_visible_string(self):
         device_name = self.remote_node.sdo["Manufacturer device name"].raw
@@ -94,6 +163,22 @@ class TestSDO(unittest.TestCase):
         value = self.local_node.sdo[0x2000].data
         self.assertEqual(value, b"Another cool device")
 
+    def test_read_all_record(self):
+        self.local_node.sdo[0x1018][2].raw = 0x1234
+        self.local_node.sdo[0x1018][4].raw = 0x5678
+        values = self.remote_node.sdo[0x1018].read_all()
+        self.assertEqual(values, {1: 1, 2: 0x1234, 4: 0x5678})
+
+    def test_write_all(self):
+        self.remote_node.sdo[0x1400].write_all({
+            1: 0x202,
+            "Transmission type RPDO 1": 254,
+        })
+        self.assertEqual(self.local_node.sdo[0x1400][1].raw, 0x202)
+        self.assertEqual(self.local_node.sdo[0x1400][2].raw, 254)
+        with self.assertRaises(canopen.SdoAbortedError):
+            self.remote_node.sdo[0x1018].write_all({1: 2})
+
     def test_slave_send_heartbeat(self):
         # Setting the heartbeat time should trigger heartbeating
         # to start
@@ -177,6 +262,203 @@ class TestSDO(unittest.TestCase):
         self.assertEqual(self._kwargs["subindex"], 0)
         self.assertEqual(self._kwargs["data"], b"\x03\x04")
 
+    def test_callbacks_by_index(self):
+        calls = []
+        node = canopen.LocalNode(4, SAMPLE_EDS)
+        node.add_read_callback(lambda **kwargs: calls.append("all"))
+        node.add_read_callback(lambda **kwargs: calls.append("1018"), index=0x1018)
+        node.add_read_callback(lambda **kwargs: calls.append("1000-1FFF"),
+                               index=range(0x1000, 0x2000))
+
+        node.get_data(0x1018, 1)
+        self.assertEqual(calls, ["all", "1018", "1000-1FFF"])
+        calls.clear()
+        node.get_data(0x1017, 0)
+        self.assertEqual(calls, ["all", "1000-1FFF"])
+        calls.clear()
+        node.data_store[0x2001] = {0: b"\x01\x00"}
+        node.get_data(0x2001, 0)
+        self.assertEqual(calls, ["all"])
+
+        # Registering later invalidates the memoized lookup
+        node.add_read_callback(lambda **kwargs: 0x99, index=0x2001)
+        self.assertEqual(node.get_data(0x2001, 0), b"\x99\x00")
+
+        with self.assertRaises(ValueError):
+            node.add_write_callback(lambda **kwargs: None, index=range(0, 10, 2))
+
+
+class TestDataStore(unittest.TestCase):
+    """
+    Test the compact storage of object values.
+    """
+
+    def setUp(self):
+        self.node = canopen.LocalNode(2, SAMPLE_EDS)
+        self.store = self.node.data_store
+
+    def test_shared_initial_values(self):
+        other = canopen.LocalNode(3, self.node.object_dictionary)
+        first = self.node.get_data(0x1017, 0)
+        # Encoded once for the object dictionary
+        self.assertIs(other.get_data(0x1017, 0), first)
+        # Variable-size objects are handled the same way
+        self.assertEqual(self.node.get_data(0x1008, 0),
+                         self.node.object_dictionary[0x1008].encode_raw(
+                             self.node.object_dictionary[0x1008].default))
+
+    def test_defaults(self):
+        var = self.node.object_dictionary[0x1400][1]
+        data = self.node.get_data(0x1400, 1)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(data, var.encode_raw(var.default))
+        # Only written values appear in the mapping
+        self.assertNotIn(0x1400, self.store)
+        # Changes in the object dictionary apply to unwritten objects
+        var.value = 77
+        self.assertEqual(self.node.get_data(0x1400, 1), var.encode_raw(77))
+        other = canopen.LocalNode(3, self.node.object_dictionary)
+        self.assertEqual(other.get_data(0x1400, 1), var.encode_raw(77))
+
+    def test_write(self):
+        self.node.set_data(0x1400, 1, b"\x01\x02\x00\x00")
+        data = self.node.get_data(0x1400, 1)
+        self.assertEqual(data, b"\x01\x02\x00\x00")
+        # Data read before stays unchanged
+        self.node.set_data(0x1400, 1, b"\xf4\x01\x00\x00")
+        self.assertEqual(data, b"\x01\x02\x00\x00")
+        self.node.set_data(0x1400, 1, b"\x01\x02\x00\x00")
+        self.assertEqual(self.store[0x1400][1], b"\x01\x02\x00\x00")
+        self.assertEqual(list(self.store), [0x1400])
+        self.node.set_data(0x2000, 0, b"variable")
+        self.assertEqual(self.node.get_data(0x2000, 0), b"variable")
+        self.assertEqual(dict(self.store[0x2000]), {0: b"variable"})
+
+    def test_size_mismatch(self):
+        self.store.set(0x1017, 0, b"\x01\x02\x03")
+        self.assertEqual(self.store.get(0x1017, 0), b"\x01\x02\x03")
+        del self.store[0x1017][0]
+        self.assertIsNone(self.store.get(0x1017, 0))
+
+    def test_snapshot_restore(self):
+        self.node.set_data(0x1400, 1, b"\x01\x02\x00\x00")
+        snapshot = self.store.snapshot()
+        self.node.set_data(0x1400, 1, b"\x03\x02\x00\x00")
+        self.node.set_data(0x2000, 0, b"variable")
+        self.store.restore(snapshot)
+        self.assertEqual(self.node.get_data(0x1400, 1), b"\x01\x02\x00\x00")
+        self.assertNotIn(0x2000, self.store)
+        self.store.restore()
+        self.assertEqual(len(self.store), 0)
+
+    def test_dict_compatibility(self):
+        self.store[0x1400] = {1: b"\x01\x02\x00\x00"}
+        self.store.setdefault(0x1400, {})[2] = b"\xfe"
+        self.assertEqual(dict(self.store[0x1400]), {1: b"\x01\x02\x00\x00", 2: b"\xfe"})
+        del self.store[0x1400]
+        with self.assertRaises(KeyError):
+            self.store[0x1400]
+
+
+class TestSdoBulk(unittest.TestCase):
+    """
+    Test concurrent SDO transfers against several servers.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.network1 = canopen.Network()
+        cls.network1.NOTIFIER_SHUTDOWN_TIMEOUT = 0.0
+        cls.network1.connect("bulk", interface="virtual")
+        cls.network2 = canopen.Network()
+        cls.network2.NOTIFIER_SHUTDOWN_TIMEOUT = 0.0
+        cls.network2.connect("bulk", interface="virtual")
+        for node_id in (2, 3):
+            cls.network1.add_node(node_id, SAMPLE_EDS)
+            cls.network2.create_node(node_id, SAMPLE_EDS)
+        # No server for this one
+        cls.network1.add_node(4, SAMPLE_EDS).sdo.RESPONSE_TIMEOUT = 0.05
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.network1.disconnect()
+        cls.network2.disconnect()
+
+    def test_bulk(self):
+        results = self.network1.sdo_bulk([
+            (2, "Manufacturer device name", 0),
+            (3, 0x1400, 1),
+            (2, 0x2000, 0, b"Another cool device"),
+            (3, 0x2004, 0, b"\x01\x02\x03\x04"),
+            (4, 0x1000, 0),
+            (2, 0x1234, 0),
+            (2, 0x2000, 0),
+        ])
+        self.assertEqual(results[0], b"TEST DEVICE")
+        self.assertEqual(results[1], b"\x03\x02\x00\x00")
+        self.assertIsNone(results[2])
+        self.assertIsNone(results[3])
+        self.assertIsInstance(results[4], canopen.SdoCommunicationError)
+        self.assertIsInstance(results[5], canopen.SdoAbortedError)
+        self.assertEqual(results[5].code, 0x06020000)
+        # Items of one node are transferred in order
+        self.assertEqual(results[6], b"Another cool device")
+        self.assertEqual(self.network2[3].sdo[0x2004].raw, 0x04030201)
+        # Normal transfers work again afterwards
+        self.assertEqual(self.network1[3].sdo.upload(0x2004, 0), b"\x01\x02\x03\x04")
+
+    def test_transfer_callback(self):
+        transfers = []
+        sdo = self.network1[2].sdo
+        sdo.add_transfer_callback(transfers.append)
+        self.addCleanup(sdo.remove_transfer_callback, transfers.append)
+        results = self.network1.sdo_bulk([
+            (2, 0x2000, 0, b"Segmented download"),
+            (2, 0x2000, 0),
+            (2, 0x1400, 1),
+            (2, 0x1234, 0),
+        ])
+        self.assertEqual(results[1], b"Segmented download")
+        download, upload, expedited, aborted = transfers
+        self.assertEqual(download[:8], (2, 0x2000, 0, "download", "segmented", 18, 3, 0))
+        self.assertEqual(upload[:8], (2, 0x2000, 0, "upload", "segmented", 18, 3, 0))
+        self.assertGreaterEqual(upload.duration, upload.waiting + upload.sending)
+        self.assertEqual(expedited[3:6], ("upload", "expedited", 4))
+        self.assertEqual(aborted.abort_code, 0x06020000)
+        self.assertFalse(aborted.ok)
+        self.assertIsNone(sdo._trace)
+
+    def test_cache_invalidated(self):
+        sdo = self.network1[3].sdo
+        sdo.cache = canopen.sdo.SdoCache(rw_ttl=60)
+        self.addCleanup(setattr, sdo, "cache", None)
+        sdo[0x2004].raw = 1
+        self.assertEqual(sdo[0x2004].raw, 1)
+        self.assertEqual(len(sdo.cache), 1)
+        self.network1.sdo_bulk([(3, 0x2004, 0, b"\x02\x00\x00\x00")])
+        self.assertEqual(len(sdo.cache), 0)
+        self.assertEqual(sdo[0x2004].raw, 2)
+
+    def test_requests_sent_by_caller(self):
+        # Requests may wait for the SDO scheduler, which must not happen in
+        # the thread receiving messages
+        sdo = self.network1[2].sdo
+        threads = []
+        send_request = sdo.send_request
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return send_request(*args, **kwargs)
+
+        with patch.object(sdo, "send_request", record):
+            results = self.network1.sdo_bulk([
+                (2, 0x2000, 0, b"Segmented download"),
+                (2, 0x2000, 0),
+            ])
+        self.assertEqual(results, [None, b"Segmented download"])
+        self.assertGreater(len(threads), 4)
+        self.assertEqual(set(threads), {threading.current_thread()})
+
 
 class TestPDO(unittest.TestCase):
     """
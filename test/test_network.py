@@ -1,6 +1,8 @@
 import logging
+import threading
 import time
 import unittest
+from unittest.mock import patch
 
 import can
 
@@ -119,6 +121,34 @@ class TestNetwork(unittest.TestCase):
         self.assertEqual(msg.arbitration_id, 0x12345)
         self.assertTrue(msg.is_extended_id)
 
+    def test_network_send_messages(self):
+        bus = can.interface.Bus(interface="virtual")
+        self.addCleanup(bus.shutdown)
+
+        self.network.connect(interface="virtual")
+        self.addCleanup(self.network.disconnect)
+
+        self.network.send_messages(0x602, [b"\x01", b"\x02", b"\x83"])
+        for data in (b"\x01", b"\x02", b"\x83"):
+            msg = bus.recv(1)
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.arbitration_id, 0x602)
+            self.assertEqual(msg.data, data)
+
+        # Without a python-can bus, send_message() is used for each message
+        self.network.disconnect()
+        sent = []
+
+        def send_message(network, can_id, data):
+            sent.append((can_id, data))
+
+        # Patched on the class, as mocks usually are
+        with patch.object(canopen.Network, "send_message", send_message):
+            self.network.send_messages(0x602, [b"\x01", b"\x82"])
+        self.assertEqual(sent, [(0x602, b"\x01"), (0x602, b"\x82")])
+        with self.assertRaisesRegex(RuntimeError, "Not connected"):
+            self.network.send_messages(0x602, [b"\x01"])
+
     def test_network_subscribe_unsubscribe(self):
         N_HOOKS = 3
         accumulators = [] * N_HOOKS
@@ -315,6 +345,66 @@ class TestNetwork(unittest.TestCase):
         self.assertIsNone(self.network.notifier)
 
 
+class TestPdoWait(unittest.TestCase):
+
+    def setUp(self):
+        self.network = canopen.Network()
+        self.maps = []
+        for node_id in (2, 3):
+            node = self.network.add_node(node_id, SAMPLE_EDS)
+            pdo_map = node.tpdo[1]
+            pdo_map.cob_id = 0x180 + node_id
+            pdo_map.enabled = True
+            pdo_map.trans_type = 1
+            pdo_map.add_variable('INTEGER16 value')
+            pdo_map.subscribe()
+            self.maps.append(pdo_map)
+
+    def notify_later(self, *messages):
+        def notify():
+            for can_id, data in messages:
+                self.network.notify(can_id, data, time.time())
+        timer = threading.Timer(0.01, notify)
+        timer.start()
+        self.addCleanup(timer.join)
+
+    def test_wait_for_any_pdo(self):
+        self.notify_later((0x183, b'\x01\x00'))
+        received = self.network.wait_for_any_pdo(self.maps, timeout=1)
+        self.assertEqual(list(received), [self.maps[1]])
+
+    def test_wait_for_all_pdos(self):
+        self.notify_later((0x182, b'\x01\x00'), (0x182, b'\x02\x00'),
+                          (0x183, b'\x03\x00'))
+        received = self.network.wait_for_all_pdos(self.maps, timeout=1)
+        self.assertEqual(set(received), set(self.maps))
+        # Only the first reception of each map is recorded
+        self.assertLessEqual(received[self.maps[0]], received[self.maps[1]])
+        for pdo_map in self.maps:
+            self.assertEqual(pdo_map._waiters, [])
+
+    def test_wait_for_all_pdos_timeout(self):
+        received = self.network.wait_for_all_pdos(self.maps, timeout=0.01)
+        self.assertEqual(received, {})
+
+    def test_wait_for_sync_pdos(self):
+        # Receptions before the SYNC are not part of the cycle
+        self.notify_later((0x182, b'\x01\x00'), (0x80, b''),
+                          (0x183, b'\x02\x00'), (0x182, b'\x03\x00'))
+        received = self.network.wait_for_sync_pdos(timeout=1)
+        self.assertEqual(set(received), set(self.maps))
+        self.assertEqual(self.maps[0]['INTEGER16 value'].raw, 3)
+        self.assertNotIn(0x80, self.network.subscribers)
+
+    def test_synchronous_tpdos(self):
+        self.assertEqual(self.network.synchronous_tpdos(), self.maps)
+        # Not sent after every SYNC
+        self.maps[1].trans_type = 2
+        self.assertEqual(self.network.synchronous_tpdos(), self.maps[:1])
+        self.maps[0].enabled = False
+        self.assertEqual(self.network.synchronous_tpdos(), [])
+
+
 class TestScanner(unittest.TestCase):
     TIMEOUT = 0.1
 
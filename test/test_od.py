@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 from canopen import objectdictionary as od
@@ -335,6 +337,121 @@ class TestObjectDictionary(unittest.TestCase):
         test_od = od.ObjectDictionary()
         self.assertIsNone(test_od.get_variable(0x9999))
 
+    def test_sorted_index(self):
+        test_od = od.ObjectDictionary()
+        for index in 0x6000, 0x1000, 0x2000, 0x6100, 0x1800:
+            test_od.add_object(od.ODVariable(f"Var {index:X}", index))
+        self.assertEqual(list(test_od), [0x1000, 0x1800, 0x2000, 0x6000, 0x6100])
+        # Deleting while iterating works on a snapshot
+        for index in test_od:
+            if index < 0x2000:
+                del test_od[index]
+        self.assertEqual(list(test_od), [0x2000, 0x6000, 0x6100])
+        self.assertEqual(len(test_od), 3)
+        test_od.add_object(od.ODVariable("Var 6000 again", 0x6000))
+        self.assertEqual(list(test_od), [0x2000, 0x6000, 0x6100])
+
+    def test_index_range(self):
+        test_od = od.ObjectDictionary()
+        for index in 0x6100, 0x6000, 0x67FF, 0x6800, 0x5FFF:
+            test_od.add_object(od.ODVariable(f"Var {index:X}", index))
+        self.assertEqual([obj.index for obj in test_od.index_range(0x6000, 0x67FF)],
+                         [0x6000, 0x6100, 0x67FF])
+        self.assertEqual(test_od.index_range(0x7000, 0x7FFF), [])
+
+    def test_variables(self):
+        test_od = od.ObjectDictionary()
+        var = od.ODVariable("Mappable", 0x2000)
+        var.pdo_mappable = True
+        test_od.add_object(var)
+        var = od.ODVariable("Read-only", 0x1000)
+        var.access_type = "ro"
+        var.value = 5
+        test_od.add_object(var)
+        record = od.ODRecord("Record", 0x3000)
+        test_od.add_object(record)
+        var = od.ODVariable("Member", 0x3000, 1)
+        var.pdo_mappable = True
+        var.value = 1
+        record.add_member(var)
+
+        def names(**kwargs):
+            return [var.name for var in test_od.variables(**kwargs)]
+
+        self.assertEqual(names(), ["Read-only", "Mappable", "Member"])
+        self.assertEqual(names(pdo_mappable=True), ["Mappable", "Member"])
+        self.assertEqual(names(pdo_mappable=False), ["Read-only"])
+        self.assertEqual(names(writable=True), ["Mappable", "Member"])
+        self.assertEqual(names(has_value=True), ["Read-only", "Member"])
+        self.assertEqual(names(pdo_mappable=True, has_value=False), ["Mappable"])
+        # Members added later are indexed again
+        record.add_member(od.ODVariable("Member 2", 0x3000, 2))
+        self.assertEqual(names(pdo_mappable=False), ["Read-only", "Member 2"])
+        # Properties changed later are taken into account
+        test_od[0x2000].value = 3
+        test_od[0x2000].access_type = "ro"
+        self.assertEqual(names(has_value=True), ["Read-only", "Mappable", "Member"])
+        self.assertEqual(names(writable=True), ["Member", "Member 2"])
+        # The indexes are kept until then
+        index = test_od._variable_index()
+        self.assertIs(test_od._variable_index(), index)
+        self.assertEqual(index.pdo_mappable, (test_od[0x2000], record[1]))
+        record[2].pdo_mappable = True
+        self.assertIsNot(test_od._variable_index(), index)
+        self.assertEqual(names(pdo_mappable=True), ["Mappable", "Member", "Member 2"])
+        # Variables created for undefined array members are not indexed
+        array = od.ODArray("Array", 0x4000)
+        array.add_member(od.ODVariable("Element", 0x4000, 1))
+        test_od.add_object(array)
+        index = test_od._variable_index()
+        array[5]
+        self.assertIs(test_od._variable_index(), index)
+        del test_od[0x4000]
+        del record[1]
+        del test_od[0x1000]
+        self.assertEqual(names(), ["Mappable", "Member 2"])
+
+
+class TestVariable(unittest.TestCase):
+
+    def test_slots(self):
+        var = od.ODVariable("Test Variable", 0x1000)
+        self.assertFalse(hasattr(var, "__dict__"))
+        with self.assertRaises(AttributeError):
+            var.no_such_attribute = 1
+
+    def test_value_descriptions_on_demand(self):
+        var1 = od.ODVariable("Test Variable", 0x1000)
+        var2 = od.ODVariable("Test Variable 2", 0x1001)
+        self.assertIsNone(var1._value_descriptions)
+        with self.assertRaises(od.ObjectDictionaryError):
+            var1.decode_desc(1)
+        self.assertIsNone(var1._value_descriptions)
+        var1.add_value_description(1, "One")
+        var1.add_bit_definition("BIT", [0])
+        self.assertEqual(var1.value_descriptions, {1: "One"})
+        self.assertEqual(var1.bit_definitions, {"BIT": [0]})
+        self.assertEqual(var2.value_descriptions, {})
+        self.assertEqual(var2.bit_definitions, {})
+        # Usable as plain dicts
+        var2.value_descriptions[2] = "Two"
+        var2.bit_definitions["BITS"] = [1, 2]
+        self.assertEqual(var2.decode_desc(2), "Two")
+        self.assertEqual(var2.decode_bits(0b110, "BITS"), 0b11)
+        var2.value_descriptions = {3: "Three"}
+        self.assertEqual(var2.encode_desc("Three"), 3)
+        self.assertEqual(var1.value_descriptions, {1: "One"})
+
+    def test_copy_and_pickle(self):
+        var = od.ODVariable("Test Variable", 0x1000, 1)
+        var.data_type = od.UNSIGNED16
+        var.default_raw = "$NODEID+0x10"
+        for other in copy.copy(var), pickle.loads(pickle.dumps(var)):
+            self.assertEqual((other.name, other.index, other.subindex, other.data_type,
+                              other.default_raw),
+                             ("Test Variable", 0x1000, 1, od.UNSIGNED16, "$NODEID+0x10"))
+            self.assertEqual(other.value_descriptions, {})
+
 
 class TestArray(unittest.TestCase):
 
@@ -1,3 +1,4 @@
+import time
 import unittest
 
 import canopen
@@ -140,5 +141,204 @@ class TestPDO(unittest.TestCase):
                         self.assertIn("Frame Name", header)
 
 
+class TestPDOOptimize(unittest.TestCase):
+    def setUp(self):
+        self.node = canopen.LocalNode(1, SAMPLE_EDS)
+
+    def test_optimize_packs_rate_classes(self):
+        plan = self.node.tpdo.optimize({
+            'INTEGER32 value': 100,
+            'INTEGER16 value': 100,
+            'ReadRawValue.Temperature': 10,
+            'UNSIGNED8 value': 10,
+        }, bitrate=250000)
+        # The 10 Hz objects fit into the free space of the 100 Hz PDO
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(plan.frames_per_second, 110)
+        self.assertGreater(plan.projected_load, 0)
+        self.assertIn("Projected bus load", plan.summary())
+
+    def test_optimize_merges_slow_frame(self):
+        plan = self.node.tpdo.optimize({
+            'INTEGER32 value': 100,
+            'UNSIGNED8 value': 10,
+        })
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan.frames_per_second, 100)
+
+    def test_optimize_apply(self):
+        plan = self.node.tpdo.optimize({
+            (0x2004, 0): 50,
+            0x2001: 50,
+        })
+        plan.apply()
+        pdo = self.node.tpdo[1]
+        self.assertTrue(pdo.enabled)
+        self.assertEqual(pdo.length, 48)
+        self.assertEqual(pdo.trans_type, 254)
+        self.assertAlmostEqual(pdo.period, 0.02)
+        self.assertEqual(pdo.cob_id, 0x181)
+        self.assertFalse(self.node.tpdo[2].enabled)
+        self.assertAlmostEqual(canopen.pdo.bus_load([pdo], 500000),
+                               plan.projected_load)
+
+    def test_optimize_map_capacity(self):
+        # Sub-index 0 of the mapping parameter is 1, but 4 entries are defined
+        pdo_map = self.node.tpdo[1]
+        self.assertEqual(pdo_map.map_array.od[0].default, 1)
+        self.assertEqual(canopen.pdo.optimize._map_capacity(pdo_map), 4)
+        plan = self.node.tpdo.optimize({
+            'UNSIGNED8 value': 10,
+            'INTEGER8 value': 10,
+            'BOOLEAN value': 10,
+        })
+        self.assertEqual(len(plan), 1)
+
+    def test_optimize_not_mappable(self):
+        with self.assertRaises(ValueError):
+            self.node.tpdo.optimize({'Device type': 10})
+
+    def test_optimize_too_many_objects(self):
+        # Leave only one map available
+        for map_no in (2, 3, 4):
+            del self.node.tpdo.map.maps[map_no]
+        with self.assertRaises(ValueError):
+            self.node.tpdo.optimize({
+                'INTEGER32 value': 100,
+                'ReadRawValue.Temperature': 10,
+                'INTEGER16 value': 10,
+            })
+
+
+class TestMPDO(unittest.TestCase):
+    def setUp(self):
+        self.node = canopen.LocalNode(1, SAMPLE_EDS)
+        self.network = canopen.Network()
+        self.network.add_node(self.node)
+        self.sent = []
+        self.network.send_message = lambda can_id, data, remote=False: \
+            self.sent.append((can_id, bytes(data)))
+        self.pdo = self.node.tpdo[1]
+        self.pdo.cob_id = 0x181
+        self.pdo.mpdo_mode = canopen.pdo.base.MPDO_SAM
+
+    def test_mpdo_receive(self):
+        received = []
+        self.pdo.add_mpdo_callback(
+            lambda *args: received.append(args), 0x2004, 0)
+        self.pdo.on_message(0x181, b'\x05\x04\x20\x00\x01\x02\x03\x04', 1.0)
+        self.pdo.on_message(0x181, b'\x05\x01\x20\x00\xff\xff\x00\x00', 2.0)
+        self.assertEqual(received, [(5, 0x2004, 0, b'\x01\x02\x03\x04')])
+        self.assertEqual(self.pdo.mpdo_data[(5, 0x2001, 0)], b'\xff\xff\x00\x00')
+        self.assertEqual(len(self.pdo.mpdo_data), 2)
+        # Too short to hold an address
+        with self.assertLogs("canopen.pdo.base", "WARNING"):
+            self.pdo.on_message(0x181, b'\x05\x04\x20', 3.0)
+        self.assertEqual(len(self.pdo.mpdo_data), 2)
+
+    def test_mpdo_transmit_dam(self):
+        self.pdo.mpdo_mode = canopen.pdo.base.MPDO_DAM
+        self.pdo.transmit_mpdo(0x2001, 0, b'\x34\x12', node_id=3)
+        self.assertEqual(self.sent, [(0x181, b'\x83\x01\x20\x00\x34\x12\x00\x00')])
+        with self.assertRaises(ValueError):
+            self.pdo.transmit_mpdo(0x2001, 0, b'\x00' * 5)
+
+    def test_mpdo_scanner_list(self):
+        scanner = canopen.objectdictionary.ODArray("Object scanner list", 0x1FA0)
+        count = canopen.objectdictionary.ODVariable("Number of entries", 0x1FA0, 0)
+        count.data_type = canopen.objectdictionary.UNSIGNED8
+        count.default = 1
+        scanner.add_member(count)
+        entry = canopen.objectdictionary.ODVariable("Scan 1", 0x1FA0, 1)
+        entry.data_type = canopen.objectdictionary.UNSIGNED32
+        # Block of two objects starting at 0x2001:00 (last one is invalid)
+        entry.default = 0x02200100
+        scanner.add_member(entry)
+        self.node.object_dictionary.add_object(scanner)
+        self.node.sdo[0x2002].raw = 7
+        self.node.sdo[0x2001].raw = 0x1234
+
+        self.pdo.read_scanner_list(from_od=True)
+        self.assertEqual(self.pdo.scanner_list, [(0x2001, 0), (0x2001, 1)])
+        self.pdo.scanner_list = [(0x2001, 0), (0x2002, 0)]
+        self.assertEqual(self.pdo.transmit_next(), (0x2001, 0))
+        self.assertEqual(self.pdo.transmit_next(), (0x2002, 0))
+        self.assertEqual(self.pdo.transmit_next(), (0x2001, 0))
+        self.assertEqual(self.sent[1], (0x181, b'\x01\x02\x20\x00\x07\x00\x00\x00'))
+
+    def test_mpdo_scanner_list_remote(self):
+        node = canopen.RemoteNode(2, SAMPLE_EDS)
+        self.network.add_node(node)
+        pdo = node.tpdo[1]
+        pdo.mpdo_mode = canopen.pdo.base.MPDO_SAM
+        pdo.scanner_list = [(0x2001, 0)]
+        with self.assertRaises(TypeError):
+            pdo.transmit_next()
+
+    def test_mpdo_not_configured(self):
+        self.pdo.mpdo_mode = None
+        with self.assertRaises(ValueError):
+            self.pdo.transmit_mpdo(0x2001, 0, b'\x00')
+
+
+class TestPdoWatchdog(unittest.TestCase):
+    def setUp(self):
+        node = canopen.LocalNode(1, SAMPLE_EDS)
+        self.pdo = node.tpdo[1]
+        self.pdo.cob_id = 0x181
+        self.events = []
+        self.watchdog = canopen.pdo.PdoWatchdog(
+            on_stale=lambda pdo_map: self.events.append(("stale", pdo_map)),
+            on_recovered=lambda pdo_map: self.events.append(("recovered", pdo_map)))
+
+    def test_stale_and_recovered(self):
+        self.watchdog.add(self.pdo, timeout=0.1)
+        now = time.monotonic()
+        self.watchdog._advance(now + 0.05)
+        self.assertEqual(self.events, [])
+        self.watchdog._advance(now + 0.2)
+        self.assertEqual(self.events, [("stale", self.pdo)])
+        self.assertTrue(self.watchdog.is_stale(self.pdo))
+        self.assertEqual(self.watchdog.stale_maps, [self.pdo])
+        # Further timeouts are counted, but reported only once
+        self.watchdog._advance(now + 0.35)
+        self.assertEqual(self.watchdog.missed(self.pdo), 2)
+        self.assertEqual(len(self.events), 1)
+        self.pdo.on_message(0x181, b"\x00" * 8, 1.0)
+        self.assertEqual(self.events[-1], ("recovered", self.pdo))
+        self.assertFalse(self.watchdog.is_stale(self.pdo))
+
+    def test_reception_rearms(self):
+        self.watchdog.add(self.pdo, timeout=0.1)
+        self.watchdog._advance(time.monotonic() + 0.05)
+        self.pdo.on_message(0x181, b"\x00" * 8, 1.0)
+        # Deadline moved beyond the original slot
+        self.watchdog._advance(time.monotonic() + 0.08)
+        self.assertEqual(self.watchdog.missed(self.pdo), 0)
+        self.watchdog._advance(time.monotonic() + 0.2)
+        self.assertEqual(self.watchdog.missed(self.pdo), 1)
+
+    def test_timeout_from_period(self):
+        with self.assertRaises(ValueError):
+            self.watchdog.add(self.pdo)
+        self.pdo.period = 0.01
+        self.watchdog.add(self.pdo)
+        with self.assertRaises(ValueError):
+            self.watchdog.add(self.pdo)
+        self.watchdog.remove(self.pdo)
+        self.assertEqual(self.pdo.callbacks, [])
+
+    def test_thread(self):
+        self.watchdog.add(self.pdo, timeout=0.02)
+        self.watchdog.start()
+        self.addCleanup(self.watchdog.stop)
+        with self.assertRaises(RuntimeError):
+            self.watchdog.start()
+        deadline = time.monotonic() + 1.0
+        while not self.events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.events, [("stale", self.pdo)])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import canopen
+from canopen.objectdictionary import ODArray, ODVariable, ObjectDictionary
+from canopen.objectdictionary import datatypes as dt
+from canopen.program import PROGRAM_CLEAR, PROGRAM_START, PROGRAM_STOP, ProgramDownload
+
+
+def create_od():
+    od = ObjectDictionary()
+    for index, name, data_type in ((0x1F50, "Program data", dt.DOMAIN),
+                                   (0x1F51, "Program control", dt.UNSIGNED8)):
+        array = ODArray(name, index)
+        length = ODVariable("Highest sub-index supported", index, 0)
+        length.data_type = dt.UNSIGNED8
+        length.access_type = "const"
+        length.default = 1
+        array.add_member(length)
+        program = ODVariable("Program number 1", index, 1)
+        program.data_type = data_type
+        program.access_type = "rw"
+        array.add_member(program)
+        od.add_object(array)
+    return od
+
+
+class TestProgramDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.network1 = canopen.Network()
+        self.network1.NOTIFIER_SHUTDOWN_TIMEOUT = 0.0
+        self.network1.connect("program", interface="virtual")
+        self.addCleanup(self.network1.disconnect)
+        self.network2 = canopen.Network()
+        self.network2.NOTIFIER_SHUTDOWN_TIMEOUT = 0.0
+        self.network2.connect("program", interface="virtual")
+        self.addCleanup(self.network2.disconnect)
+        self.remote_nodes = [self.network1.add_node(node_id, create_od())
+                             for node_id in (2, 3)]
+
+        self.image = os.urandom(3000)
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(self.image)
+        self.addCleanup(os.remove, self.path)
+        self.boot = True
+        self.boot_messages = [b"\x00"]
+        self.received = {}
+        self.commands = {}
+        for node_id in (2, 3):
+            node = self.network2.create_node(node_id, create_od())
+            self.received[node.id] = bytearray()
+            self.commands[node.id] = []
+            node.set_domain_sink(0x1F50, 1, self._sink_factory(node.id))
+            node.add_write_callback(self._control_callback(node), index=0x1F51)
+
+    def _sink_factory(self, node_id):
+        received = self.received
+
+        class Sink:
+            def write(self, data):
+                received[node_id] += data
+
+            def close(self):
+                pass
+
+        return Sink
+
+    def _control_callback(self, node):
+        def on_write(index, subindex, od, data):
+            self.commands[node.id].append(data[0])
+            if data[0] == PROGRAM_START and self.boot:
+                # Boot up with the new program shortly after
+                threading.Timer(0.01, self._boot, (node.id,)).start()
+        return on_write
+
+    def _boot(self, node_id):
+        for data in self.boot_messages:
+            self.network2.send_message(0x700 + node_id, data)
+
+    def test_download(self):
+        progress = []
+        download = ProgramDownload(self.path, concurrency=2, frame_rate=20000,
+                                   bootup_timeout=1.0,
+                                   progress=lambda *args: progress.append(args))
+        results = download.run(self.remote_nodes)
+        self.assertEqual([result.node_id for result in results], [2, 3])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertTrue(result.ok)
+            self.assertEqual(result.size, len(self.image))
+            self.assertGreater(result.bytes_per_second, 0)
+            self.assertEqual(self.received[result.node_id], self.image)
+            self.assertEqual(self.commands[result.node_id],
+                             [PROGRAM_STOP, PROGRAM_CLEAR, PROGRAM_START])
+        self.assertIn((2, len(self.image), len(self.image)), [args[:3] for args in progress])
+
+    def test_no_bootup(self):
+        self.boot = False
+        download = ProgramDownload(self.path, bootup_timeout=0.05)
+        results = download.run(self.remote_nodes[:1])
+        self.assertIsInstance(results[0].error, canopen.nmt.NmtError)
+        self.assertEqual(self.received[2], self.image)
+
+    def test_empty_heartbeat(self):
+        self.boot_messages = [b"", b"\x00"]
+        download = ProgramDownload(self.path, bootup_timeout=1.0)
+        with patch.object(canopen.network.logger, "error") as log_error:
+            results = download.run(self.remote_nodes[:1])
+        self.assertIsNone(results[0].error)
+        log_error.assert_not_called()
+
+    def test_empty_image(self):
+        with open(self.path, "wb"):
+            pass
+        with self.assertRaises(ValueError):
+            ProgramDownload(self.path).run(self.remote_nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
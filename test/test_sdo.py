@@ -1,10 +1,13 @@
+import threading
+import time
 import unittest
+from concurrent.futures import Future
 
 import canopen
 import canopen.objectdictionary.datatypes as dt
 from canopen.objectdictionary import ODVariable
 
-from .util import DATATYPES_EDS, SAMPLE_EDS
+from .util import DATATYPES_EDS, SAMPLE_EDS, tmp_file
 
 
 TX = 1
@@ -42,6 +45,12 @@ class TestSDOVariables(unittest.TestCase):
         subs = sum(1 for _ in iter(array))
         self.assertEqual(subs, 8)
 
+    def test_array_read_all(self):
+        array = self.sdo_node[0x1003]
+        self.assertEqual(array.read_all(), {1: 0, 2: 0, 3: 0})
+        array.write_all({1: 0x1234, 3: 0x5678})
+        self.assertEqual(array.read_all(), {1: 0x1234, 2: 0, 3: 0x5678})
+
     def test_array_members_dynamic(self):
         """Check if sub-objects missing from OD entry are generated dynamically."""
         array = self.sdo_node[0x1003]
@@ -148,6 +157,128 @@ class TestSDO(unittest.TestCase):
         device_name = self.network[2].sdo[0x1008].raw
         self.assertEqual(device_name, "Tiny Node - Mega Domains !")
 
+    def test_adaptive_timeout(self):
+        sdo = self.network[2].sdo
+        sdo.ADAPTIVE_TIMEOUT = True
+        # No measurement yet
+        self.assertEqual(sdo.response_timeout("segmented"), 0.01)
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x41\x08\x10\x00\x04\x00\x00\x00'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x07\x54\x69\x6E\x79\x00\x00\x00'),
+        ]
+        self.assertEqual(sdo[0x1008].raw, "Tiny")
+        self.assertEqual(sdo.rtt["expedited"].samples, 1)
+        self.assertEqual(sdo.rtt["segmented"].samples, 1)
+        self.assertEqual(sdo.rtt["block"].samples, 0)
+        # Responses arrive immediately here
+        self.assertEqual(sdo.response_timeout("expedited"), sdo.MIN_TIMEOUT)
+        # Timeouts back off exponentially
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (TX, b'\x80\x00\x00\x00\x00\x00\x04\x05'),
+        ]
+        before = sdo.rtt["expedited"].rto
+        with self.assertRaises(canopen.SdoCommunicationError):
+            sdo.upload(0x1008, 0)
+        self.assertEqual(sdo.rtt["expedited"].backoff, 2)
+        self.assertAlmostEqual(sdo.rtt["expedited"].rto, 2 * before)
+
+    def test_cache(self):
+        sdo = self.network[2].sdo
+        sdo.cache = canopen.sdo.SdoCache(ttl=60)
+        self.data = [
+            (TX, b'\x40\x18\x10\x01\x00\x00\x00\x00'),
+            (RX, b'\x43\x18\x10\x01\x04\x00\x00\x00'),
+            (TX, b'\x40\x17\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x4b\x17\x10\x00\x0a\x00\x00\x00'),
+        ]
+        # Read-only value within TTL
+        self.assertEqual(sdo[0x1018][1].raw, 4)
+        self.assertEqual(sdo[0x1018][1].raw, 4)
+        # Writable values are kept until written by default
+        self.assertEqual(sdo[0x1017].raw, 10)
+        self.assertEqual(sdo[0x1017].raw, 10)
+        self.assertEqual(self.data, [])
+        self.assertEqual((sdo.cache.hits, sdo.cache.misses), (2, 2))
+
+        # Values which are not cached are counted on their own
+        sdo.cache.rw_ttl = 0
+        sdo.cache.invalidate()
+        self.data = [
+            (TX, b'\x40\x17\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x4b\x17\x10\x00\x0a\x00\x00\x00'),
+        ]
+        self.assertEqual(sdo[0x1017].raw, 10)
+        self.assertEqual((sdo.cache.hits, sdo.cache.misses, sdo.cache.uncacheable), (2, 2, 1))
+        self.assertEqual(len(sdo.cache), 0)
+
+        sdo.cache.bypass = True
+        self.data = [
+            (TX, b'\x40\x18\x10\x01\x00\x00\x00\x00'),
+            (RX, b'\x43\x18\x10\x01\x05\x00\x00\x00'),
+        ]
+        self.assertEqual(sdo[0x1018][1].raw, 5)
+        sdo.cache.bypass = False
+        sdo.cache.invalidate(0x1018)
+        self.assertEqual(len(sdo.cache), 0)
+
+    def test_cache_array(self):
+        sdo = self.network[2].sdo
+        sdo.cache = canopen.sdo.SdoCache()
+        self.data = [
+            (TX, b'\x40\x04\x30\x00\x00\x00\x00\x00'),
+            (RX, b'\x4f\x04\x30\x00\x02\x00\x00\x00'),
+        ]
+        # The number of entries is uploaded once
+        array = sdo[0x3004]
+        self.assertEqual(list(array), [1, 2])
+        self.assertEqual(len(array), 2)
+        self.assertIn(2, array)
+        self.assertEqual(self.data, [])
+        self.assertEqual(sdo.cache.misses, 1)
+
+    def test_cache_invalidate_on_download(self):
+        sdo = self.network[2].sdo
+        sdo.cache = canopen.sdo.SdoCache()
+        self.data = [
+            (TX, b'\x40\x17\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x4b\x17\x10\x00\x0a\x00\x00\x00'),
+            (TX, b'\x2b\x17\x10\x00\x14\x00\x00\x00'),
+            (RX, b'\x60\x17\x10\x00\x00\x00\x00\x00'),
+            (TX, b'\x40\x17\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x4b\x17\x10\x00\x14\x00\x00\x00'),
+        ]
+        self.assertEqual(sdo[0x1017].raw, 10)
+        self.assertEqual(sdo[0x1017].raw, 10)
+        sdo[0x1017].raw = 20
+        self.assertEqual(sdo[0x1017].raw, 20)
+        self.assertEqual(self.data, [])
+
+        # Also when downloading without the object dictionary
+        self.data = [
+            (TX, b'\x2b\x17\x10\x00\x1e\x00\x00\x00'),
+            (RX, b'\x60\x17\x10\x00\x00\x00\x00\x00'),
+            (TX, b'\x40\x17\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x4b\x17\x10\x00\x1e\x00\x00\x00'),
+        ]
+        sdo.download(0x1017, 0, b'\x1e\x00')
+        self.assertEqual(sdo[0x1017].raw, 30)
+        self.assertEqual(self.data, [])
+        with sdo.open(0x1017, 0, "wb", size=2):
+            self.assertEqual(len(sdo.cache), 0)
+
+    def test_rtt_estimator(self):
+        estimate = canopen.sdo.client.RttEstimator()
+        self.assertIsNone(estimate.rto)
+        estimate.update(0.01)
+        self.assertAlmostEqual(estimate.srtt, 0.01)
+        self.assertAlmostEqual(estimate.rto, 0.03)
+        estimate.update(0.02)
+        self.assertAlmostEqual(estimate.rttvar, 0.00625)
+        self.assertAlmostEqual(estimate.srtt, 0.01125)
+
     def test_segmented_upload_too_much_data(self):
         # Server sends 5 bytes, but indicated size 4
         self.data = [
@@ -188,6 +319,46 @@ class TestSDO(unittest.TestCase):
             'wb', size=len(data), block_transfer=True) as fp:
             fp.write(data)
 
+    def test_block_download_burst(self):
+        self.data = [
+            (TX, b'\xc6\x00\x20\x00\x1e\x00\x00\x00'),
+            (RX, b'\xa4\x00\x20\x00\x7f\x00\x00\x00'),
+            (TX, b'\x01\x41\x20\x72\x65\x61\x6c\x6c'),
+            (TX, b'\x02\x79\x20\x72\x65\x61\x6c\x6c'),
+            (TX, b'\x03\x79\x20\x6c\x6f\x6e\x67\x20'),
+            (TX, b'\x04\x73\x74\x72\x69\x6e\x67\x2e'),
+            (TX, b'\x85\x2e\x2e\x00\x00\x00\x00\x00'),
+            # Segments 4 and 5 were lost
+            (RX, b'\xa2\x03\x7f\x00\x00\x00\x00\x00'),
+            (TX, b'\x01\x73\x74\x72\x69\x6e\x67\x2e'),
+            (TX, b'\x82\x2e\x2e\x00\x00\x00\x00\x00'),
+            (RX, b'\xa2\x02\x7f\x00\x00\x00\x00\x00'),
+            (TX, b'\xd5\x45\x69\x00\x00\x00\x00\x00'),
+            (RX, b'\xa1\x00\x00\x00\x00\x00\x00\x00')
+        ]
+        transfers = []
+        self.network[2].sdo.add_transfer_callback(transfers.append)
+        self.network[2].sdo.download(0x2000, 0, b'A really really long string...',
+                                     block_transfer=True)
+        self.assertEqual(self.data, [])
+        transfer, = transfers
+        self.assertEqual(transfer.mode, "block")
+        self.assertEqual(transfer.size, 30)
+        self.assertEqual(transfer.segments, 7)
+        self.assertEqual(transfer.retransmissions, 1)
+        self.assertTrue(transfer.ok)
+
+    def test_block_download_invalid_block_size(self):
+        self.data = [
+            (TX, b'\xc6\x00\x20\x00\x1e\x00\x00\x00'),
+            (RX, b'\xa4\x00\x20\x00\x00\x00\x00\x00'),
+            (TX, b'\x80\x00\x00\x00\x02\x00\x04\x05'),
+        ]
+        with self.assertRaises(canopen.SdoCommunicationError):
+            self.network[2].sdo.download(0x2000, 0, b'A really really long string...',
+                                         block_transfer=True)
+        self.assertEqual(self.data, [])
+
     def test_segmented_download_zero_length(self):
         self.data = [
             (TX, b'\x21\x00\x20\x00\x00\x00\x00\x00'),
@@ -215,6 +386,71 @@ class TestSDO(unittest.TestCase):
             data = fp.read()
         self.assertEqual(data, 'Tiny Node - Mega Domains !')
 
+    def test_upload_into(self):
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x41\x08\x10\x00\x1A\x00\x00\x00'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x00\x54\x69\x6E\x79\x20\x4E\x6F'),
+            (TX, b'\x70\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x10\x64\x65\x20\x2D\x20\x4D\x65'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x00\x67\x61\x20\x44\x6F\x6D\x61'),
+            (TX, b'\x70\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x15\x69\x6E\x73\x20\x21\x00\x00')
+        ]
+        buffer = bytearray(32)
+        size = self.network[2].sdo.upload_into(0x1008, 0, buffer)
+        self.assertEqual(size, 26)
+        self.assertEqual(buffer[:size], b'Tiny Node - Mega Domains !')
+
+    def test_upload_into_too_small(self):
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x41\x08\x10\x00\x1A\x00\x00\x00'),
+            (TX, b'\x80\x00\x00\x00\x05\x00\x04\x05'),
+        ]
+        with self.assertRaises(ValueError):
+            self.network[2].sdo.upload_into(0x1008, 0, bytearray(25))
+        self.assertFalse(self.data)
+
+    def test_upload_into_size_not_specified(self):
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x00\x54\x69\x6E\x79\x20\x4E\x6F'),
+            (TX, b'\x70\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x10\x64\x65\x20\x2D\x20\x4D\x65'),
+            (TX, b'\x80\x00\x00\x00\x05\x00\x04\x05'),
+        ]
+        buffer = bytearray(10)
+        with self.assertRaises(ValueError):
+            self.network[2].sdo.upload_into(0x1008, 0, buffer)
+        self.assertEqual(buffer, b'Tiny Node ')
+        self.assertFalse(self.data)
+
+    def test_upload_to_file(self):
+        self.data = [
+            (TX, b'\xa4\x08\x10\x00\x7f\x00\x00\x00'),
+            (RX, b'\xc6\x08\x10\x00\x1a\x00\x00\x00'),
+            (TX, b'\xa3\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x01\x54\x69\x6e\x79\x20\x4e\x6f'),
+            (RX, b'\x02\x64\x65\x20\x2d\x20\x4d\x65'),
+            (RX, b'\x03\x67\x61\x20\x44\x6f\x6d\x61'),
+            (RX, b'\x84\x69\x6e\x73\x20\x21\x00\x00'),
+            (TX, b'\xa2\x04\x7f\x00\x00\x00\x00\x00'),
+            (RX, b'\xc9\x40\xe1\x00\x00\x00\x00\x00'),
+            (TX, b'\xa1\x00\x00\x00\x00\x00\x00\x00')
+        ]
+        with tmp_file() as tmp:
+            size = self.network[2].sdo.upload_to_file(0x1008, 0, tmp.name,
+                                                      block_transfer=True)
+            with open(tmp.name, "rb") as fp:
+                data = fp.read()
+        self.assertEqual(size, 26)
+        self.assertEqual(data, b'Tiny Node - Mega Domains !')
+
     def test_sdo_block_upload_retransmit(self):
         """Trigger a retransmit by only validating a block partially."""
         self.data = [
@@ -548,9 +784,316 @@ class TestSDO(unittest.TestCase):
             _ = self.network[2].sdo[0x1018][1].raw
         self.assertEqual(cm.exception.code, 0x06090011)
 
+    def test_transfer_callback(self):
+        metrics = canopen.sdo.SdoMetrics()
+        transfers = []
+        self.network[2].sdo.add_transfer_callback(metrics)
+        self.network[2].sdo.add_transfer_callback(transfers.append)
+        self.data = [
+            (TX, b'\x40\x08\x10\x00\x00\x00\x00\x00'),
+            (RX, b'\x41\x08\x10\x00\x1A\x00\x00\x00'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x00\x54\x69\x6E\x79\x20\x4E\x6F'),
+            (TX, b'\x70\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x10\x64\x65\x20\x2D\x20\x4D\x65'),
+            (TX, b'\x60\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x00\x67\x61\x20\x44\x6F\x6D\x61'),
+            (TX, b'\x70\x00\x00\x00\x00\x00\x00\x00'),
+            (RX, b'\x15\x69\x6E\x73\x20\x21\x00\x00'),
+            (TX, b'\x40\x18\x10\x01\x00\x00\x00\x00'),
+            (RX, b'\x80\x18\x10\x01\x11\x00\x09\x06'),
+            (TX, b'\x23\x17\x10\x00\xa0\x0f\x00\x00'),
+            (RX, b'\x60\x17\x10\x00\x00\x00\x00\x00'),
+        ]
+        self.network[2].sdo.upload(0x1008, 0)
+        with self.assertRaises(canopen.SdoAbortedError):
+            self.network[2].sdo.upload(0x1018, 1)
+        self.network[2].sdo.download(0x1017, 0, b'\xa0\x0f\x00\x00')
+
+        upload, aborted, download = transfers
+        self.assertEqual(upload[:8], (2, 0x1008, 0, "upload", "segmented", 26, 4, 0))
+        self.assertGreaterEqual(upload.duration, upload.waiting + upload.sending)
+        self.assertEqual(aborted.abort_code, 0x06090011)
+        self.assertIsNone(aborted.mode)
+        self.assertFalse(aborted.ok)
+        self.assertEqual(download[3:7], ("download", "expedited", 4, 0))
+
+        self.assertEqual(metrics.by_node[2].transfers, 3)
+        self.assertEqual(metrics.by_node[2].aborts, 1)
+        self.assertEqual(metrics.by_node[2].size, 30)
+        self.assertEqual(metrics.by_index[(2, 0x1008)].segments, 4)
+
+        # No records without callbacks
+        self.network[2].sdo.remove_transfer_callback(metrics)
+        self.network[2].sdo.remove_transfer_callback(transfers.append)
+        self.data = [
+            (TX, b'\x40\x18\x10\x01\x00\x00\x00\x00'),
+            (RX, b'\x43\x18\x10\x01\x04\x00\x00\x00'),
+        ]
+        self.network[2].sdo.upload(0x1018, 1)
+        self.assertIsNone(self.network[2].sdo._trace)
+        self.assertEqual(len(transfers), 3)
+
     def test_add_sdo_channel(self):
         client = self.network[2].add_sdo(0x123456, 0x234567)
         self.assertIn(client, self.network[2].sdo_channels)
+        self.assertIs(client.network, self.network)
+
+    def test_sdo_pool_lease(self):
+        node = self.network[2]
+        pool = node.sdo_pool
+        extra = node.add_sdo(0x603, 0x583)
+        self.assertEqual(pool.available, 2)
+        with pool.lease() as first:
+            # Additional channels are handed out first
+            self.assertIs(first, extra)
+            with pool.lease() as second:
+                self.assertIs(second, node.sdo)
+                self.assertEqual(pool.available, 0)
+                with self.assertRaises(TimeoutError):
+                    with pool.lease(timeout=0.01):
+                        pass
+        self.assertEqual(pool.available, 2)
+
+    def test_sdo_pool_upload(self):
+        self.data = [
+            (TX, b'\x40\x18\x10\x01\x00\x00\x00\x00'),
+            (RX, b'\x43\x18\x10\x01\x04\x00\x00\x00')
+        ]
+        self.assertEqual(self.network[2].sdo_pool.upload(0x1018, 1), b'\x04\x00\x00\x00')
+
+
+class TestSDOServerBlock(unittest.TestCase):
+    """Test block transfers of the SDO server with lost segments."""
+
+    def setUp(self):
+        self.network = canopen.Network()
+        self.sent = []
+        self.network.send_message = lambda can_id, data, remote=False: \
+            self.sent.append(bytes(data))
+        self.node = self.network.create_node(2, SAMPLE_EDS)
+        self.sdo = self.node.sdo
+
+    def request(self, data):
+        self.sdo.on_request(0x602, data, 0.0)
+
+    def test_download_retransmit(self):
+        self.sdo.blksize = 4
+        data = bytes(range(30))
+        self.request(b'\xc6\x00\x20\x00\x1e\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\xa4\x00\x20\x00\x04\x00\x00\x00')
+        # Segment 3 is lost
+        self.request(b'\x01' + data[0:7])
+        self.request(b'\x02' + data[7:14])
+        self.request(b'\x04' + data[21:28])
+        self.assertEqual(self.sent.pop(), b'\xa2\x02\x04\x00\x00\x00\x00\x00')
+        self.request(b'\x01' + data[14:21])
+        self.request(b'\x02' + data[21:28])
+        self.request(b'\x83' + data[28:30] + bytes(5))
+        self.assertEqual(self.sent.pop(), b'\xa2\x03\x04\x00\x00\x00\x00\x00')
+        crc = canopen.sdo.base.CrcXmodem()
+        crc.process(data)
+        self.request(bytes([0xc1 | 5 << 2]) + crc.final().to_bytes(2, "little") + bytes(5))
+        self.assertEqual(self.sent.pop(), b'\xa1\x00\x00\x00\x00\x00\x00\x00')
+        self.assertEqual(self.node.get_data(0x2000, 0), data)
+
+    def test_download_crc_error(self):
+        self.request(b'\xc6\x00\x20\x00\x03\x00\x00\x00')
+        self.request(b'\x81abc\x00\x00\x00\x00')
+        self.request(b'\xd1\x12\x34\x00\x00\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\x80\x00\x20\x00\x04\x00\x04\x05')
+
+    def test_upload_retransmit(self):
+        data = bytes(range(20))
+        self.node.set_data(0x2000, 0, data)
+        self.request(b'\xa4\x00\x20\x00\x02\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\xc6\x00\x20\x00\x14\x00\x00\x00')
+        self.request(b'\xa3\x00\x00\x00\x00\x00\x00\x00')
+        self.assertEqual(self.sent, [b'\x01' + data[0:7], b'\x02' + data[7:14]])
+        self.sent.clear()
+        # Only the first segment arrived
+        self.request(b'\xa2\x01\x02\x00\x00\x00\x00\x00')
+        self.assertEqual(self.sent, [b'\x01' + data[7:14], b'\x82' + data[14:20] + b'\x00'])
+        self.sent.clear()
+        self.request(b'\xa2\x02\x02\x00\x00\x00\x00\x00')
+        crc = canopen.sdo.base.CrcXmodem()
+        crc.process(data)
+        self.assertEqual(self.sent.pop(),
+                         bytes([0xc1 | 1 << 2]) + crc.final().to_bytes(2, "little") + bytes(5))
+        self.request(b'\xa1\x00\x00\x00\x00\x00\x00\x00')
+        self.assertIsNone(self.sdo._block_state)
+
+    def test_upload_unknown_size(self):
+        self.node.set_domain_source(0x2000, 0, lambda: iter([b"abcd", b"efghijkl"]))
+        self.request(b'\x40\x00\x20\x00\x00\x00\x00\x00')
+        # Segmented upload without size indicated
+        self.assertEqual(self.sent.pop(), b'\x40\x00\x20\x00\x00\x00\x00\x00')
+        self.request(b'\x60\x00\x00\x00\x00\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\x00abcdefg')
+        self.request(b'\x70\x00\x00\x00\x00\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\x15hijkl\x00\x00')
+
+    def test_download_sink_aborted(self):
+        class Sink:
+            def __init__(self):
+                self.data = bytearray()
+                self.closed = False
+                sinks.append(self)
+
+            def write(self, data):
+                self.data += data
+
+            def close(self):
+                self.closed = True
+
+        sinks = []
+        self.node.set_domain_sink(0x2000, 0, Sink)
+        self.request(b'\x21\x00\x20\x00\x0e\x00\x00\x00')
+        self.assertEqual(self.sent.pop(), b'\x60\x00\x20\x00\x00\x00\x00\x00')
+        self.request(b'\x00abcdefg')
+        self.request(b'\x80\x00\x20\x00\x00\x00\x04\x05')
+        self.assertEqual(sinks[0].data, b"abcdefg")
+        self.assertTrue(sinks[0].closed)
+        # The data store is not touched
+        self.assertNotIn(0x2000, self.node.data_store)
+
+
+class TestSDOServerDeferred(unittest.TestCase):
+    """Test SDO server responses to callbacks returning futures."""
+
+    def setUp(self):
+        self.network = canopen.Network()
+        self.sent = []
+        self.network.send_message = lambda can_id, data, remote=False: \
+            self.sent.append(bytes(data))
+        self.node = self.network.create_node(2, SAMPLE_EDS)
+        self.futures = []
+        self.node.add_read_callback(self.callback)
+        self.node.add_write_callback(self.callback)
+
+    def callback(self, index, subindex, od, data=None):
+        if index == 0x1400:
+            future = Future()
+            self.futures.append(future)
+            return future
+
+    def request(self, data):
+        self.node.sdo.on_request(0x602, data, 0.0)
+
+    def test_upload(self):
+        self.request(b'\x40\x00\x14\x01\x00\x00\x00\x00')
+        self.assertEqual(self.sent, [])
+        self.futures[0].set_result(0x202)
+        self.assertEqual(self.sent, [b'\x43\x00\x14\x01\x02\x02\x00\x00'])
+
+    def test_upload_none_falls_through(self):
+        self.node.data_store[0x1400] = {1: b'\x03\x02\x00\x00'}
+        self.request(b'\x40\x00\x14\x01\x00\x00\x00\x00')
+        self.futures[0].set_result(None)
+        self.assertEqual(self.sent, [b'\x43\x00\x14\x01\x03\x02\x00\x00'])
+
+    def test_download(self):
+        self.request(b'\x23\x00\x14\x01\x04\x02\x00\x00')
+        self.assertEqual(self.sent, [])
+        self.assertNotIn(0x1400, self.node.data_store)
+        self.futures[0].set_result(None)
+        self.assertEqual(self.sent, [b'\x60\x00\x14\x01\x00\x00\x00\x00'])
+        self.assertEqual(self.node.data_store[0x1400][1], b'\x04\x02\x00\x00')
+
+    def test_download_failed(self):
+        self.request(b'\x23\x00\x14\x01\x04\x02\x00\x00')
+        self.futures[0].set_exception(canopen.SdoAbortedError(0x06090030))
+        self.assertEqual(self.sent, [b'\x80\x00\x14\x01\x30\x00\x09\x06'])
+        self.assertNotIn(0x1400, self.node.data_store)
+
+    def test_timeout(self):
+        self.node.sdo.RESPONSE_TIMEOUT = 0.01
+        self.request(b'\x40\x00\x14\x01\x00\x00\x00\x00')
+        time.sleep(0.1)
+        self.assertEqual(self.sent, [b'\x80\x00\x14\x01\x00\x00\x04\x05'])
+        self.assertTrue(self.futures[0].cancelled())
+
+    def test_new_request_replaces_pending(self):
+        self.request(b'\x40\x00\x14\x01\x00\x00\x00\x00')
+        self.request(b'\x40\x00\x14\x01\x00\x00\x00\x00')
+        self.assertTrue(self.futures[0].cancelled())
+        self.futures[1].set_result(0x202)
+        self.assertEqual(self.sent, [b'\x43\x00\x14\x01\x02\x02\x00\x00'])
+
+    def test_local_access_waits(self):
+        def complete():
+            while not self.futures:
+                time.sleep(0.001)
+            self.futures[0].set_result(0x205)
+
+        thread = threading.Thread(target=complete)
+        thread.start()
+        self.assertEqual(self.node.sdo[0x1400][1].raw, 0x205)
+        thread.join()
+
+
+class TestSdoScheduler(unittest.TestCase):
+
+    def _run(self, scheduler, requests):
+        """Let one thread per request wait, then record the order of grants."""
+        granted = []
+        threads = []
+        # Use up the burst, so everyone has to queue
+        scheduler.bucket.charge(scheduler.bucket.burst)
+        for node_id, count, priority in requests:
+            def run(node_id=node_id, count=count, priority=priority):
+                for _ in range(count):
+                    scheduler.acquire(node_id, 1, priority)
+                    granted.append(node_id)
+            thread = threading.Thread(target=run)
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.001)
+        for thread in threads:
+            thread.join(5)
+        return granted
+
+    def test_priority(self):
+        scheduler = canopen.sdo.SdoScheduler(50, burst=1)
+        granted = self._run(scheduler, [
+            (1, 1, canopen.sdo.PRIORITY_BULK),
+            (2, 1, canopen.sdo.PRIORITY_BULK),
+            (3, 1, canopen.sdo.PRIORITY_INTERACTIVE),
+        ])
+        # Interactive requests overtake bulk ones waiting for tokens
+        self.assertEqual(granted, [3, 1, 2])
+
+    def test_weighted_fairness(self):
+        scheduler = canopen.sdo.SdoScheduler(1000, burst=1)
+        scheduler.weights[1] = 3
+        granted = self._run(scheduler, [(1, 30, 0), (2, 30, 0)])
+        self.assertEqual(len(granted), 60)
+        first = granted[:20]
+        self.assertGreaterEqual(first.count(1), 13)
+        self.assertGreaterEqual(first.count(2), 3)
+
+    def test_for_bus_load(self):
+        scheduler = canopen.sdo.SdoScheduler.for_bus_load(250000, 0.2)
+        self.assertAlmostEqual(scheduler.bucket.rate, 250000 * 0.2 / 135)
+        with self.assertRaises(ValueError):
+            canopen.sdo.SdoScheduler.for_bus_load(250000, 0)
+
+    def test_sdo_client(self):
+        network = canopen.Network()
+        network.NOTIFIER_SHUTDOWN_TIMEOUT = 0.0
+        node = network.add_node(2, SAMPLE_EDS)
+        network.sdo_scheduler = canopen.sdo.SdoScheduler(50, burst=2)
+
+        def send_message(can_id, data, remote=False):
+            network.notify(0x582, b'\x43\x18\x10\x01\x04\x00\x00\x00', 0.0)
+
+        network.send_message = send_message
+        start = time.monotonic()
+        # Request and response use up the burst
+        self.assertEqual(node.sdo.upload(0x1018, 1), b'\x04\x00\x00\x00')
+        self.assertLess(time.monotonic() - start, 0.01)
+        self.assertEqual(node.sdo.upload(0x1018, 1), b'\x04\x00\x00\x00')
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
 
 
 class TestSDOClientDatatypes(unittest.TestCase):
@@ -5,6 +5,8 @@ import can
 
 import canopen
 
+from .util import SAMPLE_EDS
+
 
 PERIOD = 0.01
 TIMEOUT = PERIOD * 10
@@ -85,5 +87,63 @@ class TestSync(unittest.TestCase):
         self.sync.start(PERIOD)
 
 
+class TestCycleAssembler(unittest.TestCase):
+    def setUp(self):
+        self.net = canopen.Network()
+        for node_id in (2, 3):
+            node = self.net.add_node(node_id, SAMPLE_EDS)
+            pdo_map = node.tpdo[1]
+            pdo_map.cob_id = 0x180 + node_id
+            pdo_map.enabled = True
+            pdo_map.trans_type = 1
+            pdo_map.add_variable('INTEGER16 value')
+            pdo_map.subscribe()
+        self.snapshots = []
+        self.assembler = canopen.sync.CycleAssembler(
+            self.net, callback=self.snapshots.append)
+        self.assembler.start()
+        self.addCleanup(self.assembler.stop)
+
+    def test_complete_cycle(self):
+        self.net.notify(0x80, b"\x05", 1.0)
+        self.net.notify(0x182, b"\x01\x00", 1.001)
+        self.assertEqual(self.snapshots, [])
+        self.net.notify(0x183, b"\x02\x00", 1.002)
+        self.assertEqual(len(self.snapshots), 1)
+        snapshot = self.snapshots[0]
+        self.assertTrue(snapshot.complete)
+        self.assertEqual(snapshot.counter, 5)
+        self.assertEqual(snapshot.values[2]['INTEGER16 value'], 1)
+        self.assertEqual(snapshot.values[3]['INTEGER16 value'], 2)
+        self.assertAlmostEqual(snapshot.latency[self.net[3].tpdo[1]], 0.002)
+        with self.assertRaises(TypeError):
+            snapshot.values[2]['INTEGER16 value'] = 3
+
+    def test_missing_frame(self):
+        # Ignored before the first SYNC
+        self.net.notify(0x183, b"\x01\x00", 0.5)
+        self.net.notify(0x80, b"", 1.0)
+        self.net.notify(0x182, b"\x01\x00", 1.001)
+        self.net.notify(0x182, b"\x09\x00", 1.002)
+        self.net.notify(0x80, b"", 2.0)
+        self.assertEqual(len(self.snapshots), 1)
+        snapshot = self.snapshots[0]
+        self.assertIsNone(snapshot.counter)
+        self.assertEqual(snapshot.missing, {self.net[3].tpdo[1]})
+        self.assertEqual(dict(snapshot.values[2]), {'INTEGER16 value': 1})
+        self.assertNotIn(3, snapshot.values)
+
+    def test_bounded_queue(self):
+        self.assembler.stop()
+        assembler = canopen.sync.CycleAssembler(self.net, maxsize=2)
+        assembler.start()
+        self.addCleanup(assembler.stop)
+        for counter in range(1, 5):
+            self.net.notify(0x80, bytes([counter]), float(counter))
+        self.assertEqual(assembler.dropped, 1)
+        self.assertEqual(assembler.queue.get_nowait().counter, 2)
+        self.assertEqual(assembler.queue.get_nowait().counter, 3)
+
+
 if __name__ == "__main__":
     unittest.main()
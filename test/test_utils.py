@@ -1,6 +1,7 @@
+import time
 import unittest
 
-from canopen.utils import pretty_index
+from canopen.utils import TokenBucket, pretty_index
 
 
 class TestUtils(unittest.TestCase):
@@ -16,6 +17,32 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(pretty_index("", ""), "")
         self.assertEqual(pretty_index(None, 0xab), "0xAB")
 
+    def test_token_bucket(self):
+        bucket = TokenBucket(1000, burst=10)
+        start = time.monotonic()
+        # The burst is available right away
+        self.assertTrue(bucket.consume(10))
+        self.assertLess(time.monotonic() - start, 0.005)
+        # Then tokens are added at the given rate
+        self.assertTrue(bucket.consume(50))
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+        self.assertFalse(bucket.consume(100, timeout=0.01))
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+    def test_token_bucket_try_consume(self):
+        bucket = TokenBucket(1000, burst=10)
+        self.assertEqual(bucket.try_consume(4), 0.0)
+        # Not enough tokens left, nothing is taken
+        self.assertGreater(bucket.try_consume(10), 0.003)
+        self.assertEqual(bucket.try_consume(6), 0.0)
+        bucket.charge(10)
+        self.assertGreaterEqual(bucket.try_consume(1), 0.01)
+        # More than the burst size is granted when full
+        bucket = TokenBucket(1000, burst=10)
+        self.assertEqual(bucket.try_consume(50), 0.0)
+        self.assertGreaterEqual(bucket.try_consume(1), 0.04)
+
 
 if __name__ == "__main__":
     unittest.main()